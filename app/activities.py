@@ -10,14 +10,56 @@ from application_sdk.activities.metadata_extraction.sql import (
     BaseSQLMetadataExtractionActivities,
 )
 from application_sdk.activities.common.utils import get_workflow_id
-from application_sdk.services.objectstore import ObjectStore
-from application_sdk.activities.common.utils import get_object_store_prefix
+from application_sdk.activities.common.utils import auto_heartbeater, get_object_store_prefix
+from application_sdk.common.dataframe_utils import is_empty_dataframe
+from application_sdk.inputs.parquet import ParquetInput
 from application_sdk.constants import TEMPORARY_PATH
 import os
 import glob
 from temporalio import activity
 
+from . import instrumentation, memprofile
+from .assets import ASSET_TYPES, iter_asset_frames
+from .blocking import run_blocking
 from .clients import SQLClient
+from .columnar import COLUMNAR_DIRNAME, columnar_path, write_arrow
+from .compression import compress_outputs
+from .etags import read_etag, write_etag
+from .explain import (
+    EXPLAIN_DIRNAME,
+    EXPLAIN_MODES,
+    capture as capture_explain,
+    explain_dir,
+)
+from .fingerprints import (
+    FINGERPRINT_TYPES,
+    FINGERPRINTS_FILENAME,
+    diff_fingerprints,
+    fingerprint_rows,
+    fingerprints_path,
+    write_fingerprints,
+)
+from .lineage import (
+    EDGE_KINDS,
+    EDGE_SOURCES,
+    LINEAGE_INDEX_FILENAME,
+    edges_from_frame,
+    lineage_index_path,
+    write_lineage_index,
+)
+from .lines import build_line_index
+from .objectstore import download_prefix
+from .outputs import SizedJsonOutput
+from .pages import ASSETS_DIRNAME, AssetPageWriter
+from .runs import registry
+from .store import METADATA_STORE_FILENAME, metadata_store_path, write_metadata_store
+from .search import (
+    SEARCH_INDEX_FILENAME,
+    SEARCH_TYPES,
+    search_index_path,
+    search_rows,
+    write_search_index,
+)
 
 
 class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
@@ -48,7 +90,7 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
         # Ensure we have local copies of raw files by downloading from object store
         try:
             raw_prefix = os.path.join(output_path, "raw")
-            await ObjectStore.download_prefix(
+            await download_prefix(
                 source=get_object_store_prefix(raw_prefix),
                 destination=TEMPORARY_PATH,
             )
@@ -97,6 +139,8 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                             df = pd.read_parquet(pfile)
                             if df is None or df.empty:
                                 continue
+                            instrumentation.add(rows_in=len(df))
+                            memprofile.checkpoint(f"{t}/{os.path.basename(pfile)}")
                             if not wrote_header:
                                 f.write("\t".join(map(str, df.columns)) + "\n")
                                 wrote_header = True
@@ -117,7 +161,15 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
             except Exception:
                 pass
 
-        return {"written": wrote_any, "path": out_file}
+        compressed = compress_outputs(out_file)
+        try:
+            # Line-window reads (head/tail) in the result endpoint
+            build_line_index(out_file)
+        except Exception:
+            pass
+        write_etag(out_file)
+        registry.record(workflow_id, "output.txt")
+        return {"written": wrote_any, "path": out_file, "compressed": compressed}
 
     @activity.defn
     async def write_json_output(self, workflow_args: dict) -> dict | None:
@@ -137,7 +189,7 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
         # Ensure we have local copies of transformed files by downloading from object store
         try:
             transformed_prefix = os.path.join(output_path, "transformed")
-            await ObjectStore.download_prefix(
+            await download_prefix(
                 source=get_object_store_prefix(transformed_prefix),
                 destination=TEMPORARY_PATH,
             )
@@ -198,6 +250,8 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                     files.extend(glob.glob(pat, recursive=True))
             return sorted(files)
 
+        open_pages: list[AssetPageWriter] = []
+        page_counts: dict[str, int] = {}
         try:
             with open(tmp_file, "w", encoding="utf-8") as f:
                 f.write("{\n")
@@ -208,8 +262,12 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                     first_type = False
                     f.write(f"  \"{t}\": [\n")
                     wrote_any = False
+                    # Same records, one per line, for the paginated assets API
+                    pages = AssetPageWriter(out_dir, t)
+                    open_pages.append(pages)
                     files = _gather_transformed_files(t)
                     for p in files:
+                        memprofile.checkpoint(f"{t}/{os.path.basename(p)}")
                         try:
                             if p.endswith(".jsonl"):
                                 with open(p, "r", encoding="utf-8") as jf:
@@ -222,7 +280,9 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                                         except Exception:
                                             continue
                                         rec = _sanitize_record(rec)
-                                        f.write(("    " if not wrote_any else ",\n    ") + json.dumps(rec))
+                                        line = json.dumps(rec)
+                                        f.write(("    " if not wrote_any else ",\n    ") + line)
+                                        pages.add(line, rec)
                                         wrote_any = True
                             elif p.endswith(".json.ignore"):
                                 with open(p, "r", encoding="utf-8") as jf:
@@ -235,7 +295,9 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                                         except Exception:
                                             continue
                                         rec = _sanitize_record(rec)
-                                        f.write(("    " if not wrote_any else ",\n    ") + json.dumps(rec))
+                                        line = json.dumps(rec)
+                                        f.write(("    " if not wrote_any else ",\n    ") + line)
+                                        pages.add(line, rec)
                                         wrote_any = True
                             else:
                                 df = pd.read_parquet(p)
@@ -243,7 +305,9 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                                     continue
                                 for rec in df.to_dict(orient="records"):
                                     rec = _sanitize_record(rec)
-                                    f.write(("    " if not wrote_any else ",\n    ") + json.dumps(rec))
+                                    line = json.dumps(rec)
+                                    f.write(("    " if not wrote_any else ",\n    ") + line)
+                                    pages.add(line, rec)
                                     wrote_any = True
                         except Exception:
                             continue
@@ -256,13 +320,16 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                             if not raw_files:
                                 raw_files.extend(glob.glob(os.path.join(TEMPORARY_PATH, "**", "raw", t, "chunk-*.parquet"), recursive=True))
                             for rp in sorted(raw_files):
+                                memprofile.checkpoint(f"{t}/{os.path.basename(rp)}")
                                 try:
                                     df = pd.read_parquet(rp)
                                     if df is None or df.empty:
                                         continue
                                     for rec in df.to_dict(orient="records"):
                                         rec = _sanitize_record(rec)
-                                        f.write(("    " if not wrote_any else ",\n    ") + json.dumps(rec))
+                                        line = json.dumps(rec)
+                                        f.write(("    " if not wrote_any else ",\n    ") + line)
+                                        pages.add(line, rec)
                                         wrote_any = True
                                 except Exception:
                                     continue
@@ -270,6 +337,8 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                             pass
                     # Close the array
                     f.write("\n  ]")
+                    page_counts[t] = pages.close()
+                    instrumentation.add(rows_in=page_counts[t])
                 # trailing metadata (always close JSON)
                 f.write(",\n  \"_meta\": {\n")
                 f.write(f"    \"workflow_id\": \"{workflow_id}\"\n")
@@ -297,12 +366,26 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
             except Exception:
                 pass
         finally:
+            for pages in open_pages:
+                pages.abort()
             try:
                 if os.path.exists(tmp_file):
                     os.remove(tmp_file)
             except Exception:
                 pass
-        return {"written": True, "path": out_file}
+        compressed = compress_outputs(out_file)
+        try:
+            build_line_index(out_file)
+        except Exception:
+            pass
+        write_etag(out_file)
+        registry.record(workflow_id, "output.json")
+        return {
+            "written": True,
+            "path": out_file,
+            "compressed": compressed,
+            "assets": page_counts,
+        }
 
     @activity.defn
     async def write_excel_output(self, workflow_args: dict) -> dict | None:
@@ -332,14 +415,14 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
 
         # Ensure transformed and raw outputs are locally available
         try:
-            await ObjectStore.download_prefix(
+            await download_prefix(
                 source=get_object_store_prefix(os.path.join(output_path, "transformed")),
                 destination=TEMPORARY_PATH,
             )
         except Exception:
             pass
         try:
-            await ObjectStore.download_prefix(
+            await download_prefix(
                 source=get_object_store_prefix(os.path.join(output_path, "raw")),
                 destination=TEMPORARY_PATH,
             )
@@ -377,6 +460,7 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
         def _read_as_dataframe(files: list[str]) -> pd.DataFrame:
             frames: list[pd.DataFrame] = []
             for p in files:
+                memprofile.checkpoint(f"{os.path.basename(os.path.dirname(p))}/{os.path.basename(p)}")
                 try:
                     if p.endswith(".jsonl") or p.endswith(".json.ignore"):
                         rows = []
@@ -398,6 +482,7 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                             frames.append(df)
                 except Exception:
                     continue
+            instrumentation.add(rows_in=sum(len(frame) for frame in frames))
             if not frames:
                 return pd.DataFrame()
             try:
@@ -507,6 +592,257 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
         wrote_zip = _write_csv_zip(dfs)
         return {"written": wrote_zip, "path": (zip_path if wrote_zip else None), "format": "zip"}
 
+    @activity.defn
+    async def write_columnar_output(self, workflow_args: dict) -> dict | None:
+        """Write one Arrow IPC file per asset type for downstream jobs.
+
+        Produces output/<workflow_id>/columnar/<type>.arrow with the same rows
+        as output.json; see app.columnar.read_columnar for the reader.
+        """
+        workflow_id = workflow_args.get("workflow_id", get_workflow_id())
+        output_path = workflow_args.get("output_path")
+        if not output_path or not workflow_id:
+            return None
+
+        try:
+            await download_prefix(
+                source=get_object_store_prefix(os.path.join(output_path, "transformed")),
+                destination=TEMPORARY_PATH,
+            )
+        except Exception:
+            pass
+        try:
+            await download_prefix(
+                source=get_object_store_prefix(os.path.join(output_path, "raw")),
+                destination=TEMPORARY_PATH,
+            )
+        except Exception:
+            pass
+
+        out_dir = os.path.join("output", workflow_id)
+        counts: dict[str, int] = {}
+        for t in ASSET_TYPES:
+            try:
+                counts[t] = write_arrow(
+                    iter_asset_frames(output_path, t), columnar_path(out_dir, t)
+                )
+            except Exception:
+                activity.logger.warning(f"Columnar export failed for {t}", exc_info=True)
+                continue
+        return {
+            "written": any(counts.values()),
+            "path": os.path.join(out_dir, COLUMNAR_DIRNAME),
+            "format": "arrow",
+            "types": counts,
+        }
+
+    @activity.defn
+    async def build_lineage_index(self, workflow_args: dict) -> dict | None:
+        """Build the CSR lineage graph index from relationship + view_dependency rows.
+
+        Writes output/<workflow_id>/lineage.idx; see app.lineage for the format.
+        """
+        workflow_id = workflow_args.get("workflow_id", get_workflow_id())
+        output_path = workflow_args.get("output_path")
+        if not output_path or not workflow_id:
+            return None
+
+        for sub in ("transformed", "raw"):
+            try:
+                await download_prefix(
+                    source=get_object_store_prefix(os.path.join(output_path, sub)),
+                    destination=TEMPORARY_PATH,
+                )
+            except Exception:
+                pass
+
+        connection_qn = workflow_args.get("connection", {}).get("connection_qualified_name", "")
+
+        def _edges():
+            for kind, typename in enumerate(EDGE_SOURCES):
+                for df in iter_asset_frames(output_path, typename):
+                    frm, to = edges_from_frame(df, typename, connection_qn)
+                    yield frm, to, kind
+
+        out_dir = os.path.join("output", workflow_id)
+        return write_lineage_index(_edges(), lineage_index_path(out_dir))
+
+    @activity.defn
+    async def build_metadata_store(self, workflow_args: dict) -> dict | None:
+        """Bulk-load every asset type and the lineage edges into one SQLite file.
+
+        Writes output/<workflow_id>/metadata.db; see app.store for the layout.
+        """
+        workflow_id = workflow_args.get("workflow_id", get_workflow_id())
+        output_path = workflow_args.get("output_path")
+        if not output_path or not workflow_id:
+            return None
+
+        for sub in ("transformed", "raw"):
+            try:
+                await download_prefix(
+                    source=get_object_store_prefix(os.path.join(output_path, sub)),
+                    destination=TEMPORARY_PATH,
+                )
+            except Exception:
+                pass
+
+        connection_qn = workflow_args.get("connection", {}).get("connection_qualified_name", "")
+
+        def _frames():
+            for t in ASSET_TYPES:
+                for df in iter_asset_frames(output_path, t):
+                    yield t, df
+
+        def _edges():
+            for kind, typename in zip(EDGE_KINDS, EDGE_SOURCES):
+                for df in iter_asset_frames(output_path, typename):
+                    frm, to = edges_from_frame(df, typename, connection_qn)
+                    yield kind, frm, to
+
+        out_dir = os.path.join("output", workflow_id)
+        return write_metadata_store(_frames(), _edges(), metadata_store_path(out_dir))
+
+    @activity.defn
+    async def build_search_index(self, workflow_args: dict) -> dict | None:
+        """Index schema, table, column and index names for the search endpoint.
+
+        Writes output/<workflow_id>/search.db; see app.search for the layout.
+        """
+        workflow_id = workflow_args.get("workflow_id", get_workflow_id())
+        output_path = workflow_args.get("output_path")
+        if not output_path or not workflow_id:
+            return None
+
+        for sub in ("transformed", "raw"):
+            try:
+                await download_prefix(
+                    source=get_object_store_prefix(os.path.join(output_path, sub)),
+                    destination=TEMPORARY_PATH,
+                )
+            except Exception:
+                pass
+
+        def _rows():
+            for typename in SEARCH_TYPES:
+                for df in iter_asset_frames(output_path, typename):
+                    yield from search_rows(df, typename)
+
+        out_dir = os.path.join("output", workflow_id)
+        return write_search_index(_rows(), search_index_path(out_dir))
+
+    @activity.defn
+    async def build_fingerprints(self, workflow_args: dict) -> dict | None:
+        """Hash every schema, table, column, index and foreign key for cross-run diffs.
+
+        Writes output/<workflow_id>/fingerprints.arrow; see app.fingerprints.
+        """
+        workflow_id = workflow_args.get("workflow_id", get_workflow_id())
+        output_path = workflow_args.get("output_path")
+        if not output_path or not workflow_id:
+            return None
+
+        for sub in ("transformed", "raw"):
+            try:
+                await download_prefix(
+                    source=get_object_store_prefix(os.path.join(output_path, sub)),
+                    destination=TEMPORARY_PATH,
+                )
+            except Exception:
+                pass
+
+        connection_qn = workflow_args.get("connection", {}).get("connection_qualified_name", "")
+
+        def _rows():
+            for typename in FINGERPRINT_TYPES:
+                for df in iter_asset_frames(output_path, typename):
+                    yield from fingerprint_rows(df, typename, connection_qn)
+
+        out_dir = os.path.join("output", workflow_id)
+        path = fingerprints_path(out_dir)
+        return {"path": path, "count": write_fingerprints(_rows(), path)}
+
+    @activity.defn
+    async def diff_runs(self, workflow_args: dict) -> dict | None:
+        """Diff this run's fingerprints against ``diff_base_workflow_id``'s.
+
+        Writes output/<workflow_id>/diff.json with per-type counts and the
+        first changes in (type, key) order.
+        """
+        workflow_id = workflow_args.get("workflow_id", get_workflow_id())
+        base_id = workflow_args.get("diff_base_workflow_id")
+        if not workflow_id or not base_id:
+            return None
+        base_path = fingerprints_path(os.path.join("output", base_id))
+        target_path = fingerprints_path(os.path.join("output", workflow_id))
+        if not (os.path.exists(base_path) and os.path.exists(target_path)):
+            return None
+
+        diff = diff_fingerprints(base_path, target_path)
+        diff = {"base": base_id, "target": workflow_id, **diff}
+        import json as _json
+        out_path = os.path.join("output", workflow_id, "diff.json")
+        tmp = out_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                _json.dump(diff, f, indent=2)
+            os.replace(tmp, out_path)
+            registry.record(workflow_id, "diff.json")
+        finally:
+            try:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            except Exception:
+                pass
+        return {"path": out_path, "counts": diff["counts"], "truncated": diff["truncated"]}
+
+    @activity.defn
+    async def explain_queries(self, workflow_args: dict) -> dict | None:
+        """EXPLAIN each prepared extraction query (``explain``: "analyze" or "plan").
+
+        Writes plans and a report to output/<workflow_id>/explain/ (see app.explain).
+        """
+        workflow_id = workflow_args.get("workflow_id", get_workflow_id())
+        mode = str(workflow_args.get("explain") or "").lower()
+        if not workflow_id or mode not in EXPLAIN_MODES:
+            return None
+        state = await self._get_state(workflow_args)
+        if not state.sql_client or not state.sql_client.engine:
+            raise ValueError("SQL client or engine not initialized")
+        from application_sdk.common.utils import prepare_query
+
+        # Same SQL and filters as the fetch activities that run them
+        sources = {
+            "database": (self.fetch_database_sql, None),
+            "schema": (self.fetch_schema_sql, None),
+            "table": (self.fetch_table_sql, self.extract_temp_table_regex_table_sql),
+            "column": (self.fetch_column_sql, self.extract_temp_table_regex_column_sql),
+            "procedure": (self.fetch_procedure_sql, None),
+            "index": (self.read_sql_query_from_file("extract_index.sql"), None),
+            "quality_metric": (self.read_sql_query_from_file("extract_quality_metrics.sql"), None),
+            "view_dependency": (self.read_sql_query_from_file("extract_view_dependency.sql"), None),
+            "relationship": (self.read_sql_query_from_file("extract_relationship.sql"), None),
+        }
+        queries = {}
+        for name, (sql, temp_table_regex_sql) in sources.items():
+            if temp_table_regex_sql is None:
+                queries[name] = prepare_query(query=sql, workflow_args=workflow_args)
+            else:
+                queries[name] = prepare_query(
+                    query=sql, workflow_args=workflow_args, temp_table_regex_sql=temp_table_regex_sql
+                )
+
+        out_dir = os.path.join("output", workflow_id)
+        report = await run_blocking(capture_explain, state.sql_client.engine, queries, mode, out_dir)
+        for name in os.listdir(explain_dir(out_dir)):
+            registry.record(workflow_id, f"{EXPLAIN_DIRNAME}/{name}")
+        return {
+            "path": os.path.join(explain_dir(out_dir), "report.json"),
+            "mode": mode,
+            "count": len(report["queries"]),
+            "failed": sum(1 for q in report["queries"] if q.get("error")),
+        }
+
     @activity.defn
     async def fetch_relationships(self, workflow_args: dict):
         state = await self._get_state(workflow_args)
@@ -531,6 +867,37 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
         with open(path, "r", encoding="utf-8") as f:
             return f.read()
 
+    @activity.defn
+    @auto_heartbeater
+    async def transform_data(self, workflow_args: dict) -> dict:
+        """The SDK's transform_data, also returning the bytes it wrote (``bytes``)."""
+        state = await self._get_state(workflow_args)
+        output_prefix, output_path, typename, _, _ = self._validate_output_args(workflow_args)
+
+        raw_input = ParquetInput(
+            path=os.path.join(output_path, "raw"),
+            input_prefix=output_prefix,
+            file_names=workflow_args.get("file_names"),
+            chunk_size=None,
+        )
+        transformed_output = SizedJsonOutput(
+            output_path=output_path,
+            output_suffix="transformed",
+            output_prefix=output_prefix,
+            typename=typename,
+            chunk_start=workflow_args.get("chunk_start"),
+        )
+        if state.transformer:
+            connection = workflow_args.get("connection", {})
+            workflow_args["connection_name"] = connection.get("connection_name", None)
+            workflow_args["connection_qualified_name"] = connection.get("connection_qualified_name", None)
+            async for dataframe in raw_input.get_batched_daft_dataframe():
+                if is_empty_dataframe(dataframe):
+                    continue
+                transform_metadata = state.transformer.transform_metadata(dataframe=dataframe, **workflow_args)
+                await transformed_output.write_daft_dataframe(transform_metadata)
+        return await transformed_output.get_statistics_with_bytes()
+
     @activity.defn
     async def transform_relationships(self, workflow_args: dict):
         """Transforms FK rows into simple lineage edges JSON.
@@ -546,22 +913,23 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
         # Download raw relationship parquet
         raw_dir = os.path.join(output_path, "raw", typename)
         try:
-            await ObjectStore.download_prefix(
+            await download_prefix(
                 source=get_object_store_prefix(raw_dir),
                 destination=TEMPORARY_PATH,
             )
         except Exception:
-            return {"total_record_count": 0, "chunk_count": 0, "typename": typename}
+            return {"total_record_count": 0, "chunk_count": 0, "typename": typename, "bytes": 0}
 
         import pandas as pd
-        from application_sdk.outputs.json import JsonOutput
 
         files = sorted(glob.glob(os.path.join(raw_dir, "chunk-*.parquet")))
-        out = JsonOutput(
+        out = SizedJsonOutput(
             output_path=output_path,
             output_prefix=output_prefix,
             output_suffix="transformed",
             typename=typename,
+            # Standard chunk-0-part<n>.json names, which CHUNK_DEDUP stores by content
+            chunk_start=0,
         )
         total = 0
         for p in files:
@@ -571,6 +939,8 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                 continue
             if df is None or df.empty:
                 continue
+            instrumentation.add(rows_in=len(df))
+            memprofile.checkpoint(f"{typename}/{os.path.basename(p)}")
             rows = []
             for _, r in df.iterrows():
                 src = f"{workflow_args.get('connection',{}).get('connection_qualified_name','')}/{r.get('src_catalog_name')}/{r.get('src_schema_name')}/{r.get('src_table_name')}/{r.get('src_column_name')}"
@@ -585,8 +955,7 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                 await out.write_dataframe(pd.DataFrame(rows))
                 total += len(rows)
 
-        stats = await out.get_statistics(typename=typename)
-        return stats
+        return await out.get_statistics_with_bytes(typename=typename)
 
     # ---------------------
     # Indexes
@@ -621,22 +990,22 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
 
         raw_dir = os.path.join(output_path, "raw", typename)
         try:
-            await ObjectStore.download_prefix(
+            await download_prefix(
                 source=get_object_store_prefix(raw_dir),
                 destination=TEMPORARY_PATH,
             )
         except Exception:
-            return {"total_record_count": 0, "chunk_count": 0, "typename": typename}
+            return {"total_record_count": 0, "chunk_count": 0, "typename": typename, "bytes": 0}
 
         import pandas as pd
-        from application_sdk.outputs.json import JsonOutput
 
         files = sorted(glob.glob(os.path.join(raw_dir, "chunk-*.parquet")))
-        out = JsonOutput(
+        out = SizedJsonOutput(
             output_path=output_path,
             output_prefix=output_prefix,
             output_suffix="transformed",
             typename=typename,
+            chunk_start=0,
         )
         total = 0
         for p in files:
@@ -646,12 +1015,13 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                 continue
             if df is None or df.empty:
                 continue
+            instrumentation.add(rows_in=len(df))
+            memprofile.checkpoint(f"{typename}/{os.path.basename(p)}")
             # No additional mapping required; write as-is
             await out.write_dataframe(df)
             total += len(df)
 
-        stats = await out.get_statistics(typename=typename)
-        return stats
+        return await out.get_statistics_with_bytes(typename=typename)
 
     # ---------------------
     # Quality metrics (per column)
@@ -686,22 +1056,22 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
 
         raw_dir = os.path.join(output_path, "raw", typename)
         try:
-            await ObjectStore.download_prefix(
+            await download_prefix(
                 source=get_object_store_prefix(raw_dir),
                 destination=TEMPORARY_PATH,
             )
         except Exception:
-            return {"total_record_count": 0, "chunk_count": 0, "typename": typename}
+            return {"total_record_count": 0, "chunk_count": 0, "typename": typename, "bytes": 0}
 
         import pandas as pd
-        from application_sdk.outputs.json import JsonOutput
 
         files = sorted(glob.glob(os.path.join(raw_dir, "chunk-*.parquet")))
-        out = JsonOutput(
+        out = SizedJsonOutput(
             output_path=output_path,
             output_prefix=output_prefix,
             output_suffix="transformed",
             typename=typename,
+            chunk_start=0,
         )
         total = 0
         for p in files:
@@ -711,20 +1081,21 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                 continue
             if df is None or df.empty:
                 continue
+            instrumentation.add(rows_in=len(df))
+            memprofile.checkpoint(f"{typename}/{os.path.basename(p)}")
             await out.write_dataframe(df)
             total += len(df)
 
-        stats = await out.get_statistics(typename=typename)
-        return stats
+        return await out.get_statistics_with_bytes(typename=typename)
 
     @activity.defn
     async def summarize_outputs(self, workflow_args: dict) -> dict:
         """Summarize transformed outputs into a small JSON for Temporal result.
 
-        Collects statistics.json.ignore for each typename and returns counts plus
-        the human-readable export file path.
+        Built from the per-type statistics the workflow collected from the
+        transform activities (``workflow_args["type_stats"]``), including the
+        bytes of transformed chunks they wrote; no object-store reads.
         """
-        import json
         summary: dict = {"types": {}}
         output_prefix = workflow_args.get("output_prefix")
         output_path = workflow_args.get("output_path")
@@ -732,51 +1103,35 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
         if not (output_prefix and output_path and workflow_id):
             return summary
 
-        transformed_dir = os.path.join(output_path, "transformed")
-        # Download transformed folder index so stats files are present locally
-        try:
-            await ObjectStore.download_prefix(
-                source=get_object_store_prefix(transformed_dir),
-                destination=TEMPORARY_PATH,
-            )
-        except Exception:
-            pass
-
-        for typename in [
-            "database",
-            "schema",
-            "table",
-            "column",
-            "index",
-            "quality_metric",
-            "view_dependency",
-            "relationship",
-        ]:
-            stats_path = os.path.join(
-                output_path, "transformed", typename, "statistics.json.ignore"
-            )
-            try:
-                # Ensure latest copy locally
-                await ObjectStore.download_file(
-                    source=get_object_store_prefix(stats_path),
-                    destination=stats_path,
-                )
-            except Exception:
-                continue
-            try:
-                with open(stats_path, "r", encoding="utf-8") as f:
-                    stats = json.load(f)
-                summary["types"][typename] = {
-                    "total_record_count": stats.get("total_record_count", 0),
-                    "chunk_count": stats.get("chunk_count", 0),
-                }
-            except Exception:
-                continue
+        for typename, stats in (workflow_args.get("type_stats") or {}).items():
+            summary["types"][typename] = {
+                "total_record_count": stats.get("total_record_count", 0),
+                "chunk_count": stats.get("chunk_count", 0),
+                "seconds": stats.get("seconds", 0.0),
+                "bytes": stats.get("bytes", 0),
+            }
 
         # Add convenient paths
         summary["output_text"] = os.path.join("output", workflow_id, "output.txt")
         summary["output_json"] = os.path.join("output", workflow_id, "output.json")
+        summary["output_assets"] = os.path.join("output", workflow_id, ASSETS_DIRNAME)
+        summary["output_columnar"] = os.path.join("output", workflow_id, COLUMNAR_DIRNAME)
+        summary["lineage_index"] = os.path.join("output", workflow_id, LINEAGE_INDEX_FILENAME)
+        summary["search_index"] = os.path.join("output", workflow_id, SEARCH_INDEX_FILENAME)
+        summary["metadata_store"] = os.path.join("output", workflow_id, METADATA_STORE_FILENAME)
+        summary["fingerprints"] = os.path.join("output", workflow_id, FINGERPRINTS_FILENAME)
         summary["objectstore_prefix"] = get_object_store_prefix(output_path)
+        # Groups runs for the retention janitor's keep-last-N-per-connection policy
+        summary["connection"] = workflow_args.get("connection", {}).get("connection_qualified_name", "")
+        # Time, rows, bytes and memory per activity this worker ran for the run (slowest first)
+        summary["activities"] = instrumentation.run_profile(workflow_id)
+        # Content hashes of the exports; the result endpoints serve them as ETags
+        summary["etags"] = {}
+        for name in ("output.txt", "output.json"):
+            path = os.path.join("output", workflow_id, name)
+            digest = read_etag(path) or write_etag(path)
+            if digest:
+                summary["etags"][name] = digest
 
         # Persist a copy locally for the UI to fetch
         try:
@@ -792,7 +1147,9 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                 except Exception:
                     pass
             os.replace(tmp_sum, sum_path)
+            write_etag(sum_path)
             summary["summary_path"] = os.path.join("output", workflow_id, "summary.json")
+            registry.record(workflow_id, "summary.json")
         except Exception:
             pass
 
@@ -827,22 +1184,22 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
 
         raw_dir = os.path.join(output_path, "raw", typename)
         try:
-            await ObjectStore.download_prefix(
+            await download_prefix(
                 source=get_object_store_prefix(raw_dir),
                 destination=TEMPORARY_PATH,
             )
         except Exception:
-            return {"total_record_count": 0, "chunk_count": 0, "typename": typename}
+            return {"total_record_count": 0, "chunk_count": 0, "typename": typename, "bytes": 0}
 
         import pandas as pd
-        from application_sdk.outputs.json import JsonOutput
 
         files = sorted(glob.glob(os.path.join(raw_dir, "chunk-*.parquet")))
-        out = JsonOutput(
+        out = SizedJsonOutput(
             output_path=output_path,
             output_prefix=output_prefix,
             output_suffix="transformed",
             typename=typename,
+            chunk_start=0,
         )
         total = 0
         for p in files:
@@ -852,6 +1209,8 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                 continue
             if df is None or df.empty:
                 continue
+            instrumentation.add(rows_in=len(df))
+            memprofile.checkpoint(f"{typename}/{os.path.basename(p)}")
             rows = []
             for _, r in df.iterrows():
                 src = f"{workflow_args.get('connection',{}).get('connection_qualified_name','')}/{r.get('src_catalog_name')}/{r.get('src_schema_name')}/{r.get('src_table_name')}"
@@ -865,5 +1224,4 @@ class SQLMetadataExtractionActivities(BaseSQLMetadataExtractionActivities):
                 await out.write_dataframe(pd.DataFrame(rows))
                 total += len(rows)
 
-        stats = await out.get_statistics(typename=typename)
-        return stats
+        return await out.get_statistics_with_bytes(typename=typename)
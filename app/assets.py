@@ -0,0 +1,99 @@
+"""Helpers for locating and reading per-type extraction chunks.
+
+Mirrors the lookup used by the exporters in activities.py: transformed chunks
+under <output_path>/transformed/<type>/ first, raw parquet under
+<output_path>/raw/<type>/ as a fallback, with a recursive TEMPORARY_PATH scan
+when the run's output_path holds nothing locally.
+"""
+
+import glob
+import json
+import os
+from typing import Iterator
+
+from application_sdk.constants import TEMPORARY_PATH
+
+from . import instrumentation, memprofile
+
+# Order matters: exporters write sections in this order.
+ASSET_TYPES = [
+    "database",
+    "schema",
+    "table",
+    "column",
+    "index",
+    "quality_metric",
+    "relationship",
+    "view_dependency",
+]
+
+
+def gather_transformed_files(output_path: str, typename: str) -> list[str]:
+    base = os.path.join(output_path, "transformed", typename)
+    files: list[str] = []
+    for ext in ("jsonl", "json.ignore", "parquet"):
+        files.extend(glob.glob(os.path.join(base, f"chunk-*.{ext}")))
+    if not files:
+        for ext in ("jsonl", "json.ignore", "parquet"):
+            pat = os.path.join(TEMPORARY_PATH, "**", "transformed", typename, f"chunk-*.{ext}")
+            files.extend(glob.glob(pat, recursive=True))
+    return sorted(files)
+
+
+def gather_raw_files(output_path: str, typename: str) -> list[str]:
+    files = glob.glob(os.path.join(output_path, "raw", typename, "chunk-*.parquet"))
+    if not files:
+        pat = os.path.join(TEMPORARY_PATH, "**", "raw", typename, "chunk-*.parquet")
+        files = glob.glob(pat, recursive=True)
+    return sorted(files)
+
+
+def read_chunk(path: str):
+    """Read one chunk file (JSON lines or parquet) into a DataFrame."""
+    import pandas as pd
+
+    if path.endswith(".jsonl") or path.endswith(".json.ignore"):
+        rows = []
+        with open(path, "r", encoding="utf-8") as jf:
+            for line in jf:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except Exception:
+                    continue
+        return pd.DataFrame(rows)
+    return pd.read_parquet(path)
+
+
+def iter_asset_frames(output_path: str, typename: str) -> Iterator:
+    """Yield non-empty DataFrames for a type, falling back to raw chunks.
+
+    Same source selection as write_json_output, so every derived export
+    agrees with output.json row for row.
+    """
+    yielded = False
+    for p in gather_transformed_files(output_path, typename):
+        try:
+            df = read_chunk(p)
+        except Exception:
+            continue
+        if df is None or df.empty:
+            continue
+        yielded = True
+        instrumentation.add(rows_in=len(df))
+        memprofile.checkpoint(f"{typename}/{os.path.basename(p)}")
+        yield df
+    if yielded:
+        return
+    for p in gather_raw_files(output_path, typename):
+        try:
+            df = read_chunk(p)
+        except Exception:
+            continue
+        if df is None or df.empty:
+            continue
+        instrumentation.add(rows_in=len(df))
+        memprofile.checkpoint(f"{typename}/{os.path.basename(p)}")
+        yield df
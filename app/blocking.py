@@ -0,0 +1,47 @@
+"""Bounded thread pool for blocking file work done on behalf of async handlers.
+
+The FastAPI routes, the Temporal worker and the SDK's own routes share one
+event loop, so a handler that reads, hashes or parses a large export inline
+stalls all of them. Handlers hand such work to ``run_blocking`` instead. The
+pool is separate from the default executor (which Starlette uses to iterate
+file and streaming bodies) and capped at FILE_IO_THREADS, so a burst of
+large reads queues here rather than exhausting threads or file descriptors.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+FILE_IO_THREADS = int(os.getenv("FILE_IO_THREADS", "8"))
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(FILE_IO_THREADS, 1), thread_name_prefix="file-io")
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn(*args, **kwargs)`` on the file I/O pool and await its result.
+
+    Runs in a copy of the caller's context (as ``asyncio.to_thread`` does), so
+    the activity profile in app.instrumentation still sees the work.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), functools.partial(context.run, fn, *args, **kwargs))
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
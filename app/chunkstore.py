@@ -0,0 +1,357 @@
+"""Content-addressed storage for raw/ and transformed/ extraction chunks.
+
+With CHUNK_DEDUP enabled, every chunk the SDK outputs upload is stored once
+under its SHA-256 at ``<CHUNK_STORE_PREFIX>/<aa>/<sha256>``. The run keeps
+only small manifest parts next to its outputs, one per chunk group (the chunks
+sharing a ``chunk-<start>-`` prefix, which one fetch or transform activity
+writes):
+
+    <run prefix>/manifests/raw/table/0.json
+    {"version": 1, "chunks": {"raw/table/chunk-0-part1.parquet": {"sha256": "...", "size": 1234}}}
+
+A chunk whose hash is already in the store is not uploaded again, so nightly
+runs over a mostly static database only push what changed. Entries are
+collected per activity attempt (``activity_manifest``, entered by
+``events.tracked_activity``) and each group's part is written once when the
+activity ends; a retry rewrites the same parts. Parts of different groups
+never share an object, so parallel transforms on different workers do not
+overwrite each other.
+
+Reads resolve chunk keys through the parts: ``install`` routes the SDK's
+``ObjectStore.download_file`` / ``download_prefix`` (which the base
+transform_data's ParquetInput calls directly) through here, and
+``app.objectstore``'s local fast path does the same. Runs written without the
+mode (no parts) are read exactly as before.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import os
+import re
+from typing import Optional
+
+from application_sdk.constants import DEPLOYMENT_OBJECT_STORE_NAME, TEMPORARY_PATH
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.services.objectstore import ObjectStore
+
+from . import instrumentation
+
+logger = get_logger(__name__)
+
+CHUNK_DEDUP = os.getenv("CHUNK_DEDUP", "false").strip().lower() in ("1", "true", "yes", "on")
+CHUNK_STORE_PREFIX = os.getenv("CHUNK_STORE_PREFIX", "artifacts/chunks").strip().strip("/")
+
+MANIFEST_DIRNAME = "manifests"
+CHUNK_SECTIONS = ("raw", "transformed")
+
+_HASH_BLOCK = 1024 * 1024
+_GROUP = re.compile(r"^chunk-(\d+)-")
+
+# The SDK's, captured before ``install``
+_upload_file = ObjectStore.upload_file
+_download_file = ObjectStore.download_file
+_download_prefix = ObjectStore.download_prefix
+
+_installed = False
+_present: set[str] = set()
+_locks: dict[str, asyncio.Lock] = {}
+# Entries uploaded by the running activity: {part key: {chunk key relative to the run: entry}}
+_pending: contextvars.ContextVar[Optional[dict[str, dict]]] = contextvars.ContextVar("chunk_manifest", default=None)
+
+
+def split_chunk_key(key: str) -> Optional[tuple[str, str]]:
+    """(run prefix, key relative to it) for ``<run>/<raw|transformed>/<type>/chunk-*``, else None."""
+    parts = key.replace(os.sep, "/").strip("/").split("/")
+    if len(parts) < 4 or parts[-3] not in CHUNK_SECTIONS or not parts[-1].startswith("chunk-"):
+        return None
+    return "/".join(parts[:-3]), "/".join(parts[-3:])
+
+
+def split_section_prefix(prefix: str) -> Optional[tuple[str, str]]:
+    """Like ``split_chunk_key`` for a download prefix: ``<run>/raw``, ``<run>/raw/<type>`` or a chunk key."""
+    parts = prefix.replace(os.sep, "/").strip("/").split("/")
+    for depth in (1, 2, 3):
+        if len(parts) > depth and parts[-depth] in CHUNK_SECTIONS:
+            return "/".join(parts[:-depth]), "/".join(parts[-depth:])
+    return None
+
+
+def blob_key(digest: str) -> str:
+    return f"{CHUNK_STORE_PREFIX}/{digest[:2]}/{digest}"
+
+
+def part_key(run_prefix: str, rel: str) -> str:
+    """Manifest part holding ``rel`` (``<section>/<type>/chunk-<start>-...``): ``<run>/manifests/<section>/<type>/<start>.json``."""
+    section_type, _, name = rel.rpartition("/")
+    match = _GROUP.match(name)
+    group = match.group(1) if match else name.split(".", 1)[0]
+    return f"{run_prefix}/{MANIFEST_DIRNAME}/{section_type}/{group}.json"
+
+
+def file_digest(path: str) -> tuple[str, int]:
+    h = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_HASH_BLOCK)
+            if not block:
+                break
+            h.update(block)
+            size += len(block)
+    return h.hexdigest(), size
+
+
+def handles(destination: str) -> bool:
+    """Whether an upload to ``destination`` goes to the content-addressed store."""
+    return _installed and split_chunk_key(destination) is not None
+
+
+def _lock(key: str) -> asyncio.Lock:
+    lock = _locks.get(key)
+    if lock is None:
+        lock = _locks[key] = asyncio.Lock()
+    return lock
+
+
+def _record_metric(result: str, value: int) -> None:
+    try:
+        from application_sdk.observability.metrics_adaptor import MetricType, get_metrics
+
+        get_metrics().record_metric(
+            name="chunk_dedup_bytes",
+            value=value,
+            metric_type=MetricType.COUNTER,
+            labels={"result": result},
+            description="Chunk bytes uploaded to or skipped by the content-addressed store",
+            unit="bytes",
+        )
+    except Exception:
+        pass
+
+
+async def _read_part(key: str, store_name: str) -> dict:
+    """Chunk entries of one manifest part; empty when it does not exist."""
+    from .objectstore import _local_root
+
+    root = _local_root()
+    try:
+        if root and os.path.isfile(os.path.join(root, key)):
+            with open(os.path.join(root, key), "rb") as f:
+                raw = f.read()
+        else:
+            raw = await ObjectStore.get_content(key, store_name)
+            instrumentation.add(objectstore_bytes_read=len(raw))
+        return json.loads(raw).get("chunks", {})
+    except Exception:
+        return {}
+
+
+async def _list_parts(prefix: str, store_name: str) -> list[str]:
+    from .objectstore import _local_root
+
+    root = _local_root()
+    if root:
+        base = os.path.join(root, prefix)
+        if not os.path.isdir(base):
+            return []
+        keys = []
+        for dirpath, _, files in os.walk(base):
+            keys.extend(os.path.relpath(os.path.join(dirpath, f), root).replace(os.sep, "/") for f in files if f.endswith(".json"))
+        return keys
+    try:
+        return [k for k in await ObjectStore.list_files(prefix, store_name) if k.endswith(".json")]
+    except Exception:
+        return []
+
+
+async def _write_part(key: str, chunks: dict, store_name: str) -> None:
+    local = os.path.join(TEMPORARY_PATH, key)
+    os.makedirs(os.path.dirname(local), exist_ok=True)
+    tmp = local + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "chunks": chunks}, f, sort_keys=True, separators=(",", ":"))
+        os.replace(tmp, local)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+    size = os.path.getsize(local)
+    await _upload_file(local, key, store_name, False)
+    instrumentation.add(objectstore_bytes_written=size)
+
+
+async def _has_blob(key: str, store_name: str) -> bool:
+    if key in _present:
+        return True
+    from .objectstore import _local_root
+
+    root = _local_root()
+    if root:
+        found = os.path.isfile(os.path.join(root, key))
+    else:
+        try:
+            found = key in await ObjectStore.list_files(key, store_name)
+        except Exception:
+            found = False
+    if found:
+        _present.add(key)
+    return found
+
+
+async def upload_chunk(
+    source: str,
+    destination: str,
+    store_name: str = DEPLOYMENT_OBJECT_STORE_NAME,
+    retain_local_copy: bool = False,
+) -> bool:
+    """Store one chunk by content and reference it from its group's manifest part.
+
+    Returns False (nothing done) when ``destination`` is not a chunk key.
+    """
+    from .blocking import run_blocking
+
+    parsed = split_chunk_key(destination)
+    if parsed is None:
+        return False
+    run_prefix, rel = parsed
+    digest, size = await run_blocking(file_digest, source)
+    key = blob_key(digest)
+    if await _has_blob(key, store_name):
+        _record_metric("skipped", size)
+    else:
+        await _upload_file(source, key, store_name, True)
+        _present.add(key)
+        _record_metric("uploaded", size)
+        instrumentation.add(objectstore_bytes_written=size, chunks_written=1)
+
+    entry = {"sha256": digest, "size": size}
+    part = part_key(run_prefix, rel)
+    pending = _pending.get()
+    if pending is not None:
+        pending.setdefault(part, {})[rel] = entry
+    else:
+        # Outside an activity: merge into the part right away
+        async with _lock(part):
+            chunks = await _read_part(part, store_name)
+            chunks[rel] = entry
+            await _write_part(part, chunks, store_name)
+
+    if not retain_local_copy:
+        ObjectStore._cleanup_local_path(source)
+    return True
+
+
+class activity_manifest:
+    """Collect the chunk entries one activity attempt uploads; write each group's part once on exit."""
+
+    def __init__(self, store_name: str = DEPLOYMENT_OBJECT_STORE_NAME):
+        self.store_name = store_name
+        self._token: Optional[contextvars.Token] = None
+
+    async def __aenter__(self) -> "activity_manifest":
+        if _installed:
+            self._token = _pending.set({})
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._token is None:
+            return
+        pending = _pending.get() or {}
+        _pending.reset(self._token)
+        try:
+            for part, chunks in pending.items():
+                await _write_part(part, chunks, self.store_name)
+        except Exception:
+            # Without its parts the activity's chunks are unreadable: fail it so it is retried
+            if exc is None:
+                raise
+            logger.warning("Could not write chunk manifest parts of a failed activity", exc_info=True)
+
+
+async def resolve_prefix(source: str, store_name: str = DEPLOYMENT_OBJECT_STORE_NAME) -> list[tuple[str, str]]:
+    """(blob key, chunk key) pairs the run's manifest parts list under ``source``; empty without parts."""
+    parsed = split_section_prefix(source)
+    if parsed is None:
+        return []
+    run_prefix, rel = parsed
+    if split_chunk_key(source):
+        parts = [part_key(run_prefix, rel)]
+    else:
+        parts = await _list_parts(f"{run_prefix}/{MANIFEST_DIRNAME}/{rel}/", store_name)
+    chunks: dict = {}
+    for part in parts:
+        chunks.update(await _read_part(part, store_name))
+    # Chunks this activity uploaded but has not written parts for yet
+    for part, entries in (_pending.get() or {}).items():
+        if part.startswith(f"{run_prefix}/"):
+            chunks.update(entries)
+    pairs = []
+    for name, entry in chunks.items():
+        if name == rel or name.startswith(rel + "/"):
+            pairs.append((blob_key(entry["sha256"]), f"{run_prefix}/{name}"))
+    return sorted(pairs, key=lambda p: p[1])
+
+
+async def resolve_key(key: str, store_name: str = DEPLOYMENT_OBJECT_STORE_NAME) -> Optional[str]:
+    """Blob key a chunk key resolves to, or None (not a chunk key, or not in a manifest)."""
+    if not split_chunk_key(key):
+        return None
+    for blob, name in await resolve_prefix(key, store_name):
+        if name == key.replace(os.sep, "/").strip("/"):
+            return blob
+    return None
+
+
+async def _upload_file_dedup(
+    cls,
+    source: str,
+    destination: str,
+    store_name: str = DEPLOYMENT_OBJECT_STORE_NAME,
+    retain_local_copy: bool = False,
+) -> None:
+    if not await upload_chunk(source, destination, store_name, retain_local_copy):
+        await _upload_file(source, destination, store_name, retain_local_copy)
+
+
+async def _download_file_dedup(
+    cls,
+    source: str,
+    destination: str,
+    store_name: str = DEPLOYMENT_OBJECT_STORE_NAME,
+) -> None:
+    await _download_file(await resolve_key(source, store_name) or source, destination, store_name)
+
+
+async def _download_prefix_dedup(
+    cls,
+    source: str,
+    destination: str = TEMPORARY_PATH,
+    store_name: str = DEPLOYMENT_OBJECT_STORE_NAME,
+) -> None:
+    resolved = await resolve_prefix(source, store_name)
+    for blob, key in resolved:
+        # Through the installed download_file so the activity profile counts it
+        await ObjectStore.download_file(blob, os.path.join(destination, key), store_name)
+    try:
+        # Whatever else is stored under the prefix (statistics, non-chunk files)
+        await _download_prefix.__func__(cls, source, destination, store_name)
+    except Exception:
+        if not resolved:
+            raise
+
+
+def install() -> None:
+    """Route the SDK's chunk uploads and downloads through the content-addressed store (when CHUNK_DEDUP is set)."""
+    global _installed
+    if not CHUNK_DEDUP or _installed:
+        return
+    ObjectStore.upload_file = classmethod(_upload_file_dedup)  # type: ignore[method-assign]
+    ObjectStore.download_file = classmethod(_download_file_dedup)  # type: ignore[method-assign]
+    ObjectStore.download_prefix = classmethod(_download_prefix_dedup)  # type: ignore[method-assign]
+    _installed = True
+    logger.info(f"Content-addressed chunk storage enabled under {CHUNK_STORE_PREFIX}/")
@@ -0,0 +1,277 @@
+"""Columnar (Arrow IPC) export of per-type extraction results.
+
+One uncompressed Arrow IPC file per asset type under
+output/<workflow_id>/columnar/<type>.arrow. Uncompressed IPC buffers can be
+memory-mapped and handed to readers without copying, and repeated strings
+(catalog, schema, table names, qualified-name prefixes) are dictionary-encoded
+so each distinct value is stored once.
+"""
+
+import os
+from typing import Iterable, Optional
+
+COLUMNAR_DIRNAME = "columnar"
+
+# Dictionary-encode a string column when distinct values make up at most
+# this fraction of its rows; unique-ish columns are cheaper left plain.
+DICTIONARY_MAX_RATIO = 0.5
+
+
+def columnar_path(out_dir: str, typename: str) -> str:
+    return os.path.join(out_dir, COLUMNAR_DIRNAME, f"{typename}.arrow")
+
+
+def _frame_to_table(df):
+    import json
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except Exception:
+        # Mixed-type object columns: fall back to strings (JSON for nested values)
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].map(
+                    lambda v: None
+                    if v is None or (isinstance(v, float) and v != v)
+                    else (json.dumps(v, default=str) if isinstance(v, (dict, list)) else str(v))
+                )
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _unify_types(types: list):
+    """One type for a column seen with ``types`` across frames.
+
+    Null-typed (all-missing) chunks adopt the others' type; types pyarrow
+    cannot promote into each other (int vs string, nested vs scalar) become
+    strings, as ``_frame_to_table`` does within a single frame.
+    """
+    import pyarrow as pa
+
+    unified = pa.null()
+    for t in types:
+        if t == unified or pa.types.is_null(t):
+            continue
+        if pa.types.is_null(unified):
+            unified = t
+            continue
+        try:
+            unified = pa.unify_schemas(
+                [pa.schema([("v", unified)]), pa.schema([("v", t)])], promote_options="permissive"
+            ).field("v").type
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pa.string()
+    return unified
+
+
+def _to_string(col):
+    import json
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        return pc.cast(col, pa.string())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return pa.array(
+            [None if v is None else (json.dumps(v, default=str) if isinstance(v, (dict, list)) else str(v))
+             for v in col.to_pylist()],
+            type=pa.string(),
+        )
+
+
+class _Dictionary:
+    """A column's dictionary, grown batch by batch.
+
+    New values are only ever appended, so every batch's dictionary extends
+    the previous one and the IPC writer emits it as a delta.
+    """
+
+    def __init__(self, value_type):
+        import pyarrow as pa
+
+        self.values = pa.array([], type=value_type)
+
+    def encode(self, col):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        seen = pc.unique(col).drop_null()
+        new = seen.filter(pc.invert(pc.is_in(seen, value_set=self.values)))
+        if len(new):
+            self.values = pa.concat_arrays([self.values, new])
+        indices = pc.index_in(col, value_set=self.values)
+        return pa.DictionaryArray.from_arrays(indices, self.values)
+
+
+def write_arrow(frames: Iterable, path: str) -> int:
+    """Write DataFrames as one dictionary-encoded Arrow IPC file (atomic).
+
+    Frames are converted one at a time and spilled next to ``path``; once the
+    unified schema is known each is cast to it and written as its own record
+    batch, so only one frame is held in memory. String columns whose first
+    batch is repetitive enough are dictionary-encoded with one dictionary per
+    column, extended by deltas. Returns the number of rows written; nothing
+    is written for zero rows.
+    """
+    import shutil
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    spill = path + ".parts"
+    tmp = path + ".tmp"
+    shutil.rmtree(spill, ignore_errors=True)
+    os.makedirs(spill)
+    try:
+        parts, types = [], {}
+        for df in frames:
+            table = _frame_to_table(df)
+            if not table.num_rows:
+                continue
+            for field in table.schema:
+                types.setdefault(field.name, []).append(field.type)
+            part = os.path.join(spill, f"{len(parts)}.arrow")
+            with pa.OSFile(part, "wb") as sink:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            parts.append(part)
+            del table
+        if not parts:
+            return 0
+        values = pa.schema([(name, _unify_types(t)) for name, t in types.items()])
+
+        rows = 0
+        schema, dictionaries = None, None
+        options = ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+        with pa.OSFile(tmp, "wb") as sink:
+            writer = None
+            for part in parts:
+                with pa.memory_map(part, "r") as source:
+                    table = ipc.open_file(source).read_all().combine_chunks()
+                columns = []
+                for field in values:
+                    if field.name not in table.column_names:
+                        columns.append(pa.nulls(table.num_rows, field.type))
+                        continue
+                    col = table.column(field.name).chunk(0)
+                    if col.type != field.type:
+                        col = _to_string(col) if pa.types.is_string(field.type) else col.cast(field.type)
+                    columns.append(col)
+                if dictionaries is None:
+                    # Decided once, on the first batch: the file schema cannot change afterwards
+                    dictionaries = {}
+                    for field, col in zip(values, columns):
+                        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+                            if pc.count_distinct(col).as_py() <= len(col) * DICTIONARY_MAX_RATIO:
+                                dictionaries[field.name] = _Dictionary(field.type)
+                    schema = pa.schema(
+                        [
+                            pa.field(f.name, pa.dictionary(pa.int32(), f.type))
+                            if f.name in dictionaries
+                            else f
+                            for f in values
+                        ]
+                    )
+                    writer = ipc.new_file(sink, schema, options=options)
+                columns = [
+                    dictionaries[f.name].encode(col) if f.name in dictionaries else col
+                    for f, col in zip(schema, columns)
+                ]
+                writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=schema))
+                rows += table.num_rows
+                del table, columns
+            writer.close()
+        os.replace(tmp, path)
+        return rows
+    finally:
+        shutil.rmtree(spill, ignore_errors=True)
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+
+
+def read_arrow(path: str, columns: Optional[list[str]] = None):
+    """Memory-map an Arrow IPC file and return a zero-copy pyarrow Table.
+
+    Column buffers point straight into the mapping; nothing is decoded or
+    copied until a caller materializes values (e.g. ``to_pandas()``).
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    source = pa.memory_map(path, "r")
+    table = ipc.open_file(source).read_all()
+    if columns:
+        table = table.select([c for c in columns if c in table.column_names])
+    return table
+
+
+def read_columnar(out_dir: str, typename: str, columns: Optional[list[str]] = None):
+    """Load output/<workflow_id>/columnar/<type>.arrow, or None if absent."""
+    path = columnar_path(out_dir, typename)
+    if not os.path.exists(path):
+        return None
+    return read_arrow(path, columns=columns)
+
+
+def read_asset_rows(
+    out_dir: str,
+    typename: str,
+    columns: Optional[list[str]] = None,
+    filters: Optional[dict[str, set]] = None,
+) -> list[dict]:
+    """Rows for one asset type of a finished run, as plain dicts.
+
+    Reads the memory-mapped Arrow file and applies ``filters`` (column ->
+    allowed values) before materializing anything. Filtered reads go to the
+    run's indexed SQLite store (app.store) when there is one. Runs exported
+    before the columnar format existed fall back to output.json.
+    """
+    if filters:
+        from .store import store_rows
+
+        try:
+            rows = store_rows(out_dir, typename, columns, filters)
+        except Exception:
+            rows = None
+        if rows is not None:
+            return rows
+    table = read_columnar(out_dir, typename)
+    if table is not None:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        for name, allowed in (filters or {}).items():
+            if name not in table.column_names:
+                return []
+            col = table.column(name)
+            if pa.types.is_dictionary(col.type):
+                col = pc.cast(col, col.type.value_type)
+            table = table.filter(pc.is_in(col, value_set=pa.array(sorted(allowed), type=col.type)))
+        if columns:
+            table = table.select([c for c in columns if c in table.column_names])
+        return table.to_pylist()
+
+    import json
+
+    path = os.path.join(out_dir, "output.json")
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f).get(typename) or []
+    except Exception:
+        return []
+    out = []
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        if filters and any(row.get(k) not in v for k, v in filters.items()):
+            continue
+        out.append({c: row.get(c) for c in columns} if columns else row)
+    return out
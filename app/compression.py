@@ -0,0 +1,110 @@
+"""Precompressed variants of the consolidated outputs.
+
+Exporters call compress_outputs() after their atomic replace to stream each
+file into <name>.gz / <name>.zst next to the original. The HTTP layer
+(app/serving.py) then hands those bytes out as-is with a Content-Encoding
+header. zstd needs the optional ``zstandard`` package; without it only gzip
+variants are produced.
+"""
+
+import gzip
+import os
+import shutil
+from typing import BinaryIO
+
+# Comma-separated codecs to produce: "gzip", "zstd" or both. Empty disables.
+OUTPUT_COMPRESSION = os.getenv("OUTPUT_COMPRESSION", "").strip()
+OUTPUT_COMPRESSION_LEVEL = int(os.getenv("OUTPUT_COMPRESSION_LEVEL", "6"))
+
+# Content-Encoding token -> file suffix
+SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _zstd():
+    try:
+        import zstandard  # type: ignore
+
+        return zstandard
+    except Exception:
+        return None
+
+
+def available_codecs() -> list[str]:
+    codecs = ["gzip"]
+    if _zstd() is not None:
+        codecs.insert(0, "zstd")
+    return codecs
+
+
+def configured_codecs() -> list[str]:
+    wanted = [c.strip().lower() for c in OUTPUT_COMPRESSION.split(",") if c.strip()]
+    return [c for c in wanted if c in available_codecs()]
+
+
+def compress_file(path: str, codec: str, level: int = OUTPUT_COMPRESSION_LEVEL) -> str:
+    """Stream ``path`` into ``path + suffix`` in fixed-size chunks (atomic)."""
+    out = path + SUFFIXES[codec]
+    tmp = out + ".tmp"
+    try:
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            if codec == "zstd":
+                cctx = _zstd().ZstdCompressor(level=level)
+                with cctx.stream_writer(dst, closefd=False) as zw:
+                    shutil.copyfileobj(src, zw, _CHUNK_SIZE)
+            else:
+                # mtime=0 keeps the bytes (and their ETag) stable across reruns
+                with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=level, mtime=0) as gz:
+                    shutil.copyfileobj(src, gz, _CHUNK_SIZE)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp, out)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+    return out
+
+
+def compress_outputs(path: str) -> list[str]:
+    """Write every configured compressed variant of ``path``; best effort."""
+    written: list[str] = []
+    if not os.path.exists(path):
+        return written
+    for codec in configured_codecs():
+        try:
+            written.append(compress_file(path, codec))
+        except Exception:
+            continue
+    return written
+
+
+def variant(path: str, codec: str) -> str | None:
+    """Return the compressed variant for ``codec`` if it is current."""
+    candidate = path + SUFFIXES[codec]
+    if not os.path.exists(candidate):
+        return None
+    try:
+        # A stale variant (original rewritten after it) must not be served
+        if os.path.exists(path) and os.path.getmtime(candidate) < os.path.getmtime(path):
+            return None
+    except OSError:
+        return None
+    return candidate
+
+
+def open_decompressed(path: str) -> BinaryIO | None:
+    """Open the original, or a decompressing reader over a stored variant."""
+    if os.path.exists(path):
+        return open(path, "rb")
+    gz = path + SUFFIXES["gzip"]
+    if os.path.exists(gz):
+        return gzip.open(gz, "rb")  # type: ignore[return-value]
+    zst = path + SUFFIXES["zstd"]
+    zstd = _zstd()
+    if zstd is not None and os.path.exists(zst):
+        return zstd.ZstdDecompressor().stream_reader(open(zst, "rb"), closefd=True)
+    return None
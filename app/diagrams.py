@@ -0,0 +1,179 @@
+"""Deterministic Mermaid diagrams built from a run's exported assets.
+
+Local counterpart to the Groq-backed lineage/ER endpoints: reads the
+relationship, view_dependency, index and column rows for a run, ranks tables
+by degree and emits the same compact shapes the LLM prompts ask for (at most
+20 nodes/edges for lineage, 8 tables for ER). No network, identical output
+for identical inputs.
+"""
+
+import re
+from collections import Counter
+from typing import Optional
+
+from .columnar import read_asset_rows
+
+LINEAGE_MAX_NODES = 20
+LINEAGE_MAX_EDGES = 20
+ER_MAX_TABLES = 8
+# Mirrors the relation caps of the LLM sanitizer per detail level
+ER_MAX_RELATIONS = {"minimal": 8, "standard": 20, "rich": 40}
+
+
+def _split_qualified_name(qn: Optional[str], parts: int) -> Optional[list[str]]:
+    # <connection qualified name>/<catalog>/<schema>/<table>[/<column>]
+    if not qn:
+        return None
+    segments = str(qn).split("/")
+    return segments[-parts:] if len(segments) >= parts else None
+
+
+def fk_edges(out_dir: str) -> list[tuple[str, str, str, str, str]]:
+    """(src_schema.table, src_column, dst_schema.table, dst_column, constraint)."""
+    edges = []
+    for r in read_asset_rows(out_dir, "relationship"):
+        if r.get("src_table_name") is not None:
+            edges.append((
+                f"{r.get('src_schema_name')}.{r.get('src_table_name')}",
+                str(r.get("src_column_name") or ""),
+                f"{r.get('dst_schema_name')}.{r.get('dst_table_name')}",
+                str(r.get("dst_column_name") or ""),
+                str(r.get("constraint_name") or ""),
+            ))
+            continue
+        src = _split_qualified_name(r.get("fromQualifiedName"), 4)
+        dst = _split_qualified_name(r.get("toQualifiedName"), 4)
+        if src and dst:
+            edges.append((f"{src[1]}.{src[2]}", src[3], f"{dst[1]}.{dst[2]}", dst[3], ""))
+    return sorted(set(edges))
+
+
+def view_edges(out_dir: str) -> list[tuple[str, str]]:
+    """(schema.table, schema.view) pairs."""
+    edges = []
+    for r in read_asset_rows(out_dir, "view_dependency"):
+        if r.get("src_table_name") is not None:
+            edges.append((
+                f"{r.get('src_schema_name')}.{r.get('src_table_name')}",
+                f"{r.get('dst_schema_name')}.{r.get('dst_table_name')}",
+            ))
+            continue
+        src = _split_qualified_name(r.get("fromQualifiedName"), 3)
+        dst = _split_qualified_name(r.get("toQualifiedName"), 3)
+        if src and dst:
+            edges.append((f"{src[1]}.{src[2]}", f"{dst[1]}.{dst[2]}"))
+    return sorted(set(edges))
+
+
+def table_degrees(fks, views) -> Counter:
+    """Distinct table-level neighbours per table across FK and view edges."""
+    degree: Counter = Counter()
+    pairs = {(a, b) for a, _, b, _, _ in fks} | set(views)
+    for a, b in pairs:
+        if a == b:
+            continue
+        degree[a] += 1
+        degree[b] += 1
+    return degree
+
+
+def _top(degree: Counter, k: int) -> list[str]:
+    # Ties broken by name so the same inputs always give the same picture
+    return sorted(degree, key=lambda n: (-degree[n], n))[:k]
+
+
+def _ident(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_]", "_", text) or "_"
+
+
+def local_lineage_mermaid(
+    out_dir: str, max_nodes: int = LINEAGE_MAX_NODES, max_edges: int = LINEAGE_MAX_EDGES
+) -> str:
+    """flowchart LR of the best-connected tables; FK edges solid, view edges dotted."""
+    fks = fk_edges(out_dir)
+    views = view_edges(out_dir)
+    degree = table_degrees(fks, views)
+    keep = set(_top(degree, max_nodes))
+
+    candidates: dict[tuple[str, str], str] = {}
+    for a, _, b, _, _ in fks:
+        if a != b and a in keep and b in keep:
+            candidates.setdefault((a, b), "-->")
+    for a, b in views:
+        if a != b and a in keep and b in keep:
+            candidates.setdefault((a, b), "-.->")
+    chosen = sorted(candidates, key=lambda e: (-(degree[e[0]] + degree[e[1]]), e))[:max_edges]
+
+    lines = ["flowchart LR"]
+    if not chosen:
+        return lines[0]
+    used = sorted({n for e in chosen for n in e}, key=lambda n: (-degree[n], n))
+    ids = {n: f"n{i}" for i, n in enumerate(used)}
+    lines.extend(f'  {ids[n]}["{n}"]' for n in used)
+    lines.extend(f"  {ids[a]} {candidates[(a, b)]} {ids[b]}" for a, b in chosen)
+    return "\n".join(lines)
+
+
+def local_er_mermaid(
+    out_dir: str, max_tables: int = ER_MAX_TABLES, detail: str = "rich"
+) -> str:
+    """erDiagram of the most-referenced tables with their PK and FK columns."""
+    fks = fk_edges(out_dir)
+    degree = table_degrees(fks, [])
+    tables = _top(degree, max_tables)
+    if not tables:
+        return "erDiagram"
+    keep = set(tables)
+    schemas = {t.split(".", 1)[0] for t in tables}
+
+    def _entity(t: str) -> str:
+        # Drop the schema when every table shares it
+        return _ident(t.split(".", 1)[1] if len(schemas) == 1 else t)
+
+    names = {t.split(".", 1)[1] for t in tables}
+    pks: dict[str, list[str]] = {t: [] for t in tables}
+    for r in read_asset_rows(
+        out_dir,
+        "index",
+        columns=["schema_name", "table_name", "is_primary", "column_names"],
+        filters={"table_name": names},
+    ):
+        t = f"{r.get('schema_name')}.{r.get('table_name')}"
+        if t in keep and r.get("is_primary") and r.get("column_names"):
+            for c in str(r["column_names"]).split(","):
+                if c and c not in pks[t]:
+                    pks[t].append(c)
+
+    fk_cols: dict[str, list[str]] = {t: [] for t in tables}
+    relations: list[tuple[str, str, str]] = []
+    for a, ac, b, _, _ in fks:
+        if a in keep and b in keep:
+            if ac and ac not in fk_cols[a]:
+                fk_cols[a].append(ac)
+            relations.append((b, a, ac))
+    relations = sorted(set(relations))[: ER_MAX_RELATIONS.get(detail, ER_MAX_RELATIONS["rich"])]
+
+    types: dict[tuple[str, str], str] = {}
+    for r in read_asset_rows(
+        out_dir,
+        "column",
+        columns=["table_schema", "table_name", "column_name", "data_type"],
+        filters={"table_name": names},
+    ):
+        types[(f"{r.get('table_schema')}.{r.get('table_name')}", str(r.get("column_name")))] = str(
+            r.get("data_type") or "col"
+        )
+
+    lines = ["erDiagram"]
+    for t in tables:
+        attrs = []
+        for c in pks[t] + [c for c in fk_cols[t] if c not in pks[t]]:
+            keys = ", ".join(k for k, on in (("PK", c in pks[t]), ("FK", c in fk_cols[t])) if on)
+            attrs.append(f"    {_ident(types.get((t, c), 'col'))} {_ident(c)} {keys}")
+        if attrs:
+            lines.append(f"  {_entity(t)} {{")
+            lines.extend(attrs)
+            lines.append("  }")
+    for parent, child, col in relations:
+        lines.append(f'  {_entity(parent)} ||--o{{ {_entity(child)} : "{col or "fk"}"')
+    return "\n".join(lines)
@@ -0,0 +1,91 @@
+"""Strong content validators for files under output/<workflow_id>/.
+
+Exports are immutable once ``os.replace`` publishes them, so the exporters
+hash each file once and record the digest in a sidecar
+(``<file>.sha256``, JSON with the size and mtime it was taken at).
+summarize_outputs copies the digests into summary.json. The HTTP layer
+(app.serving) turns them into ETags; a file without a valid sidecar is
+hashed on first request and remembered for its current size/mtime.
+"""
+
+import hashlib
+import json
+import os
+from typing import Optional
+
+ETAG_SUFFIX = ".sha256"
+
+_READ_SIZE = 1024 * 1024
+_MAX_CACHED = 1024
+
+_cache: dict[str, tuple[int, int, str]] = {}
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_READ_SIZE)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+def write_etag(path: str) -> Optional[str]:
+    """Hash ``path`` and atomically write its sidecar; returns the digest."""
+    try:
+        st = os.stat(path)
+        digest = file_digest(path)
+    except OSError:
+        return None
+    sidecar = path + ETAG_SUFFIX
+    tmp = sidecar + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}, f)
+        os.replace(tmp, sidecar)
+    except OSError:
+        return digest
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+    _cache[path] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+
+def read_etag(path: str, st: Optional[os.stat_result] = None) -> Optional[str]:
+    """Digest from the sidecar, or None if it is missing or describes another version."""
+    try:
+        st = st or os.stat(path)
+        with open(path + ETAG_SUFFIX, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("size") != st.st_size or meta.get("mtime_ns") != st.st_mtime_ns:
+        return None
+    return meta.get("sha256")
+
+
+def etag_for(path: str, st: Optional[os.stat_result] = None) -> Optional[str]:
+    """Content digest for the current version of ``path``."""
+    try:
+        st = st or os.stat(path)
+    except OSError:
+        return None
+    cached = _cache.get(path)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        return cached[2]
+    digest = read_etag(path, st)
+    if digest is None:
+        try:
+            digest = file_digest(path)
+        except OSError:
+            return None
+    if len(_cache) >= _MAX_CACHED:
+        _cache.clear()
+    _cache[path] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
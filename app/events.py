@@ -0,0 +1,194 @@
+"""In-process progress events for running workflows, served as SSE.
+
+Activities run in the same process as the FastAPI server, so every
+registered activity is wrapped (see ``tracked_activity``) to publish
+stage_started / stage_finished / stage_failed, the rows extracted per type
+and the exports it produced onto ``bus``, and to profile it (see
+``app.instrumentation`` and, when enabled, ``app.memprofile``). The UI subscribes once to
+``/workflows/v1/events/{workflow_id}`` instead of polling the disk.
+
+Each workflow keeps a short history so late or reconnecting subscribers
+(``Last-Event-ID``) replay what they missed.
+"""
+
+import asyncio
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable, Optional
+
+from .chunkstore import activity_manifest as chunk_manifest
+from .instrumentation import measure
+from .memprofile import profile as memory_profile
+
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "500"))
+EVENT_HISTORY_RUNS = 64
+SSE_HEARTBEAT_SECONDS = 15.0
+_SUBSCRIBER_QUEUE_SIZE = 1000
+
+# Published once summarize_outputs returns; nothing follows for the run
+RUN_FINISHED = "run_finished"
+
+
+class EventBus:
+    """Fan-out of per-workflow events to asyncio subscribers."""
+
+    def __init__(self, history_size: int = EVENT_HISTORY_SIZE):
+        self.history_size = history_size
+        self._ids = itertools.count(1)
+        self._history: "OrderedDict[str, deque]" = OrderedDict()
+        self._subscribers: set[tuple[Optional[str], asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        # Activities started and not yet finished or failed, per workflow; kept apart from the bounded history
+        self._running: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, workflow_id: str, event: str, **data: Any) -> dict:
+        """Record an event and hand it to matching subscribers; never blocks."""
+        message = {"id": next(self._ids), "event": event, "workflow_id": workflow_id, "ts": time.time(), **data}
+        with self._lock:
+            history = self._history.pop(workflow_id, None) or deque(maxlen=self.history_size)
+            history.append(message)
+            self._history[workflow_id] = history
+            if event == "stage_started":
+                self._running[workflow_id] = self._running.get(workflow_id, 0) + 1
+            elif event in ("stage_finished", "stage_failed") and workflow_id in self._running:
+                self._running[workflow_id] -= 1
+                if self._running[workflow_id] <= 0:
+                    del self._running[workflow_id]
+            while len(self._history) > EVENT_HISTORY_RUNS:
+                self._history.popitem(last=False)
+            targets = [(loop, q) for wf, loop, q in self._subscribers if wf in (None, workflow_id)]
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # Subscriber's loop already closed
+                pass
+        return message
+
+    def history(self, workflow_id: Optional[str], after: int = 0) -> list[dict]:
+        with self._lock:
+            runs = [self._history.get(workflow_id, ())] if workflow_id else list(self._history.values())
+            return sorted((m for h in runs for m in h if m["id"] > after), key=lambda m: m["id"])
+
+    def active_runs(self, idle_seconds: float) -> set[str]:
+        """Workflows with an activity in flight, or not finished and with events in the last ``idle_seconds``.
+
+        A long activity publishes nothing between stage_started and its end,
+        so it counts however long ago it started; ``idle_seconds`` only covers
+        the gaps between activities.
+        """
+        cutoff = time.time() - idle_seconds
+        with self._lock:
+            return set(self._running) | {
+                workflow_id
+                for workflow_id, history in self._history.items()
+                if history and history[-1]["event"] != RUN_FINISHED and history[-1]["ts"] >= cutoff
+            }
+
+    async def subscribe(self, workflow_id: Optional[str] = None, after: int = 0) -> AsyncIterator[Optional[dict]]:
+        """Yield replayed then live events; yields None on idle heartbeats."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+        entry = (workflow_id, asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.add(entry)
+        try:
+            last = after
+            for message in self.history(workflow_id, after):
+                last = message["id"]
+                yield message
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message["id"] <= last:
+                    # Already sent during replay
+                    continue
+                last = message["id"]
+                yield message
+        finally:
+            with self._lock:
+                self._subscribers.discard(entry)
+
+
+def _offer(queue: asyncio.Queue, message: dict) -> None:
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        # Slow client: it can reconnect with Last-Event-ID and replay
+        pass
+
+
+def format_sse(message: Optional[dict]) -> bytes:
+    if message is None:
+        return b": keep-alive\n\n"
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {json.dumps(message, default=str)}\n\n".encode("utf-8")
+
+
+bus = EventBus()
+
+
+def _field(result: Any, name: str) -> Any:
+    if isinstance(result, dict):
+        return result.get(name)
+    return getattr(result, name, None)
+
+
+def _publish_result(workflow_id: str, stage: str, result: Any) -> None:
+    typename = _field(result, "typename")
+    rows = _field(result, "total_record_count")
+    if typename and rows is not None:
+        bus.publish(workflow_id, "rows", stage=stage, typename=typename, rows=rows)
+    if stage == "summarize_outputs" and isinstance(result, dict):
+        bus.publish(workflow_id, RUN_FINISHED, types=result.get("types", {}))
+    elif isinstance(result, dict) and result.get("written") and result.get("path"):
+        bus.publish(workflow_id, "export_ready", stage=stage, path=result["path"], format=result.get("format"))
+
+
+def tracked_activity(fn: Callable) -> Callable:
+    """Re-register an activity under its own name with progress events and profiling around it."""
+    from temporalio import activity
+
+    definition = getattr(fn, "__temporal_activity_definition", None)
+    if definition is None or not asyncio.iscoroutinefunction(fn):
+        return fn
+    name = definition.name
+
+    # updated=() keeps the original's activity definition off the wrapper
+    @functools.wraps(fn, updated=())
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        info = activity.info()
+        workflow_id = info.workflow_id
+        bus.publish(workflow_id, "stage_started", stage=name, attempt=info.attempt)
+        started = time.monotonic()
+        try:
+            workflow_args = next((a for a in args if isinstance(a, dict)), None)
+            with measure(name, workflow_id, info.workflow_run_id) as measurement, memory_profile(
+                name, workflow_id, info.attempt, workflow_args
+            ):
+                async with chunk_manifest():
+                    result = await fn(*args, **kwargs)
+                measurement.result = result
+        except BaseException as e:
+            bus.publish(
+                workflow_id,
+                "stage_failed",
+                stage=name,
+                error=str(e) or type(e).__name__,
+                seconds=round(time.monotonic() - started, 3),
+            )
+            raise
+        bus.publish(workflow_id, "stage_finished", stage=name, seconds=round(time.monotonic() - started, 3))
+        try:
+            _publish_result(workflow_id, name, result)
+        except Exception:
+            pass
+        return result
+
+    return activity.defn(name=name)(wrapper)
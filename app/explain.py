@@ -0,0 +1,198 @@
+"""EXPLAIN capture for the extraction queries.
+
+Start a run with ``explain`` in its workflow args and the ``explain_queries``
+exit activity re-runs each prepared extract_*.sql query (same filters as the
+fetch that used it) under
+
+- ``"analyze"``: ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)``; the query
+  executes, inside a read-only transaction that is rolled back
+- ``"plan"``: ``EXPLAIN (FORMAT JSON)``; planner estimates only, nothing runs
+
+and writes, under output/<workflow_id>/explain/:
+
+    <name>.plan.json    the raw plan Postgres returned
+    report.json         per query: execution time, rows, shared-buffer hits and
+                        reads, and the most expensive plan nodes
+    report.txt          the same, slowest query first
+
+Node cost is exclusive of the node's children: actual time x loops for
+ANALYZE, the planner's total cost for a plain plan.
+"""
+
+import json
+import os
+from typing import Any, Optional
+
+EXPLAIN_DIRNAME = "explain"
+EXPLAIN_MODES = ("analyze", "plan")
+EXPLAIN_TIMEOUT_SECONDS = int(os.getenv("EXPLAIN_TIMEOUT_SECONDS", "300"))
+
+# Plan nodes listed per query in the report
+TOP_NODES = 5
+
+
+def explain_statement(query: str, mode: str) -> str:
+    if mode == "analyze":
+        return "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query
+    return "EXPLAIN (FORMAT JSON) " + query
+
+
+def run_explain(engine: Any, query: str, mode: str, timeout_seconds: int = EXPLAIN_TIMEOUT_SECONDS) -> dict:
+    """Run EXPLAIN for ``query`` and return Postgres's plan document (blocking)."""
+    from sqlalchemy import text
+
+    with engine.connect() as connection:
+        try:
+            connection.execute(text("SET TRANSACTION READ ONLY"))
+            connection.execute(text(f"SET LOCAL statement_timeout = {int(timeout_seconds) * 1000}"))
+            plan = connection.execute(text(explain_statement(query, mode))).scalar()
+        finally:
+            connection.rollback()
+    if isinstance(plan, (str, bytes)):
+        plan = json.loads(plan)
+    # FORMAT JSON returns a one-element array
+    return plan[0] if isinstance(plan, list) else plan
+
+
+def _node_total(node: dict, analyzed: bool) -> float:
+    if analyzed:
+        return float(node.get("Actual Total Time") or 0.0) * int(node.get("Actual Loops") or 1)
+    return float(node.get("Total Cost") or 0.0)
+
+
+def _walk(node: dict, analyzed: bool, depth: int = 0):
+    """Yield (node, depth, exclusive cost, exclusive shared hits, exclusive shared reads)."""
+    children = node.get("Plans") or []
+    total = _node_total(node, analyzed)
+    child_total = sum(_node_total(c, analyzed) for c in children)
+    hit = int(node.get("Shared Hit Blocks") or 0) - sum(int(c.get("Shared Hit Blocks") or 0) for c in children)
+    read = int(node.get("Shared Read Blocks") or 0) - sum(int(c.get("Shared Read Blocks") or 0) for c in children)
+    # InitPlans and CTE scans can make children look costlier than the parent
+    yield node, depth, max(0.0, total - child_total), max(0, hit), max(0, read)
+    for child in children:
+        yield from _walk(child, analyzed, depth + 1)
+
+
+def _describe(node: dict) -> str:
+    label = node.get("Node Type", "?")
+    if node.get("Join Type"):
+        label = f"{node['Join Type']} {label}"
+    relation = node.get("Relation Name") or node.get("CTE Name") or node.get("Function Name")
+    if relation:
+        schema = node.get("Schema")
+        label += f" on {schema + '.' if schema else ''}{relation}"
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    return label
+
+
+def summarize_plan(name: str, document: dict, mode: str, top: int = TOP_NODES) -> dict:
+    """Headline numbers and the ``top`` most expensive nodes of one plan document."""
+    analyzed = mode == "analyze"
+    root = document.get("Plan") or {}
+    nodes = []
+    for node, depth, cost, hit, read in _walk(root, analyzed):
+        entry = {
+            "node": _describe(node),
+            "depth": depth,
+            "estimated_rows": node.get("Plan Rows"),
+            "total_cost": node.get("Total Cost"),
+        }
+        if analyzed:
+            entry.update({
+                "exclusive_ms": round(cost, 3),
+                "actual_rows": node.get("Actual Rows"),
+                "loops": node.get("Actual Loops"),
+                "shared_hit_blocks": hit,
+                "shared_read_blocks": read,
+            })
+        else:
+            entry["exclusive_cost"] = round(cost, 2)
+        nodes.append(entry)
+    key = "exclusive_ms" if analyzed else "exclusive_cost"
+    nodes.sort(key=lambda n: n[key], reverse=True)
+    return {
+        "query": name,
+        "mode": mode,
+        "planning_ms": document.get("Planning Time"),
+        "execution_ms": document.get("Execution Time"),
+        "rows": root.get("Actual Rows") if analyzed else root.get("Plan Rows"),
+        "total_cost": root.get("Total Cost"),
+        "shared_hit_blocks": root.get("Shared Hit Blocks") if analyzed else None,
+        "shared_read_blocks": root.get("Shared Read Blocks") if analyzed else None,
+        "nodes": len(nodes),
+        "top_nodes": nodes[:top],
+    }
+
+
+def _sort_key(entry: dict) -> float:
+    return entry.get("execution_ms") or entry.get("total_cost") or 0.0
+
+
+def render_report(entries: list[dict]) -> str:
+    """Plain-text report, slowest (or costliest) query first; failed queries last."""
+    lines = []
+    ok = sorted((e for e in entries if not e.get("error")), key=_sort_key, reverse=True)
+    for entry in ok:
+        if entry["mode"] == "analyze":
+            lines.append(
+                f"{entry['query']}: {entry['execution_ms'] or 0:.1f} ms "
+                f"(planning {entry['planning_ms'] or 0:.1f} ms), {entry['rows']} rows, "
+                f"shared hit {entry['shared_hit_blocks'] or 0} / read {entry['shared_read_blocks'] or 0} blocks"
+            )
+        else:
+            lines.append(f"{entry['query']}: cost {entry['total_cost']}, ~{entry['rows']} rows (not executed)")
+        for node in entry["top_nodes"]:
+            if entry["mode"] == "analyze":
+                lines.append(
+                    f"    {node['exclusive_ms']:>10.1f} ms  {node['node']}  "
+                    f"rows={node['actual_rows']} (est {node['estimated_rows']}) loops={node['loops']} "
+                    f"hit={node['shared_hit_blocks']} read={node['shared_read_blocks']}"
+                )
+            else:
+                lines.append(f"    {node['exclusive_cost']:>10.1f}     {node['node']}  rows~{node['estimated_rows']}")
+        lines.append("")
+    for entry in entries:
+        if entry.get("error"):
+            lines.append(f"{entry['query']}: failed: {entry['error']}")
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def explain_dir(out_dir: str) -> str:
+    return os.path.join(out_dir, EXPLAIN_DIRNAME)
+
+
+def _write_atomic(path: str, content: str) -> None:
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+
+
+def capture(engine: Any, queries: dict[str, Optional[str]], mode: str, out_dir: str) -> dict:
+    """EXPLAIN every query, write plans and reports under ``explain_dir(out_dir)`` (blocking)."""
+    target = explain_dir(out_dir)
+    os.makedirs(target, exist_ok=True)
+    entries = []
+    for name, query in queries.items():
+        if not query:
+            continue
+        try:
+            document = run_explain(engine, query, mode)
+        except Exception as e:
+            entries.append({"query": name, "mode": mode, "error": str(e).splitlines()[0] if str(e) else type(e).__name__})
+            continue
+        _write_atomic(os.path.join(target, f"{name}.plan.json"), json.dumps({"query": query, "plan": document}, indent=2))
+        entries.append(summarize_plan(name, document, mode))
+
+    report = {"mode": mode, "queries": sorted(entries, key=_sort_key, reverse=True)}
+    _write_atomic(os.path.join(target, "report.json"), json.dumps(report, indent=2))
+    _write_atomic(os.path.join(target, "report.txt"), render_report(entries))
+    return report
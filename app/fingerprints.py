@@ -0,0 +1,276 @@
+"""Per-asset fingerprints and a streaming diff between two runs.
+
+Each run stores output/<workflow_id>/fingerprints.arrow: one row per schema,
+table, column, index and foreign key with
+
+    type   asset type (dictionary-encoded)
+    key    connection-independent name, e.g. ``db.public.orders.id``
+    hash   16-byte BLAKE2b of the asset's attributes (sync bookkeeping excluded)
+
+sorted by (type, key) and written in fixed-size record batches. Diffing two
+runs is a merge-join over the two memory-mapped files in key-range windows, so
+memory stays bounded by the batch size rather than the size of either run.
+"""
+
+import hashlib
+import json
+import os
+from typing import Iterable, Iterator, Optional
+
+FINGERPRINTS_FILENAME = "fingerprints.arrow"
+
+# Asset types fingerprinted; "relationship" rows are the foreign keys
+FINGERPRINT_TYPES = ("schema", "table", "column", "index", "relationship")
+CHANGE_KINDS = ("added", "removed", "modified")
+
+BATCH_ROWS = 64 * 1024
+MAX_DIFF_ITEMS = 10000
+
+# Where each part of an asset's name lives, raw column first then transformed attribute
+_NAME_PARTS = {
+    "schema": (("catalog_name", "databaseName"), ("schema_name", "name")),
+    "table": (("table_catalog", "databaseName"), ("table_schema", "schemaName"), ("table_name", "name")),
+    "column": (
+        ("table_catalog", "databaseName"),
+        ("table_schema", "schemaName"),
+        ("table_name", "tableName"),
+        ("column_name", "name"),
+    ),
+    "index": (("catalog_name",), ("schema_name",), ("table_name",), ("index_name",)),
+}
+
+
+def fingerprints_path(out_dir: str) -> str:
+    return os.path.join(out_dir, FINGERPRINTS_FILENAME)
+
+
+def _is_volatile(field: str) -> bool:
+    # Changes on every extraction without the asset changing
+    return "lastSync" in field or field == "guid"
+
+
+def _clean(value):
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items() if not _is_volatile(str(k))}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    if isinstance(value, float) and value != value:
+        return None
+    if hasattr(value, "tolist"):
+        return _clean(value.tolist())
+    return value
+
+
+def _field(rec: dict, names: Iterable[str]) -> Optional[str]:
+    attributes = rec.get("attributes") if isinstance(rec.get("attributes"), dict) else {}
+    for name in names:
+        for value in (rec.get(name), rec.get(f"attributes.{name}"), attributes.get(name)):
+            if value is not None and value == value and value != "":
+                return str(value)
+    return None
+
+
+def _strip_connection(qualified_name: str, connection_qn: str) -> str:
+    if connection_qn and qualified_name.startswith(connection_qn + "/"):
+        qualified_name = qualified_name[len(connection_qn) + 1:]
+    return qualified_name.replace("/", ".")
+
+
+def asset_key(rec: dict, typename: str, connection_qn: str = "") -> Optional[str]:
+    """Stable name of one asset row, without the connection prefix."""
+    if typename == "relationship":
+        frm, to = _field(rec, ("fromQualifiedName",)), _field(rec, ("toQualifiedName",))
+        if frm and to:
+            return f"{_strip_connection(frm, connection_qn)} -> {_strip_connection(to, connection_qn)}"
+        sides = []
+        for side in ("src", "dst"):
+            parts = [
+                _field(rec, (f"{side}_{p}",)) for p in ("catalog_name", "schema_name", "table_name", "column_name")
+            ]
+            if not all(parts[1:]):
+                return None
+            sides.append(".".join(p for p in parts if p))
+        name = _field(rec, ("constraint_name",))
+        return f"{sides[0]} -> {sides[1]}" + (f" ({name})" if name else "")
+    parts = [_field(rec, names) for names in _NAME_PARTS[typename]]
+    if not parts[-1]:
+        qualified_name = _field(rec, ("qualifiedName",))
+        return _strip_connection(qualified_name, connection_qn) if qualified_name else None
+    return ".".join(p for p in parts if p)
+
+
+def asset_hash(rec: dict) -> bytes:
+    canonical = json.dumps(_clean(rec), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
+def fingerprint_rows(df, typename: str, connection_qn: str = "") -> Iterator[tuple[str, str, bytes]]:
+    for rec in df.to_dict("records"):
+        key = asset_key(rec, typename, connection_qn)
+        if key:
+            yield typename, key, asset_hash(rec)
+
+
+def write_fingerprints(rows: Iterable[tuple[str, str, bytes]], path: str) -> int:
+    """Sort (type, key, hash) rows and write them as batched Arrow IPC (atomic).
+
+    Rows sharing a (type, key), e.g. a multi-column FK, fold into one hash.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+
+    types: list[str] = []
+    keys: list[str] = []
+    hashes: list[bytes] = []
+    for t, k, h in rows:
+        types.append(t)
+        keys.append(k)
+        hashes.append(h)
+    table = pa.table({
+        "type": pa.array(types, pa.string()),
+        "key": pa.array(keys, pa.string()),
+        "hash": pa.array(hashes, pa.binary(16)),
+    })
+    del types, keys, hashes
+    order = pc.sort_indices(table, sort_keys=[("type", "ascending"), ("key", "ascending"), ("hash", "ascending")])
+    table = table.take(order)
+
+    # Fold duplicate keys
+    out_types: list[str] = []
+    out_keys: list[str] = []
+    out_hashes: list[bytes] = []
+    for t, k, h in zip(
+        table.column("type").to_pylist(), table.column("key").to_pylist(), table.column("hash").to_pylist()
+    ):
+        if out_keys and out_keys[-1] == k and out_types[-1] == t:
+            out_hashes[-1] = hashlib.blake2b(out_hashes[-1] + h, digest_size=16).digest()
+            continue
+        out_types.append(t)
+        out_keys.append(k)
+        out_hashes.append(h)
+    table = pa.table({
+        "type": pc.dictionary_encode(pa.array(out_types, pa.string())),
+        "key": pa.array(out_keys, pa.string()),
+        "hash": pa.array(out_hashes, pa.binary(16)),
+    })
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    try:
+        with pa.OSFile(tmp, "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=BATCH_ROWS)
+        os.replace(tmp, path)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+    return table.num_rows
+
+
+def _batches(path: str, typename: Optional[str] = None) -> Iterator:
+    """Yield (name, type, hash) arrays per record batch; name is "type\\0key", which sorts like (type, key)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+
+    with pa.memory_map(path, "r") as source:
+        reader = ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            types = batch.column(0).cast(pa.string())
+            if typename:
+                mask = pc.equal(types, typename)
+                batch, types = batch.filter(mask), types.filter(mask)
+                if not batch.num_rows:
+                    continue
+            yield pc.binary_join_element_wise(types, batch.column(1), "\0"), types, batch.column(2)
+
+
+def diff_fingerprints(
+    base_path: str,
+    target_path: str,
+    typename: Optional[str] = None,
+    limit: int = 1000,
+) -> dict:
+    """Merge-join two fingerprint files into per-type counts and the first ``limit`` changes.
+
+    Both files are consumed in key-range windows (at most about two record
+    batches per side in memory); each window is joined with vectorized
+    lookups instead of row by row.
+    """
+    import pyarrow.compute as pc
+
+    limit = max(0, min(limit, MAX_DIFF_ITEMS))
+    counts: dict[str, dict[str, int]] = {}
+    changes: list[tuple[str, str]] = []
+
+    def _count(types, kind: str) -> None:
+        for item in pc.value_counts(types).to_pylist():
+            entry = counts.setdefault(item["values"], {"added": 0, "removed": 0, "modified": 0, "unchanged": 0})
+            entry[kind] += item["counts"]
+
+    sides = [_batches(base_path, typename), _batches(target_path, typename)]
+    buffers: list[list] = [[], []]
+    done = [False, False]
+    while True:
+        for i in (0, 1):
+            if not buffers[i] and not done[i]:
+                nxt = next(sides[i], None)
+                if nxt is None:
+                    done[i] = True
+                else:
+                    buffers[i] = list(nxt)
+        if not buffers[0] and not buffers[1]:
+            break
+        # Everything up to the smaller of the two last names is complete on both sides
+        lasts = [b[0][-1].as_py() for b in buffers if b]
+        bound = min(lasts) if buffers[0] and buffers[1] else max(lasts)
+        windows = []
+        for i in (0, 1):
+            if not buffers[i]:
+                windows.append(None)
+                continue
+            names, types, hashes = buffers[i]
+            n = pc.sum(pc.less_equal(names, bound)).as_py() or 0
+            windows.append((names[:n], types[:n], hashes[:n]))
+            buffers[i] = [names[n:], types[n:], hashes[n:]] if n < len(names) else []
+
+        old, new = windows
+        window_changes: list[tuple[str, str]] = []
+        if old is not None and new is not None and len(old[0]) and len(new[0]):
+            pos = pc.index_in(old[0], value_set=new[0])
+            matched = pc.is_valid(pos)
+            same = pc.fill_null(pc.equal(old[2], pc.take(new[2], pos)), False)
+            removed = pc.invert(matched)
+            modified = pc.and_(matched, pc.invert(same))
+            added = pc.invert(pc.is_in(new[0], value_set=old[0]))
+            _count(old[1].filter(same), "unchanged")
+            _count(old[1].filter(modified), "modified")
+            _count(old[1].filter(removed), "removed")
+            _count(new[1].filter(added), "added")
+            sections = [
+                (old[0].filter(removed), "removed"),
+                (old[0].filter(modified), "modified"),
+                (new[0].filter(added), "added"),
+            ]
+        else:
+            sections = []
+            for window, kind in ((old, "removed"), (new, "added")):
+                if window is not None and len(window[0]):
+                    _count(window[1], kind)
+                    sections.append((window[0], kind))
+        if len(changes) <= limit:
+            for names, kind in sections:
+                window_changes.extend((name, kind) for name in names[: limit + 1].to_pylist())
+            # Keep the listing in (type, key) order across change kinds
+            changes.extend(sorted(window_changes)[: limit + 1 - len(changes)])
+
+    items = [
+        {"type": name.split("\0", 1)[0], "key": name.split("\0", 1)[1], "change": kind}
+        for name, kind in changes[:limit]
+    ]
+    return {"counts": counts, "changes": items, "truncated": len(changes) > limit}
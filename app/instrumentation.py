@@ -0,0 +1,384 @@
+"""Per-activity performance profile: time, rows, bytes, chunks and RSS.
+
+Every registered activity runs inside ``measure`` (see
+``events.tracked_activity``), which records:
+
+- wall time and process CPU time
+- rows in (counted where the activity reads chunks, via ``add``) and rows out
+  (taken from the activity's result when it does not count them itself)
+- bytes read and written locally (the process's read()/write() counters) and
+  to or from the object store (the SDK's upload_file/download_file and the
+  local fast path in app.objectstore; with CHUNK_DEDUP, only the blobs and
+  manifest parts app.chunkstore actually uploads)
+- chunks read from and written to the object store
+- peak RSS above the RSS at the activity's start
+
+Each measurement is emitted as ``activity_*`` metrics and one trace span (the
+trace id is derived from the workflow run, so a run's activities share a
+trace) and folded into the run's profile, which summarize_outputs writes to
+summary.json under ``activities``.
+
+CPU, local I/O and RSS are process-wide: activities that overlap in one worker
+each see the others' share, so read those as upper bounds under concurrency.
+Profiles live in memory; a run spread over several worker processes only
+shows the activities this process ran.
+"""
+
+import contextvars
+import hashlib
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from application_sdk.constants import DEPLOYMENT_OBJECT_STORE_NAME
+from application_sdk.services.objectstore import ObjectStore
+
+ACTIVITY_PROFILING = os.getenv("ACTIVITY_PROFILING", "true").strip().lower() in ("1", "true", "yes", "on")
+RSS_SAMPLE_SECONDS = float(os.getenv("RSS_SAMPLE_SECONDS", "0.05"))
+
+# Runs whose profiles are kept for summarize_outputs
+PROFILE_RUNS = 64
+
+COUNTERS = (
+    "rows_in",
+    "rows_out",
+    "bytes_read",
+    "bytes_written",
+    "objectstore_bytes_read",
+    "objectstore_bytes_written",
+    "chunks_read",
+    "chunks_written",
+)
+
+_current: contextvars.ContextVar[Optional["Measurement"]] = contextvars.ContextVar("activity_measurement", default=None)
+_profiles: "OrderedDict[str, dict[str, dict]]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+_upload_file = ObjectStore.upload_file
+_download_file = ObjectStore.download_file
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _io_counters() -> Optional[tuple[int, int]]:
+    """(rchar, wchar) for this process: bytes passed to read()/write(), cached or not."""
+    try:
+        values = {}
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                values[key] = int(value)
+        return values["rchar"], values["wchar"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _is_chunk(key: str) -> bool:
+    return os.path.basename(key).startswith("chunk-")
+
+
+def _result_rows(result: Any) -> int:
+    """Rows an activity reports producing: record counts, or per-type asset counts."""
+    if isinstance(result, dict):
+        for field in ("total_record_count", "count"):
+            if isinstance(result.get(field), int):
+                return result[field]
+        assets = result.get("assets")
+        if isinstance(assets, dict):
+            return sum(v for v in assets.values() if isinstance(v, int))
+        return 0
+    value = getattr(result, "total_record_count", None)
+    return value if isinstance(value, int) else 0
+
+
+class _RssWatch:
+    """One sampler thread shared by every running measurement."""
+
+    def __init__(self):
+        self._active: set["Measurement"] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, measurement: "Measurement") -> None:
+        with self._lock:
+            self._active.add(measurement)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="activity-rss", daemon=True)
+                self._thread.start()
+
+    def discard(self, measurement: "Measurement") -> None:
+        with self._lock:
+            self._active.discard(measurement)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(RSS_SAMPLE_SECONDS)
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                targets = list(self._active)
+            rss = _rss_bytes()
+            if rss is not None:
+                for measurement in targets:
+                    measurement.observe_rss(rss)
+
+
+_rss_watch = _RssWatch()
+
+
+class Measurement:
+    """Counters for one activity attempt; finished by ``measure``."""
+
+    def __init__(self, activity: str, workflow_id: str, run_id: str):
+        self.activity = activity
+        self.workflow_id = workflow_id
+        self.run_id = run_id
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.result: Any = None
+        self._lock = threading.Lock()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._io = _io_counters()
+        self._rss = _rss_bytes()
+        self._peak = self._rss
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for key, value in counts.items():
+                self.counts[key] += int(value)
+
+    def observe_rss(self, rss: int) -> None:
+        if self._peak is None or rss > self._peak:
+            self._peak = rss
+
+    def finish(self, error: Optional[BaseException] = None) -> dict:
+        rss = _rss_bytes()
+        if rss is not None:
+            self.observe_rss(rss)
+        record = {
+            "activity": self.activity,
+            "status": "error" if error is not None else "ok",
+            "seconds": round(time.perf_counter() - self._wall, 3),
+            "cpu_seconds": round(time.process_time() - self._cpu, 3),
+            **self.counts,
+            "peak_rss_delta_bytes": max(0, self._peak - self._rss) if self._peak is not None and self._rss is not None else None,
+        }
+        if not record["rows_out"] and error is None:
+            record["rows_out"] = _result_rows(self.result)
+        io = _io_counters()
+        if io is not None and self._io is not None:
+            record["bytes_read"] += io[0] - self._io[0]
+            record["bytes_written"] += io[1] - self._io[1]
+        return record
+
+
+class measure:
+    """Context manager measuring one activity attempt; set ``.result`` before leaving."""
+
+    def __init__(self, activity: str, workflow_id: str, run_id: str = ""):
+        self.measurement = Measurement(activity, workflow_id, run_id)
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Measurement:
+        if not ACTIVITY_PROFILING:
+            return self.measurement
+        self._token = _current.set(self.measurement)
+        _rss_watch.add(self.measurement)
+        return self.measurement
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is None:
+            return
+        _rss_watch.discard(self.measurement)
+        _current.reset(self._token)
+        try:
+            record = self.measurement.finish(exc)
+            _fold(self.measurement.workflow_id, record)
+            _emit(self.measurement, record, exc)
+        except Exception:
+            pass
+
+
+def add(**counts: int) -> None:
+    """Add to the running activity's counters (``rows_in=``, ``chunks_read=`` ...); no-op outside one."""
+    measurement = _current.get()
+    if measurement is not None:
+        measurement.add(**counts)
+
+
+def _fold(workflow_id: str, record: dict) -> None:
+    with _profiles_lock:
+        runs = _profiles.pop(workflow_id, None) or {}
+        _profiles[workflow_id] = runs
+        while len(_profiles) > PROFILE_RUNS:
+            _profiles.popitem(last=False)
+        entry = runs.setdefault(
+            record["activity"],
+            {"calls": 0, "failures": 0, "seconds": 0.0, "cpu_seconds": 0.0, **dict.fromkeys(COUNTERS, 0), "peak_rss_delta_bytes": 0},
+        )
+        entry["calls"] += 1
+        if record["status"] != "ok":
+            entry["failures"] += 1
+        entry["seconds"] = round(entry["seconds"] + record["seconds"], 3)
+        entry["cpu_seconds"] = round(entry["cpu_seconds"] + record["cpu_seconds"], 3)
+        for key in COUNTERS:
+            entry[key] += record[key]
+        entry["peak_rss_delta_bytes"] = max(entry["peak_rss_delta_bytes"], record["peak_rss_delta_bytes"] or 0)
+
+
+def run_profile(workflow_id: str) -> dict[str, dict]:
+    """Per-activity totals for a run, slowest first."""
+    with _profiles_lock:
+        runs = _profiles.get(workflow_id) or {}
+        entries = {name: dict(entry) for name, entry in runs.items()}
+    for entry in entries.values():
+        entry["rows_per_second"] = round(entry["rows_out"] / entry["seconds"], 1) if entry["seconds"] else None
+    return dict(sorted(entries.items(), key=lambda item: item[1]["seconds"], reverse=True))
+
+
+def _record_metrics(record: dict) -> None:
+    from application_sdk.observability.metrics_adaptor import MetricType, get_metrics
+
+    metrics = get_metrics()
+    activity = record["activity"]
+    metrics.record_metric(
+        name="activity_duration_seconds",
+        value=record["seconds"],
+        metric_type=MetricType.HISTOGRAM,
+        labels={"activity": activity, "status": record["status"]},
+        description="Wall time of an activity attempt",
+        unit="s",
+    )
+    metrics.record_metric(
+        name="activity_cpu_seconds",
+        value=record["cpu_seconds"],
+        metric_type=MetricType.HISTOGRAM,
+        labels={"activity": activity},
+        description="Process CPU time during an activity attempt",
+        unit="s",
+    )
+    for direction in ("in", "out"):
+        metrics.record_metric(
+            name="activity_rows",
+            value=record[f"rows_{direction}"],
+            metric_type=MetricType.COUNTER,
+            labels={"activity": activity, "direction": direction},
+            description="Rows read and produced by activities",
+            unit="rows",
+        )
+    for prefix, medium in (("", "local"), ("objectstore_", "objectstore")):
+        for direction in ("read", "written"):
+            metrics.record_metric(
+                name="activity_bytes",
+                value=record[f"{prefix}bytes_{direction}"],
+                metric_type=MetricType.COUNTER,
+                labels={"activity": activity, "direction": direction, "medium": medium},
+                description="Bytes read and written by activities",
+                unit="bytes",
+            )
+    for direction in ("read", "written"):
+        metrics.record_metric(
+            name="activity_chunks",
+            value=record[f"chunks_{direction}"],
+            metric_type=MetricType.COUNTER,
+            labels={"activity": activity, "direction": direction},
+            description="Object store chunks read and written by activities",
+            unit="chunks",
+        )
+    if record["peak_rss_delta_bytes"] is not None:
+        metrics.record_metric(
+            name="activity_peak_rss_delta_bytes",
+            value=record["peak_rss_delta_bytes"],
+            metric_type=MetricType.GAUGE,
+            labels={"activity": activity},
+            description="Peak resident memory above the activity's starting RSS",
+            unit="bytes",
+        )
+
+
+def _record_span(measurement: Measurement, record: dict, error: Optional[BaseException]) -> None:
+    from application_sdk.observability.traces_adaptor import get_traces
+
+    attributes = {"workflow_id": measurement.workflow_id, "workflow_run_id": measurement.run_id}
+    attributes.update({k: v for k, v in record.items() if v is not None})
+    get_traces().record_trace(
+        name=f"activity {measurement.activity}",
+        trace_id=hashlib.md5((measurement.run_id or measurement.workflow_id).encode("utf-8")).hexdigest(),
+        span_id=secrets.token_hex(8),
+        kind="INTERNAL",
+        status_code="ERROR" if error is not None else "OK",
+        status_message=(str(error) or type(error).__name__) if error is not None else None,
+        attributes=attributes,
+        duration_ms=record["seconds"] * 1000,
+    )
+
+
+def _emit(measurement: Measurement, record: dict, error: Optional[BaseException]) -> None:
+    try:
+        _record_metrics(record)
+    except Exception:
+        pass
+    try:
+        _record_span(measurement, record, error)
+    except Exception:
+        pass
+
+
+async def _upload_file_counted(
+    cls,
+    source: str,
+    destination: str,
+    store_name: str = DEPLOYMENT_OBJECT_STORE_NAME,
+    retain_local_copy: bool = False,
+) -> None:
+    from .chunkstore import handles
+
+    if handles(destination):
+        # The content-addressed store counts what it really uploads (new blobs, manifest parts)
+        await _upload_file(source, destination, store_name, retain_local_copy)
+        return
+    size = _file_size(source)
+    await _upload_file(source, destination, store_name, retain_local_copy)
+    add(objectstore_bytes_written=size, chunks_written=1 if _is_chunk(destination) else 0)
+
+
+async def _download_file_counted(
+    cls,
+    source: str,
+    destination: str,
+    store_name: str = DEPLOYMENT_OBJECT_STORE_NAME,
+) -> None:
+    await _download_file(source, destination, store_name)
+    add(objectstore_bytes_read=_file_size(destination), chunks_read=1 if _is_chunk(destination) else 0)
+
+
+def install() -> None:
+    """Count object store traffic into the running activity's profile.
+
+    Wraps whatever ``upload_file`` is installed at the time (the chunk store's,
+    with CHUNK_DEDUP), so call it after ``chunkstore.install``.
+    """
+    global _upload_file, _download_file
+    if not ACTIVITY_PROFILING or ObjectStore.upload_file.__func__ is _upload_file_counted:
+        return
+    _upload_file = ObjectStore.upload_file
+    _download_file = ObjectStore.download_file
+    ObjectStore.upload_file = classmethod(_upload_file_counted)  # type: ignore[method-assign]
+    ObjectStore.download_file = classmethod(_download_file_counted)  # type: ignore[method-assign]
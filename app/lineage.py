@@ -0,0 +1,309 @@
+"""Precomputed lineage graph index.
+
+Lineage edges (FK column->column and table->view dependencies) are interned
+into integer node ids and stored as CSR adjacency arrays in both directions in
+a single memory-mappable file, output/<workflow_id>/lineage.idx. Queries walk
+only the edges they visit, so an upstream/downstream lookup costs
+O(log nodes + edges visited) regardless of graph size.
+
+File layout (little-endian, every section 8-byte aligned)::
+
+    header       magic "LGIDX001", n_nodes u64, n_edges u64, names_len u64
+    name_offs    u64[n_nodes + 1]   byte offsets into names (sorted UTF-8)
+    names        bytes[names_len]
+    fwd_indptr   u64[n_nodes + 1]   edges from -> to
+    fwd_indices  u32[n_edges]
+    fwd_kinds    u8[n_edges]
+    rev_indptr   u64[n_nodes + 1]   edges to -> from
+    rev_indices  u32[n_edges]
+    rev_kinds    u8[n_edges]
+
+Edge direction is as exported: fromQualifiedName -> toQualifiedName, so
+"downstream" follows stored edges and "upstream" walks them backwards.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict, deque
+from typing import Iterable, Optional
+
+LINEAGE_INDEX_FILENAME = "lineage.idx"
+
+MAGIC = b"LGIDX001"
+_HEADER = struct.Struct("<8sQQQ")
+
+# Edge kind ids stored per edge, and the asset type each kind is built from
+EDGE_KINDS = ["fk_lineage", "view_dependency"]
+EDGE_SOURCES = ["relationship", "view_dependency"]
+
+
+def lineage_index_path(out_dir: str) -> str:
+    return os.path.join(out_dir, LINEAGE_INDEX_FILENAME)
+
+
+def edges_from_frame(df, typename: str, connection_qualified_name: str = ""):
+    """Return (from, to) name lists for a relationship/view_dependency chunk.
+
+    Accepts both transformed rows (fromQualifiedName/toQualifiedName) and raw
+    rows (src_*/dst_* columns), which the exporters fall back to.
+    """
+    if "fromQualifiedName" in df.columns and "toQualifiedName" in df.columns:
+        return df["fromQualifiedName"].astype(str).tolist(), df["toQualifiedName"].astype(str).tolist()
+    parts = ["catalog_name", "schema_name", "table_name"]
+    if typename == "relationship":
+        parts.append("column_name")
+    src_cols = [f"src_{p}" for p in parts]
+    dst_cols = [f"dst_{p}" for p in parts]
+    if not all(c in df.columns for c in src_cols + dst_cols):
+        return [], []
+    prefix = f"{connection_qualified_name}/"
+
+    def _names(cols: list[str]) -> list[str]:
+        joined = df[cols[0]].astype(str)
+        for c in cols[1:]:
+            joined = joined + "/" + df[c].astype(str)
+        return (prefix + joined).tolist()
+
+    return _names(src_cols), _names(dst_cols)
+
+
+def _pad(f, written: int) -> int:
+    extra = (-written) % 8
+    if extra:
+        f.write(b"\0" * extra)
+    return written + extra
+
+
+def write_lineage_index(
+    edges: Iterable[tuple[list[str], list[str], int]], path: str
+) -> dict:
+    """Build and atomically write the index from (from, to, kind) batches."""
+    import numpy as np
+
+    src_names: list[str] = []
+    dst_names: list[str] = []
+    kinds: list[np.ndarray] = []
+    for frm, to, kind in edges:
+        if not frm:
+            continue
+        src_names.extend(frm)
+        dst_names.extend(to)
+        kinds.append(np.full(len(frm), kind, dtype=np.uint8))
+
+    m_in = len(src_names)
+    if m_in:
+        names, inverse = np.unique(np.array(src_names + dst_names, dtype=object), return_inverse=True)
+        src = inverse[:m_in].astype(np.uint32)
+        dst = inverse[m_in:].astype(np.uint32)
+        kind = np.concatenate(kinds)
+        # Drop duplicate and self edges
+        keep = src != dst
+        src, dst, kind = src[keep], dst[keep], kind[keep]
+        key = (src.astype(np.uint64) << np.uint64(32)) | dst.astype(np.uint64)
+        _, first = np.unique(key, return_index=True)
+        src, dst, kind = src[first], dst[first], kind[first]
+    else:
+        names = np.array([], dtype=object)
+        src = dst = np.array([], dtype=np.uint32)
+        kind = np.array([], dtype=np.uint8)
+    n, m = len(names), len(src)
+
+    encoded = [str(nm).encode("utf-8") for nm in names]
+    name_offs = np.zeros(n + 1, dtype=np.uint64)
+    if n:
+        name_offs[1:] = np.cumsum([len(b) for b in encoded], dtype=np.uint64)
+    blob = b"".join(encoded)
+
+    def _csr(a, b):
+        order = np.argsort(a, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.uint64)
+        if m:
+            indptr[1:] = np.cumsum(np.bincount(a, minlength=n), dtype=np.uint64)
+        return indptr, b[order].astype(np.uint32), kind[order].astype(np.uint8)
+
+    fwd = _csr(src, dst)
+    rev = _csr(dst, src)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, n, m, len(blob)))
+            f.write(name_offs.astype("<u8").tobytes())
+            _pad(f, f.write(blob))
+            for indptr, indices, kinds_arr in (fwd, rev):
+                f.write(indptr.astype("<u8").tobytes())
+                _pad(f, f.write(indices.astype("<u4").tobytes()))
+                _pad(f, f.write(kinds_arr.tobytes()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+    return {"nodes": n, "edges": m, "path": path}
+
+
+class _Names:
+    """Sequence view over the sorted name table for bisect."""
+
+    def __init__(self, index: "LineageIndex"):
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._index.n_nodes
+
+    def __getitem__(self, i: int) -> str:
+        return self._index.name(i)
+
+
+class LineageIndex:
+    """Read-only, memory-mapped view of a lineage.idx file."""
+
+    def __init__(self, path: str):
+        import numpy as np
+
+        self.path = path
+        # The mapping outlives the descriptor; no need to keep the file open
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, m, names_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a lineage index: {path}")
+        self.n_nodes, self.n_edges = n, m
+
+        pos = _HEADER.size
+
+        def _take(dtype, count: int):
+            nonlocal pos
+            arr = np.frombuffer(self._mm, dtype=dtype, count=count, offset=pos)
+            pos += arr.nbytes
+            pos += (-pos) % 8
+            return arr
+
+        self._name_offs = _take("<u8", n + 1)
+        self._names_start = pos
+        pos += names_len + ((-names_len) % 8)
+        self._adj = {}
+        for direction in ("downstream", "upstream"):
+            indptr = _take("<u8", n + 1)
+            indices = _take("<u4", m)
+            kinds = _take("u1", m)
+            self._adj[direction] = (indptr, indices, kinds)
+
+    def close(self) -> None:
+        self._adj = {}
+        self._name_offs = None
+        try:
+            self._mm.close()
+        except BufferError:
+            # numpy views still alive; the mapping is freed when they are
+            pass
+
+    def name(self, node_id: int) -> str:
+        a = int(self._name_offs[node_id])
+        b = int(self._name_offs[node_id + 1])
+        return self._mm[self._names_start + a:self._names_start + b].decode("utf-8")
+
+    def lookup(self, name: str) -> list[int]:
+        """Node ids for ``name`` itself plus every node under ``name/``.
+
+        A table therefore matches both its view-dependency node and its
+        FK columns.
+        """
+        names = _Names(self)
+        name = name.rstrip("/")
+        ids: list[int] = []
+        i = bisect.bisect_left(names, name)
+        if i < self.n_nodes and names[i] == name:
+            ids.append(i)
+        lo = bisect.bisect_left(names, name + "/", i)
+        # "0" sorts right after "/", bounding the prefix range
+        hi = bisect.bisect_left(names, name + "0", lo)
+        ids.extend(range(lo, hi))
+        return ids
+
+    def traverse(
+        self, name: str, direction: str = "downstream", depth: int = 1, limit: int = 1000
+    ) -> Optional[dict]:
+        """Breadth-first walk up to ``depth`` hops; None if ``name`` is unknown."""
+        if direction not in self._adj:
+            raise ValueError(f"Unknown direction: {direction}")
+        seeds = self.lookup(name)
+        if not seeds:
+            return None
+        indptr, indices, kinds = self._adj[direction]
+        seen: dict[int, int] = {s: 0 for s in seeds}
+        edges: list[tuple[int, int, int]] = []
+        queue = deque(seeds)
+        truncated = False
+        while queue:
+            node = queue.popleft()
+            d = seen[node]
+            if d >= depth:
+                continue
+            start, end = int(indptr[node]), int(indptr[node + 1])
+            for j in range(start, end):
+                nbr = int(indices[j])
+                edges.append((node, nbr, int(kinds[j])))
+                if nbr not in seen:
+                    if len(seen) >= limit:
+                        truncated = True
+                        continue
+                    seen[nbr] = d + 1
+                    queue.append(nbr)
+        if direction == "upstream":
+            edges = [(b, a, k) for a, b, k in edges]
+        return {
+            "node": name,
+            "direction": direction,
+            "depth": depth,
+            "nodes": [{"name": self.name(i), "depth": d} for i, d in seen.items()],
+            "edges": [
+                {"from": self.name(a), "to": self.name(b), "type": EDGE_KINDS[k]}
+                for a, b, k in edges
+                if a in seen and b in seen
+            ],
+            "truncated": truncated,
+        }
+
+
+# Most recently used indexes (path -> (mtime, index)). Evicted entries are only
+# dropped, never closed: a request may be between opening and traversing one,
+# and the mapping is released with the last reference to it.
+LINEAGE_INDEX_CACHE = 16
+_open_indexes: "OrderedDict[str, tuple[float, LineageIndex]]" = OrderedDict()
+_open_lock = threading.Lock()
+
+
+def open_lineage_index(path: str) -> Optional[LineageIndex]:
+    """Return a cached LineageIndex for ``path``, reopening when it changes."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _open_lock:
+        cached = _open_indexes.get(path)
+        if cached and cached[0] == mtime:
+            _open_indexes.move_to_end(path)
+            return cached[1]
+        index = LineageIndex(path)
+        _open_indexes[path] = (mtime, index)
+        _open_indexes.move_to_end(path)
+        while len(_open_indexes) > LINEAGE_INDEX_CACHE:
+            _open_indexes.popitem(last=False)
+    return index
+
+
+def invalidate(out_dir: str) -> None:
+    """Drop the cached lineage indexes of a run directory (before it is deleted)."""
+    root = os.path.join(os.path.abspath(out_dir), "")
+    with _open_lock:
+        for path in [p for p in _open_indexes if os.path.abspath(p).startswith(root)]:
+            del _open_indexes[path]
@@ -0,0 +1,170 @@
+"""Sparse line-offset index for large text exports.
+
+output.txt.lines records the byte offset of every LINE_INDEX_STRIDE-th line
+of output.txt, so a head/tail/line-window read seeks straight to the right
+block and scans at most one stride of lines instead of the whole file:
+
+    header    magic "LNIDX001", stride u64, n_lines u64, file_size u64
+    offsets   u64[ceil(n_lines / stride)]   offset of line 0, stride, 2*stride, ...
+
+The index is written by write_text_output and rebuilt on demand when it is
+missing or does not match the file's size.
+"""
+
+import os
+import struct
+from array import array
+from typing import Iterator, Optional
+
+LINE_INDEX_SUFFIX = ".lines"
+LINE_INDEX_STRIDE = 1024
+
+MAGIC = b"LNIDX001"
+_HEADER = struct.Struct("<8sQQQ")
+
+_READ_SIZE = 1024 * 1024
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def line_index_path(path: str) -> str:
+    return path + LINE_INDEX_SUFFIX
+
+
+def build_line_index(path: str, stride: int = LINE_INDEX_STRIDE) -> dict:
+    """Scan ``path`` once and atomically write its line index next to it."""
+    import numpy as np
+
+    offsets = array("Q", [0])
+    newlines = 0
+    size = 0
+    last = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_READ_SIZE)
+            if not block:
+                break
+            ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+            # Line k starts right after newline k; keep those where k % stride == 0
+            numbers = np.arange(newlines + 1, newlines + 1 + len(ends))
+            picked = ends[numbers % stride == 0]
+            offsets.extend(int(size + e + 1) for e in picked)
+            newlines += len(ends)
+            size += len(block)
+            last = block[-1:]
+    # A final line without a trailing newline still counts
+    n_lines = newlines + (1 if size and last != b"\n" else 0)
+    # Keep one offset per started block; drops an offset recorded at EOF
+    del offsets[-(-n_lines // stride):]
+
+    index_path = line_index_path(path)
+    tmp = index_path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, stride, n_lines, size))
+            f.write(offsets.tobytes())
+        os.replace(tmp, index_path)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+    return {"lines": n_lines, "path": index_path}
+
+
+class LineIndex:
+    def __init__(self, stride: int, n_lines: int, size: int, offsets: array):
+        self.stride = stride
+        self.n_lines = n_lines
+        self.size = size
+        self.offsets = offsets
+
+
+def load_line_index(path: str) -> Optional[LineIndex]:
+    """Return the index for ``path``, rebuilding it when missing or stale."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    index_path = line_index_path(path)
+    for attempt in range(2):
+        try:
+            with open(index_path, "rb") as f:
+                magic, stride, n_lines, indexed_size = _HEADER.unpack(f.read(_HEADER.size))
+                if magic == MAGIC and indexed_size == size:
+                    offsets = array("Q")
+                    offsets.frombytes(f.read())
+                    return LineIndex(stride, n_lines, size, offsets)
+        except (OSError, struct.error):
+            pass
+        if attempt == 0:
+            try:
+                build_line_index(path)
+            except OSError:
+                return None
+    return None
+
+
+def _offset_of_line(f, index: LineIndex, line: int) -> int:
+    """Byte offset where ``line`` (0-based) starts; file size past the end."""
+    if line >= index.n_lines:
+        return index.size
+    block, skip = divmod(line, index.stride)
+    pos = index.offsets[block]
+    f.seek(pos)
+    while skip:
+        chunk = f.read(_STREAM_CHUNK_SIZE)
+        if not chunk:
+            return index.size
+        start = 0
+        while skip:
+            nl = chunk.find(b"\n", start)
+            if nl < 0:
+                break
+            skip -= 1
+            start = nl + 1
+        if skip == 0:
+            return pos + start
+        pos += len(chunk)
+    return pos
+
+
+def line_window(
+    path: str,
+    head: Optional[int] = None,
+    tail: Optional[int] = None,
+    start: int = 0,
+) -> Optional[tuple[int, int, int, int, int]]:
+    """Resolve a window to (first_line, last_line_exclusive, total, byte_start, byte_end).
+
+    ``tail`` takes the last N lines; otherwise ``head`` lines from ``start``
+    (all remaining lines when ``head`` is None).
+    """
+    index = load_line_index(path)
+    if index is None:
+        return None
+    total = index.n_lines
+    if tail is not None:
+        first = max(total - max(tail, 0), 0)
+        last = total
+    else:
+        first = min(max(start, 0), total)
+        last = total if head is None else min(first + max(head, 0), total)
+    with open(path, "rb") as f:
+        byte_start = _offset_of_line(f, index, first)
+        byte_end = index.size if last >= total else _offset_of_line(f, index, last)
+    return first, last, total, byte_start, byte_end
+
+
+def iter_bytes(path: str, byte_start: int, byte_end: int) -> Iterator[bytes]:
+    """Stream ``path[byte_start:byte_end]`` in fixed-size chunks."""
+    with open(path, "rb") as f:
+        f.seek(byte_start)
+        remaining = byte_end - byte_start
+        while remaining > 0:
+            chunk = f.read(min(_STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
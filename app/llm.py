@@ -0,0 +1,189 @@
+"""Shared chat-completions client for the Groq-backed endpoints.
+
+One pooled ``httpx.AsyncClient`` is created at app startup and reused by every
+request, so connections (HTTP/2, through the ``httpx[http2]`` dependency)
+stay warm between calls. Candidate models are hedged: when the
+first candidate has not answered within ``LLM_HEDGE_DELAY_SECONDS`` the next
+one is fired alongside it, and the first non-empty answer wins. Failures with
+a retryable status move on to the next candidate immediately.
+
+The base URL and the httpx transport are injectable, so the client can be
+pointed at a local stub server or an ``httpx.MockTransport`` in tests.
+"""
+
+import asyncio
+import os
+from typing import Any, Optional
+
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
+# 0 disables hedging: candidates are tried strictly one after another
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
+RETRYABLE_STATUSES = (429, 500, 502, 503)
+
+Result = tuple[int, dict]
+
+
+def _http2_available() -> bool:
+    # h2 ships with httpx[http2]; fall back to HTTP/1.1 if an install lacks it
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+class LLMClient:
+    """Pooled, hedged chat-completions client."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = GROQ_BASE_URL,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        hedge_delay: float = LLM_HEDGE_DELAY_SECONDS,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        http2: bool = True,
+        transport: Optional[Any] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.max_connections = max_connections
+        self.http2 = http2 and transport is None and _http2_available()
+        self.transport = transport
+        self._client = None
+        self.stats = {"requests": 0, "hedged": 0, "failovers": 0, "errors": 0}
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            transport=self.transport,
+        )
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    def _key(self) -> str:
+        # Read per call so a key exported after startup is still picked up
+        return self.api_key if self.api_key is not None else os.getenv("GROQ_API_KEY", "").strip()
+
+    async def _complete(
+        self, model: str, messages: list[dict], max_tokens: int, temperature: float
+    ) -> tuple[str, int, Any]:
+        """One attempt: ("ok", 200, content) or ("error", status, details)."""
+        try:
+            resp = await self._client.post(
+                "/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self._key()}",
+                    "Content-Type": "application/json",
+                },
+                json={"model": model, "temperature": temperature, "max_tokens": max_tokens, "messages": messages},
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return "error", 0, str(e)
+        if resp.status_code == 200:
+            try:
+                data = resp.json()
+                content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            except Exception:
+                content = ""
+            return "ok", 200, content or ""
+        return "error", resp.status_code, resp.text
+
+    async def chat(
+        self,
+        messages: list[dict],
+        models: list[str],
+        max_tokens: int,
+        temperature: float = 0.2,
+    ) -> Result:
+        """Return (200, {"content", "model"}) or (502, {"error", "details"}).
+
+        A non-retryable upstream status stops further candidates and yields an
+        empty answer, which the endpoints sanitize into a fallback diagram.
+        """
+        await self.start()
+        self.stats["requests"] += 1
+        pending: dict[asyncio.Task, str] = {}
+        remaining = list(models)
+        empty: Optional[Result] = None
+        last_status: Optional[int] = None
+        last_details: Any = None
+        stop_launching = False
+
+        def _launch() -> None:
+            model = remaining.pop(0)
+            task = asyncio.ensure_future(self._complete(model, messages, max_tokens, temperature))
+            pending[task] = model
+
+        try:
+            if remaining:
+                _launch()
+            while pending:
+                hedge = self.hedge_delay > 0 and bool(remaining) and not stop_launching
+                done, _ = await asyncio.wait(
+                    list(pending),
+                    timeout=self.hedge_delay if hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Slow candidate: fire the next one alongside it
+                    self.stats["hedged"] += 1
+                    _launch()
+                    continue
+                failed = False
+                for task in done:
+                    model = pending.pop(task)
+                    outcome, status, value = task.result()
+                    if outcome == "ok":
+                        if value:
+                            return 200, {"content": value, "model": model}
+                        empty = empty or (200, {"content": "", "model": model})
+                        continue
+                    last_status, last_details = status, value
+                    failed = True
+                    if status and status not in RETRYABLE_STATUSES:
+                        stop_launching = True
+                if remaining and not stop_launching and (failed or not pending):
+                    self.stats["failovers"] += 1
+                    _launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if empty is not None:
+            return empty
+        if stop_launching:
+            return 200, {"content": "", "model": None}
+        self.stats["errors"] += 1
+        if last_status:
+            return 502, {"error": f"groq error {last_status}", "details": last_details}
+        return 502, {"error": "request failed", "details": last_details}
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "hedge_delay_seconds": self.hedge_delay,
+            "max_connections": self.max_connections,
+        }
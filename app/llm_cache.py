@@ -0,0 +1,140 @@
+"""Content-addressed cache for the LLM-backed endpoints.
+
+Responses are keyed by a hash of everything that shapes them: endpoint name,
+the exact prompt messages, the model candidate list and generation
+parameters. Entries live in an in-memory LRU and are persisted per workflow
+under output/<workflow_id>/cache/llm/<key>.json so they survive restarts.
+Concurrent identical requests share one upstream call through an in-flight
+future.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from .blocking import run_blocking
+
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+
+CACHE_DIRNAME = os.path.join("cache", "llm")
+
+Result = tuple[int, dict]
+
+
+def cache_key(endpoint: str, messages: list[dict], models: list[str], **params: Any) -> str:
+    payload = {"endpoint": endpoint, "messages": messages, "models": models, "params": params}
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """In-memory LRU with per-workflow disk persistence and request coalescing."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "stores": 0,
+        }
+
+    def _remember(self, key: str, value: dict) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    @staticmethod
+    def _disk_path(workflow_dir: str, key: str) -> str:
+        return os.path.join(workflow_dir, CACHE_DIRNAME, f"{key}.json")
+
+    def _load(self, workflow_dir: str, key: str) -> Optional[dict]:
+        path = self._disk_path(workflow_dir, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _persist(self, workflow_dir: str, key: str, value: dict) -> None:
+        path = self._disk_path(workflow_dir, key)
+        tmp = path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            except Exception:
+                pass
+
+    async def get_or_compute(
+        self,
+        key: str,
+        workflow_dir: str,
+        compute: Callable[[], Awaitable[Result]],
+        cacheable: Callable[[Result], bool] = lambda r: r[0] == 200,
+    ) -> tuple[Result, str]:
+        """Return (result, source) where source is memory, disk, shared or upstream."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return (200, self._entries[key]), "memory"
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending), "shared"
+
+        # Claim the key before the disk lookup so concurrent callers wait on it
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            stored = await run_blocking(self._load, workflow_dir, key)
+            if stored is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(key, stored)
+                future.set_result((200, stored))
+                return (200, stored), "disk"
+
+            self.stats["misses"] += 1
+            result = await compute()
+            if cacheable(result):
+                self._remember(key, result[1])
+                await run_blocking(self._persist, workflow_dir, key, result[1])
+                self.stats["stores"] += 1
+            future.set_result(result)
+            return result, "upstream"
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting; mark the exception retrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"] + self.stats["coalesced"]
+        served = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,230 @@
+"""Opt-in tracemalloc profiling of activities, for tracking down memory growth.
+
+Enable it with MEMORY_PROFILING (``true`` for every activity, or a
+comma-separated list of activity names) or per run with ``memory_profile`` in
+the workflow args (same values, or a list). A profiled activity gets
+tracemalloc snapshots at its start, at chunk boundaries (``checkpoint``
+calls where exporters and transforms move to the next chunk) and at its end,
+and writes output/<workflow_id>/profile/<activity>-<unix time>-<n>.json with:
+
+- ``peak_traced_bytes``: tracemalloc's high-water mark since tracing started
+  (process-wide, see below)
+- ``top_growth``: the top MEMORY_PROFILE_TOP allocation sites by growth, end vs start
+- ``checkpoints``: traced and peak bytes at each chunk boundary, with the top
+  sites grown since the start (at most MEMORY_PROFILE_MAX_CHECKPOINTS snapshots)
+
+tracemalloc is process-wide: it runs while any profiled activity does, and
+overlapping activities see each other's allocations. Its peak is reset only
+when the first of them starts, so with overlapping profiles the reported
+peaks are the process's high-water mark since then, not each activity's own. When profiling is off,
+tracemalloc is never started and ``checkpoint`` returns on an integer check.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Optional
+
+MEMORY_PROFILING = os.getenv("MEMORY_PROFILING", "").strip()
+MEMORY_PROFILE_TOP = int(os.getenv("MEMORY_PROFILE_TOP", "25"))
+MEMORY_PROFILE_FRAMES = int(os.getenv("MEMORY_PROFILE_FRAMES", "1"))
+MEMORY_PROFILE_MAX_CHECKPOINTS = int(os.getenv("MEMORY_PROFILE_MAX_CHECKPOINTS", "50"))
+
+PROFILE_DIRNAME = "profile"
+# Sites listed per checkpoint; the end-of-activity diff gets MEMORY_PROFILE_TOP
+CHECKPOINT_TOP = 10
+
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+_current: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar("memory_profile", default=None)
+_active = 0
+_lock = threading.Lock()
+_seq = itertools.count(1)
+
+
+def _selection(value: Any) -> Optional[set[str] | bool]:
+    """True (all activities), a set of names, or None (off) from an env/arg value."""
+    if value is None or value is False:
+        return None
+    if value is True:
+        return True
+    if isinstance(value, (list, tuple, set)):
+        names = {str(v).strip() for v in value if str(v).strip()}
+        return names or None
+    text = str(value).strip()
+    if text.lower() in ("", "0", "false", "no", "off"):
+        return None
+    if text.lower() in ("1", "true", "yes", "on", "all"):
+        return True
+    return {name.strip() for name in text.split(",") if name.strip()} or None
+
+
+_ENV_SELECTION = _selection(MEMORY_PROFILING)
+
+
+def enabled_for(activity: str, workflow_args: Optional[dict]) -> bool:
+    for selection in (_ENV_SELECTION, _selection((workflow_args or {}).get("memory_profile"))):
+        if selection is True or (selection and activity in selection):
+            return True
+    return False
+
+
+def _start_tracing() -> None:
+    global _active
+    with _lock:
+        if _active == 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(max(1, MEMORY_PROFILE_FRAMES))
+            # Only the first profile resets it; a reset would hide a running one's peak
+            tracemalloc.reset_peak()
+        _active += 1
+
+
+def _stop_tracing() -> None:
+    global _active
+    with _lock:
+        _active -= 1
+        if _active == 0:
+            tracemalloc.stop()
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+
+def _top_growth(current: tracemalloc.Snapshot, base: tracemalloc.Snapshot, limit: int) -> list[dict]:
+    key_type = "traceback" if MEMORY_PROFILE_FRAMES > 1 else "lineno"
+    sites = []
+    for stat in current.compare_to(base, key_type)[:limit]:
+        frames = stat.traceback
+        sites.append({
+            "site": f"{frames[0].filename}:{frames[0].lineno}" if len(frames) else "?",
+            "traceback": [f"{f.filename}:{f.lineno}" for f in frames] if len(frames) > 1 else None,
+            "size_diff": stat.size_diff,
+            "size": stat.size,
+            "count_diff": stat.count_diff,
+            "count": stat.count,
+        })
+    return sites
+
+
+class Profile:
+    """Snapshots for one profiled activity attempt."""
+
+    def __init__(self, activity: str, workflow_id: str, attempt: int):
+        self.activity = activity
+        self.workflow_id = workflow_id
+        self.attempt = attempt
+        self.checkpoints: list[dict] = []
+        self.skipped_checkpoints = 0
+        self._started = time.perf_counter()
+        self._base: Optional[tracemalloc.Snapshot] = None
+        self._start_bytes = 0
+
+    def begin(self) -> None:
+        _start_tracing()
+        self._base = _snapshot()
+        self._start_bytes = tracemalloc.get_traced_memory()[0]
+
+    def checkpoint(self, label: str) -> None:
+        if self._base is None:
+            return
+        if len(self.checkpoints) >= MEMORY_PROFILE_MAX_CHECKPOINTS:
+            self.skipped_checkpoints += 1
+            return
+        traced, peak = tracemalloc.get_traced_memory()
+        self.checkpoints.append({
+            "label": label,
+            "seconds": round(time.perf_counter() - self._started, 3),
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+            "top_growth": _top_growth(_snapshot(), self._base, CHECKPOINT_TOP),
+        })
+
+    def end(self, error: Optional[BaseException]) -> dict:
+        try:
+            traced, peak = tracemalloc.get_traced_memory()
+            top = _top_growth(_snapshot(), self._base, MEMORY_PROFILE_TOP) if self._base is not None else []
+        finally:
+            _stop_tracing()
+        return {
+            "activity": self.activity,
+            "workflow_id": self.workflow_id,
+            "attempt": self.attempt,
+            "status": "error" if error is not None else "ok",
+            "seconds": round(time.perf_counter() - self._started, 3),
+            "start_traced_bytes": self._start_bytes,
+            "end_traced_bytes": traced,
+            "peak_traced_bytes": peak,
+            "frames": max(1, MEMORY_PROFILE_FRAMES),
+            "top_growth": top,
+            "checkpoints": self.checkpoints,
+            "skipped_checkpoints": self.skipped_checkpoints,
+        }
+
+
+def profile_dir(out_dir: str) -> str:
+    return os.path.join(out_dir, PROFILE_DIRNAME)
+
+
+def _write(workflow_id: str, report: dict) -> str:
+    from .runs import registry
+
+    target = profile_dir(os.path.join("output", workflow_id))
+    os.makedirs(target, exist_ok=True)
+    name = f"{report['activity']}-{int(time.time())}-{next(_seq)}.json"
+    path = os.path.join(target, name)
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, path)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+    registry.record(workflow_id, f"{PROFILE_DIRNAME}/{name}")
+    return path
+
+
+class profile:
+    """Context manager profiling one activity attempt when enabled for it; otherwise does nothing."""
+
+    def __init__(self, activity: str, workflow_id: str, attempt: int = 1, workflow_args: Optional[dict] = None):
+        self._profile = Profile(activity, workflow_id, attempt) if enabled_for(activity, workflow_args) else None
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Optional[Profile]:
+        if self._profile is not None:
+            self._profile.begin()
+            self._token = _current.set(self._profile)
+        return self._profile
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._profile is None:
+            return
+        _current.reset(self._token)
+        try:
+            _write(self._profile.workflow_id, self._profile.end(exc))
+        except Exception:
+            pass
+
+
+def checkpoint(label: str) -> None:
+    """Snapshot the running profiled activity at a chunk boundary; no-op when none is."""
+    if not _active:
+        return
+    current = _current.get()
+    if current is not None:
+        current.checkpoint(label)
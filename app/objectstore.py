@@ -0,0 +1,173 @@
+"""Object store helpers with a zero-copy fast path for local backends.
+
+When the Dapr object store is a local filesystem binding whose root lives on
+the same filesystem as TEMPORARY_PATH, "downloading" a key only needs to make
+the stored file visible at the local path. Chunks are reflinked (copy-on-write
+clone) where the filesystem supports it, so chunk downloads become metadata
+operations instead of byte copies; other files, and chunks on filesystems
+without reflinks, are copied. Anything else goes through the SDK's
+ObjectStore as before.
+
+Hardlinking chunks is opt-in (LOCAL_OBJECT_STORE_HARDLINK): a hardlink is the
+stored object itself, so it is only safe when nothing ever rewrites a store
+object's local path. The SDK's ParquetOutput/JsonOutput open their chunk
+files with "w" (a retried fetch or transform writes the same names again),
+which would then rewrite the stored object in place.
+
+With CHUNK_DEDUP on, chunk keys listed in a run's manifest parts are fetched
+from the content-addressed store instead (see app.chunkstore).
+"""
+
+import os
+import shutil
+from typing import Optional
+
+from application_sdk.constants import TEMPORARY_PATH
+from application_sdk.observability.logger_adaptor import get_logger
+from application_sdk.services.objectstore import ObjectStore
+
+from . import instrumentation
+
+logger = get_logger(__name__)
+
+# Root directory of the Dapr localstorage binding (its ``rootPath`` metadata).
+# Leave unset for remote stores; the SDK download path is used then.
+LOCAL_OBJECT_STORE_PATH = os.getenv("LOCAL_OBJECT_STORE_PATH", "").strip()
+
+# Hardlink chunks when reflinks are unsupported; see the module docstring for when that is safe
+LOCAL_OBJECT_STORE_HARDLINK = os.getenv("LOCAL_OBJECT_STORE_HARDLINK", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# linux/fs.h: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+
+def _local_root() -> Optional[str]:
+    if not LOCAL_OBJECT_STORE_PATH:
+        return None
+    root = os.path.abspath(LOCAL_OBJECT_STORE_PATH)
+    return root if os.path.isdir(root) else None
+
+
+def _same_filesystem(a: str, b: str) -> bool:
+    try:
+        return os.stat(a).st_dev == os.stat(b).st_dev
+    except OSError:
+        return False
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Clone src into dst sharing extents (btrfs/xfs/overlay on supporting kernels)."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return True
+    except OSError:
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+        return False
+
+
+def _materialize(src: str, dst: str) -> str:
+    """Make ``src`` available at ``dst`` without copying bytes when possible.
+
+    Only ``chunk-*`` files are shared with the store, as reflinks (a write to
+    ``dst`` gets its own extents) or, with LOCAL_OBJECT_STORE_HARDLINK,
+    hardlinks. Anything else (``statistics.json.ignore`` is rewritten in place
+    by the SDK) is copied, so a local edit cannot reach the stored file.
+
+    Returns the method used: "present", "reflink", "hardlink" or "copy".
+    """
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    try:
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            return "present"
+    except OSError:
+        pass
+    tmp = dst + ".link"
+    try:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    except OSError:
+        pass
+    if not os.path.basename(dst).startswith("chunk-"):
+        method = "copy"
+        shutil.copyfile(src, tmp)
+    elif _reflink(src, tmp):
+        method = "reflink"
+    elif not LOCAL_OBJECT_STORE_HARDLINK:
+        method = "copy"
+        shutil.copyfile(src, tmp)
+    else:
+        method = "hardlink"
+        try:
+            os.link(src, tmp)
+        except OSError:
+            # Cross-device or unsupported; a plain copy still beats a Dapr round-trip
+            method = "copy"
+            shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+    return method
+
+
+async def download_prefix(source: str, destination: str = TEMPORARY_PATH) -> None:
+    """Drop-in for ObjectStore.download_prefix with the local fast path.
+
+    Keys are laid out as ``<root>/<key>`` by the local binding and as
+    ``<destination>/<key>`` by the SDK, so the walk mirrors one onto the other.
+    """
+    from .chunkstore import CHUNK_DEDUP, resolve_prefix
+
+    root = _local_root()
+    if root:
+        os.makedirs(destination, exist_ok=True)
+    if not root or not _same_filesystem(root, destination):
+        # With CHUNK_DEDUP the SDK call is routed through the manifests too
+        await ObjectStore.download_prefix(source=source, destination=destination)
+        return
+
+    resolved = await resolve_prefix(source) if CHUNK_DEDUP else []
+    for blob, key in resolved:
+        await download_file(blob, os.path.join(destination, key))
+
+    src_dir = os.path.join(root, source)
+    if not os.path.isdir(src_dir):
+        if not resolved:
+            await ObjectStore.download_prefix(source=source, destination=destination)
+        return
+
+    counts: dict[str, int] = {}
+    size = chunks = 0
+    for dirpath, _, filenames in os.walk(src_dir):
+        for name in filenames:
+            src = os.path.join(dirpath, name)
+            key = os.path.relpath(src, root)
+            method = _materialize(src, os.path.join(destination, key))
+            counts[method] = counts.get(method, 0) + 1
+            size += os.path.getsize(src)
+            chunks += name.startswith("chunk-")
+    instrumentation.add(objectstore_bytes_read=size, chunks_read=chunks)
+    logger.info(f"Local object store fast path for {source}: {counts}")
+
+
+async def download_file(source: str, destination: str) -> None:
+    """Drop-in for ObjectStore.download_file with the local fast path."""
+    from .chunkstore import CHUNK_DEDUP, resolve_key
+
+    if CHUNK_DEDUP:
+        source = await resolve_key(source) or source
+
+    root = _local_root()
+    src = os.path.join(root, source) if root else None
+    if src and os.path.isfile(src):
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        if _same_filesystem(root, os.path.dirname(destination) or "."):
+            _materialize(src, destination)
+            instrumentation.add(objectstore_bytes_read=os.path.getsize(src), chunks_read=int(os.path.basename(destination).startswith("chunk-")))
+            return
+    await ObjectStore.download_file(source=source, destination=destination)
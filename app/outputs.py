@@ -0,0 +1,54 @@
+"""SDK JsonOutput that reports the bytes of the chunk files it writes.
+
+The transforms return ``bytes`` next to the SDK's record and chunk counts, and
+the workflow carries it into summary.json. The local chunk files are deleted
+after upload, so their size has to be taken while they exist.
+"""
+
+import os
+from typing import Optional
+
+from application_sdk.outputs.json import JsonOutput
+from application_sdk.services.objectstore import ObjectStore
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class SizedJsonOutput(JsonOutput):
+    """JsonOutput adding up the size of every chunk it writes in ``bytes_written``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bytes_written = 0
+
+    def _chunk_path(self) -> str:
+        return f"{self.output_path}/{self.path_gen(self.chunk_start, self.chunk_count)}"
+
+    async def flush_daft_buffer(self, buffer: list[str]):
+        # Files stay local until write_daft_dataframe uploads the whole directory
+        await super().flush_daft_buffer(buffer)
+        self.bytes_written += _size(self._chunk_path())
+
+    async def _flush_buffer(self):
+        # The pandas path uploads (and deletes) each chunk as it writes it: keep it long enough to size it
+        before = self.chunk_count
+        retain, self.retain_local_copy = self.retain_local_copy, True
+        try:
+            await super()._flush_buffer()
+        finally:
+            self.retain_local_copy = retain
+        if self.chunk_count != before:
+            path = self._chunk_path()
+            self.bytes_written += _size(path)
+            if not retain:
+                ObjectStore._cleanup_local_path(path)
+
+    async def get_statistics_with_bytes(self, typename: Optional[str] = None) -> dict:
+        """The SDK's statistics as a dict, plus ``bytes`` written."""
+        statistics = await self.get_statistics(typename=typename)
+        return {**statistics.model_dump(), "bytes": self.bytes_written}
@@ -0,0 +1,229 @@
+"""Per-type NDJSON exports with a byte-offset index for paginated reads.
+
+write_json_output also writes every record to
+output/<workflow_id>/assets/<type>.ndjson (one JSON document per line, the
+same serialization as in output.json) together with <type>.idx:
+
+    header       magic "ASIDX001", n_rows u64, keys_len u64
+    offsets      u64[n_rows + 1]   byte offset of each line in the .ndjson
+    schema_ids   u32[n_rows]       index into keys["schema"], or NO_KEY
+    table_ids    u32[n_rows]       index into keys["table"], or NO_KEY
+    keys         bytes[keys_len]   UTF-8 JSON {"schema": [...], "table": [...]}
+
+Sections are 8-byte aligned. A page is served by slicing the memory-mapped
+NDJSON between two offsets, so the cost is proportional to the page, not the
+export; schema/table filters scan the u32 id arrays without touching JSON.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+ASSETS_DIRNAME = "assets"
+
+MAGIC = b"ASIDX001"
+_HEADER = struct.Struct("<8sQQ")
+NO_KEY = 0xFFFFFFFF
+
+MAX_PAGE_SIZE = 1000
+
+# Where the schema / table name of a row lives, raw columns first
+_SCHEMA_FIELDS = ("table_schema", "schema_name", "src_schema_name", "schemaName")
+_TABLE_FIELDS = ("table_name", "src_table_name", "tableName")
+
+
+def asset_page_paths(out_dir: str, typename: str) -> tuple[str, str]:
+    base = os.path.join(out_dir, ASSETS_DIRNAME, typename)
+    return base + ".ndjson", base + ".idx"
+
+
+def _row_key(rec: dict, fields: tuple[str, ...]) -> Optional[str]:
+    attributes = rec.get("attributes") if isinstance(rec.get("attributes"), dict) else {}
+    for field in fields:
+        for value in (rec.get(field), rec.get(f"attributes.{field}"), attributes.get(field)):
+            if value is not None and value == value:
+                return str(value)
+    return None
+
+
+def _pad(f, written: int) -> None:
+    extra = (-written) % 8
+    if extra:
+        f.write(b"\0" * extra)
+
+
+class AssetPageWriter:
+    """Append serialized records for one type; ``close`` commits both files."""
+
+    def __init__(self, out_dir: str, typename: str):
+        self.data_path, self.index_path = asset_page_paths(out_dir, typename)
+        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        self._data = open(self.data_path + ".tmp", "wb")
+        self._offsets = array("Q", [0])
+        self._schema_ids = array("I")
+        self._table_ids = array("I")
+        self._keys: dict[str, dict[str, int]] = {"schema": {}, "table": {}}
+
+    def _intern(self, kind: str, value: Optional[str]) -> int:
+        if value is None:
+            return NO_KEY
+        ids = self._keys[kind]
+        if value not in ids:
+            ids[value] = len(ids)
+        return ids[value]
+
+    def add(self, line: str, rec: dict) -> None:
+        """Append one record already serialized as ``line`` (no newline)."""
+        data = line.encode("utf-8") + b"\n"
+        self._data.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+        self._schema_ids.append(self._intern("schema", _row_key(rec, _SCHEMA_FIELDS)))
+        self._table_ids.append(self._intern("table", _row_key(rec, _TABLE_FIELDS)))
+
+    def close(self) -> int:
+        """Write the index, publish both files atomically and return the row count."""
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._data.close()
+        keys = json.dumps({kind: list(ids) for kind, ids in self._keys.items()}).encode("utf-8")
+        n = len(self._schema_ids)
+        tmp = self.index_path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, n, len(keys)))
+                f.write(self._offsets.tobytes())
+                _pad(f, f.write(self._schema_ids.tobytes()))
+                _pad(f, f.write(self._table_ids.tobytes()))
+                f.write(keys)
+                f.flush()
+                os.fsync(f.fileno())
+            # Data first: a reader that sees the new index always finds its rows
+            os.replace(self.data_path + ".tmp", self.data_path)
+            os.replace(tmp, self.index_path)
+        finally:
+            self.abort()
+        return n
+
+    def abort(self) -> None:
+        try:
+            self._data.close()
+        except Exception:
+            pass
+        for path in (self.data_path + ".tmp", self.index_path + ".tmp"):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except Exception:
+                pass
+
+
+class AssetPages:
+    """Read-only, memory-mapped view of one type's NDJSON export and index."""
+
+    def __init__(self, data_path: str, index_path: str):
+        import numpy as np
+
+        # The mappings outlive the descriptors; no need to keep the files open
+        with open(index_path, "rb") as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, keys_len = _HEADER.unpack_from(self._index, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an asset page index: {index_path}")
+        self.total = n
+        pos = _HEADER.size
+        self._offsets = np.frombuffer(self._index, dtype="<u8", count=n + 1, offset=pos)
+        pos += self._offsets.nbytes
+        self._ids = {}
+        for kind in ("schema", "table"):
+            self._ids[kind] = np.frombuffer(self._index, dtype="<u4", count=n, offset=pos)
+            pos += 4 * n + ((-4 * n) % 8)
+        self._keys = {
+            kind: {name: i for i, name in enumerate(names)}
+            for kind, names in json.loads(self._index[pos:pos + keys_len].decode("utf-8")).items()
+        }
+
+        with open(data_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap rejects empty files; an empty type has no rows to slice anyway
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def _matching(self, schema: Optional[str], table: Optional[str]):
+        import numpy as np
+
+        mask = None
+        for kind, value in (("schema", schema), ("table", table)):
+            if not value:
+                continue
+            key = self._keys.get(kind, {}).get(value)
+            if key is None:
+                return np.array([], dtype=np.int64)
+            hit = self._ids[kind] == key
+            mask = hit if mask is None else mask & hit
+        return None if mask is None else np.flatnonzero(mask)
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        schema: Optional[str] = None,
+        table: Optional[str] = None,
+    ) -> tuple[int, list[bytes]]:
+        """Return (total matching rows, serialized rows of the page)."""
+        offset = max(offset, 0)
+        limit = max(min(limit, MAX_PAGE_SIZE), 0)
+        rows = self._matching(schema, table)
+        if rows is None:
+            total = self.total
+            start, end = min(offset, total), min(offset + limit, total)
+            if start >= end:
+                return total, []
+            # Contiguous page: one slice of the mapping
+            blob = self._data[int(self._offsets[start]):int(self._offsets[end])]
+            return total, blob.rstrip(b"\n").split(b"\n")
+        total = len(rows)
+        lines = []
+        for i in rows[offset:offset + limit]:
+            i = int(i)
+            lines.append(self._data[int(self._offsets[i]):int(self._offsets[i + 1]) - 1])
+        return total, lines
+
+
+# Most recently used (index path -> (mtime, pages)). Evicted entries are only
+# dropped, never closed: a request may still be paging through one, and the
+# mappings are released with the last reference to them.
+ASSET_PAGES_CACHE = 16
+_open_pages: "OrderedDict[str, tuple[float, AssetPages]]" = OrderedDict()
+_open_lock = threading.Lock()
+
+
+def open_asset_pages(out_dir: str, typename: str) -> Optional[AssetPages]:
+    """Return a cached AssetPages for a run's type, reopening when it changes."""
+    data_path, index_path = asset_page_paths(out_dir, typename)
+    try:
+        mtime = os.path.getmtime(index_path)
+    except OSError:
+        return None
+    with _open_lock:
+        cached = _open_pages.get(index_path)
+        if cached and cached[0] == mtime:
+            _open_pages.move_to_end(index_path)
+            return cached[1]
+        pages = AssetPages(data_path, index_path)
+        _open_pages[index_path] = (mtime, pages)
+        _open_pages.move_to_end(index_path)
+        while len(_open_pages) > ASSET_PAGES_CACHE:
+            _open_pages.popitem(last=False)
+    return pages
+
+
+def invalidate(out_dir: str) -> None:
+    """Drop the cached asset pages of a run directory (before it is deleted)."""
+    root = os.path.join(os.path.abspath(out_dir), "")
+    with _open_lock:
+        for path in [p for p in _open_pages if os.path.abspath(p).startswith(root)]:
+            del _open_pages[path]
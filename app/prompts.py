@@ -0,0 +1,237 @@
+"""Token-budgeted prompt context for the Groq-backed endpoints.
+
+Instead of sending the first ``max_chars`` of output.txt (which on large
+databases is mostly DATABASE/SCHEMA/COLUMN rows), the endpoints build their
+context from just the asset types they need, read through
+``read_asset_rows`` (memory-mapped Arrow, output.json fallback). Tables are
+ranked by how connected they are, then by estimated row count, and edges by
+the rank of the tables they join. Lines are taken round-robin across
+sections in rank order until the token budget is filled; a line that would
+overflow is skipped so shorter ones later can still use the remainder.
+"""
+
+import math
+import os
+from collections import Counter
+from typing import Optional
+
+from .columnar import read_asset_rows
+from .diagrams import fk_edges, table_degrees, view_edges
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+
+# Rough size of one token for English/identifier-heavy text; no tokenizer
+# dependency, so budgets are approximate against the real model vocabulary.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def fill_budget(sections: list[tuple[str, list[str]]], budget: int) -> str:
+    """Render ``(title, ranked lines)`` sections within ``budget`` tokens.
+
+    Sections keep their order in the output; lines are admitted one per
+    section per round so every section gets its most important lines first.
+    """
+    chosen: list[list[str]] = [[] for _ in sections]
+    # Account in characters so per-line rounding does not waste budget
+    limit = budget * CHARS_PER_TOKEN
+    used = 0
+    cursors = [0] * len(sections)
+    active = [i for i, (_, lines) in enumerate(sections) if lines]
+    while active:
+        still = []
+        for i in active:
+            title, lines = sections[i]
+            line = lines[cursors[i]]
+            cursors[i] += 1
+            cost = len(line) + 1
+            if not chosen[i]:
+                # The section header is paid for with its first line
+                cost += len(title) + 1
+            # +1: the last line carries no trailing newline
+            if used + cost <= limit + 1:
+                chosen[i].append(line)
+                used += cost
+            if cursors[i] < len(lines):
+                still.append(i)
+        active = still
+    blocks = [
+        "\n".join([title] + lines) for (title, _), lines in zip(sections, chosen) if lines
+    ]
+    return "\n".join(blocks)
+
+
+def _row_estimates(out_dir: str) -> Counter:
+    rows: Counter = Counter()
+    for r in read_asset_rows(
+        out_dir, "quality_metric", columns=["schema_name", "table_name", "total_rows_estimated"]
+    ):
+        try:
+            n = int(r.get("total_rows_estimated") or 0)
+        except (TypeError, ValueError):
+            continue
+        t = f"{r.get('schema_name')}.{r.get('table_name')}"
+        rows[t] = max(rows[t], n)
+    return rows
+
+
+def rank_tables(out_dir: str, fks=None, views=None) -> list[str]:
+    """All known tables, most connected first, then largest, then by name."""
+    fks = fk_edges(out_dir) if fks is None else fks
+    views = view_edges(out_dir) if views is None else views
+    degree = table_degrees(fks, views)
+    rows = _row_estimates(out_dir)
+    names = set(degree) | set(rows)
+    for r in read_asset_rows(out_dir, "table", columns=["table_schema", "table_name"]):
+        if r.get("table_schema") and r.get("table_name"):
+            names.add(f"{r['table_schema']}.{r['table_name']}")
+    return sorted(names, key=lambda t: (-degree[t], -rows[t], t))
+
+
+def _edge_order(ranked: list[str]):
+    pos = {t: i for i, t in enumerate(ranked)}
+    worst = len(ranked)
+
+    def _key(a: str, b: str):
+        ra, rb = pos.get(a, worst), pos.get(b, worst)
+        return (min(ra, rb), max(ra, rb))
+
+    return _key
+
+
+def lineage_context(out_dir: str, budget: int = PROMPT_TOKEN_BUDGET) -> str:
+    """FK column edges and table->view edges, best-connected tables first."""
+    fks = fk_edges(out_dir)
+    views = view_edges(out_dir)
+    key = _edge_order(rank_tables(out_dir, fks, views))
+    fk_lines = [
+        f"{a}.{ac} -> {b}.{bc}"
+        for a, ac, b, bc, _ in sorted(fks, key=lambda e: (key(e[0], e[2]), e))
+    ]
+    view_lines = [f"{a} -> {b}" for a, b in sorted(views, key=lambda e: (key(*e), e))]
+    return fill_budget(
+        [
+            ("=== RELATIONSHIP (FK src_column -> dst_column) ===", fk_lines),
+            ("=== VIEW_DEPENDENCY (table -> view) ===", view_lines),
+        ],
+        budget,
+    )
+
+
+def er_context(out_dir: str, budget: int = PROMPT_TOKEN_BUDGET) -> str:
+    """Ranked tables with their PK/FK columns and types, plus FK edges."""
+    fks = fk_edges(out_dir)
+    ranked = rank_tables(out_dir, fks, [])
+    key = _edge_order(ranked)
+
+    pks: dict[str, list[str]] = {}
+    for r in read_asset_rows(
+        out_dir, "index", columns=["schema_name", "table_name", "is_primary", "column_names"]
+    ):
+        if r.get("is_primary") and r.get("column_names"):
+            t = f"{r.get('schema_name')}.{r.get('table_name')}"
+            pks.setdefault(t, [])
+            pks[t].extend(c for c in str(r["column_names"]).split(",") if c and c not in pks[t])
+    fk_cols: dict[str, list[str]] = {}
+    for a, ac, _, _, _ in fks:
+        if ac and ac not in fk_cols.setdefault(a, []):
+            fk_cols[a].append(ac)
+
+    keyed = {t for t in ranked if pks.get(t) or fk_cols.get(t)}
+    types: dict[tuple[str, str], str] = {}
+    if keyed:
+        for r in read_asset_rows(
+            out_dir,
+            "column",
+            columns=["table_schema", "table_name", "column_name", "data_type"],
+            filters={"table_name": {t.split(".", 1)[1] for t in keyed}},
+        ):
+            types[(f"{r.get('table_schema')}.{r.get('table_name')}", str(r.get("column_name")))] = str(
+                r.get("data_type") or ""
+            )
+
+    table_lines = []
+    for t in ranked:
+        if t not in keyed:
+            continue
+        pk = pks.get(t, [])
+        cols = []
+        for c in pk + [c for c in fk_cols.get(t, []) if c not in pk]:
+            flags = " ".join(f for f, on in (("PK", c in pk), ("FK", c in fk_cols.get(t, []))) if on)
+            cols.append(" ".join(p for p in (c, types.get((t, c), ""), flags) if p))
+        table_lines.append(f"{t}: " + ", ".join(cols))
+    fk_lines = [
+        f"{a}.{ac} -> {b}.{bc}" + (f" ({name})" if name else "")
+        for a, ac, b, bc, name in sorted(fks, key=lambda e: (key(e[0], e[2]), e))
+    ]
+    return fill_budget(
+        [
+            ("=== TABLE (PK/FK columns) ===", table_lines),
+            ("=== RELATIONSHIP (FK src_column -> dst_column) ===", fk_lines),
+        ],
+        budget,
+    )
+
+
+def summary_context(out_dir: str, budget: int = PROMPT_TOKEN_BUDGET) -> str:
+    """Tables, FKs, views, quality metrics and indexes, most important first."""
+    fks = fk_edges(out_dir)
+    views = view_edges(out_dir)
+    ranked = rank_tables(out_dir, fks, views)
+    pos = {t: i for i, t in enumerate(ranked)}
+    worst = len(ranked)
+    key = _edge_order(ranked)
+
+    quality = []
+    for r in read_asset_rows(out_dir, "quality_metric"):
+        sc, st, col = r.get("schema_name"), r.get("table_name"), r.get("column_name")
+        if not (sc and st and col):
+            continue
+        extras = []
+        nf = r.get("null_frac")
+        if nf is not None:
+            try:
+                extras.append(f"null%~{round(float(nf) * 100, 1)}")
+            except (TypeError, ValueError):
+                nf = None
+        nd = r.get("distinct_count_estimated") or r.get("n_distinct_raw")
+        if nd is not None:
+            extras.append(f"distinct~{nd}")
+        if not extras:
+            continue
+        try:
+            null_frac = float(nf or 0)
+        except (TypeError, ValueError):
+            null_frac = 0.0
+        # Columns of important tables first, the emptiest columns within them
+        quality.append(((pos.get(f"{sc}.{st}", worst), -null_frac, col), f"{sc}.{st}.{col} ({', '.join(extras)})"))
+
+    indexes = []
+    for r in read_asset_rows(out_dir, "index", columns=["schema_name", "table_name", "index_name"]):
+        sc, st, ix = r.get("schema_name"), r.get("table_name"), r.get("index_name")
+        if sc and st and ix:
+            indexes.append(((pos.get(f"{sc}.{st}", worst), ix), f"{sc}.{st}:{ix}"))
+
+    return fill_budget(
+        [
+            ("Tables:", ranked),
+            ("FKs:", [f"{a}.{ac} -> {b}.{bc}" for a, ac, b, bc, _ in sorted(fks, key=lambda e: (key(e[0], e[2]), e))]),
+            ("Views:", [f"{a} -> {b}" for a, b in sorted(views, key=lambda e: (key(*e), e))]),
+            ("Quality:", [line for _, line in sorted(quality)]),
+            ("Indexes:", [line for _, line in sorted(indexes)]),
+        ],
+        budget,
+    )
+
+
+def text_fallback(out_dir: str, budget: int) -> Optional[str]:
+    """Head of output.txt within ``budget`` tokens, for runs without structured exports."""
+    path = os.path.join(out_dir, "output.txt")
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read(budget * CHARS_PER_TOKEN)
+    except OSError:
+        return None
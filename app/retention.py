@@ -0,0 +1,356 @@
+"""Size/age-bounded retention for output/ and the SDK's TEMPORARY_PATH.
+
+A background janitor (started with the server, see ``Janitor``) sweeps every
+RETENTION_INTERVAL_SECONDS:
+
+- output/<workflow_id>/ run directories are evicted least recently used
+  first until every policy holds: at most OUTPUT_KEEP_PER_CONNECTION runs per
+  connection, none older than OUTPUT_MAX_AGE_HOURS, and at most
+  OUTPUT_MAX_BYTES in total. "Used" is the latest of the files' mtime and the
+  last time the API served the run (``touch``).
+- Downloaded chunks under TEMPORARY_PATH are removed file by file, oldest
+  use first (the latest of atime, mtime and ctime: a chunk hardlinked from
+  the object store keeps the store's old mtime, but linking it bumps its
+  ctime), past TEMP_MAX_AGE_HOURS or beyond TEMP_MAX_BYTES. Chunks
+  hardlinked from a local object store (st_nlink > 1) use no space of their
+  own: they do not count towards TEMP_MAX_BYTES and removing them is
+  reported apart from the reclaimed bytes.
+
+A zero limit disables that policy. Runs with an activity in flight, or not
+finished and with progress events or files written within
+RETENTION_GRACE_SECONDS, are never touched (``EventBus.active_runs``), and a
+run directory is first moved into output/.trash so readers never see it
+half-deleted.
+Reclaimed bytes and evictions are reported through the SDK metrics adaptor
+and ``Janitor.snapshot``.
+"""
+
+import asyncio
+import os
+import shutil
+import threading
+import time
+from typing import Optional
+
+from application_sdk.observability.logger_adaptor import get_logger
+
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "600"))
+RETENTION_GRACE_SECONDS = float(os.getenv("RETENTION_GRACE_SECONDS", "900"))
+OUTPUT_MAX_BYTES = int(os.getenv("OUTPUT_MAX_BYTES", "0"))
+OUTPUT_MAX_AGE_HOURS = float(os.getenv("OUTPUT_MAX_AGE_HOURS", "0"))
+OUTPUT_KEEP_PER_CONNECTION = int(os.getenv("OUTPUT_KEEP_PER_CONNECTION", "0"))
+TEMP_MAX_BYTES = int(os.getenv("TEMP_MAX_BYTES", "0"))
+TEMP_MAX_AGE_HOURS = float(os.getenv("TEMP_MAX_AGE_HOURS", "24"))
+
+TRASH_DIRNAME = ".trash"
+
+logger = get_logger(__name__)
+
+_accessed: dict[str, float] = {}
+_accessed_lock = threading.Lock()
+
+
+def touch(workflow_id: str) -> None:
+    """Note that the API just served something from ``workflow_id``'s outputs."""
+    with _accessed_lock:
+        _accessed[workflow_id] = time.time()
+
+
+def _dir_usage(path: str) -> tuple[int, float]:
+    """(total bytes, newest of atime/mtime) over the files below ``path``."""
+    size = 0
+    newest = 0.0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            size += st.st_size
+            newest = max(newest, st.st_mtime, st.st_atime)
+    return size, newest
+
+
+def _run_connection(run_dir: str) -> str:
+    import json
+
+    try:
+        with open(os.path.join(run_dir, "summary.json"), "r", encoding="utf-8") as f:
+            return str(json.load(f).get("connection") or "")
+    except Exception:
+        return ""
+
+
+def scan_runs(base: str) -> list[dict]:
+    runs = []
+    try:
+        names = os.listdir(base)
+    except OSError:
+        return runs
+    for name in names:
+        path = os.path.join(base, name)
+        if name.startswith(".") or not os.path.isdir(path):
+            continue
+        size, newest = _dir_usage(path)
+        with _accessed_lock:
+            used = max(newest, _accessed.get(name, 0.0))
+        runs.append({
+            "workflow_id": name,
+            "path": path,
+            "bytes": size,
+            "modified": newest,
+            "used": used,
+            "connection": _run_connection(path),
+        })
+    return runs
+
+
+def select_runs(
+    runs: list[dict],
+    now: float,
+    protected: set[str],
+    max_bytes: int = OUTPUT_MAX_BYTES,
+    max_age_hours: float = OUTPUT_MAX_AGE_HOURS,
+    keep_per_connection: int = OUTPUT_KEEP_PER_CONNECTION,
+    grace_seconds: float = RETENTION_GRACE_SECONDS,
+) -> list[tuple[dict, str]]:
+    """Runs to evict with the policy that selected each, least recently used first."""
+    evict: dict[str, str] = {}
+    eligible = [
+        r for r in runs
+        if r["workflow_id"] not in protected and now - r["modified"] >= grace_seconds
+    ]
+    if keep_per_connection > 0:
+        by_connection: dict[str, list[dict]] = {}
+        for r in runs:
+            by_connection.setdefault(r["connection"], []).append(r)
+        for group in by_connection.values():
+            group.sort(key=lambda r: r["used"], reverse=True)
+            for r in group[keep_per_connection:]:
+                evict.setdefault(r["workflow_id"], "keep_per_connection")
+    if max_age_hours > 0:
+        for r in runs:
+            if now - r["used"] > max_age_hours * 3600:
+                evict.setdefault(r["workflow_id"], "max_age")
+    allowed = {r["workflow_id"] for r in eligible}
+    if max_bytes > 0:
+        # Only runs that will really be removed free space; protected or fresh ones stay counted
+        total = sum(r["bytes"] for r in runs if r["workflow_id"] not in evict or r["workflow_id"] not in allowed)
+        for r in sorted(eligible, key=lambda r: r["used"]):
+            if total <= max_bytes:
+                break
+            if r["workflow_id"] not in evict:
+                evict[r["workflow_id"]] = "max_bytes"
+                total -= r["bytes"]
+    ordered = sorted(
+        (r for r in runs if r["workflow_id"] in evict and r["workflow_id"] in allowed),
+        key=lambda r: r["used"],
+    )
+    return [(r, evict[r["workflow_id"]]) for r in ordered]
+
+
+def remove_run(base: str, run: dict) -> bool:
+    """Unpublish then delete one run directory."""
+    from . import lineage, pages
+    from .runs import registry
+
+    trash = os.path.join(base, TRASH_DIRNAME)
+    os.makedirs(trash, exist_ok=True)
+    target = os.path.join(trash, f"{run['workflow_id']}-{time.time_ns()}")
+    try:
+        os.replace(run["path"], target)
+    except OSError:
+        return False
+    registry.forget(run["workflow_id"])
+    # Stop the API serving the run from its cached indexes; readers holding one keep their mapping
+    lineage.invalidate(run["path"])
+    pages.invalidate(run["path"])
+    with _accessed_lock:
+        _accessed.pop(run["workflow_id"], None)
+    shutil.rmtree(target, ignore_errors=True)
+    return True
+
+
+def sweep_temp(
+    base: str,
+    now: float,
+    protected: set[str],
+    max_bytes: int = TEMP_MAX_BYTES,
+    max_age_hours: float = TEMP_MAX_AGE_HOURS,
+    grace_seconds: float = RETENTION_GRACE_SECONDS,
+) -> tuple[int, int, int]:
+    """Delete stale downloaded chunks; returns (files removed, bytes reclaimed, hardlinked bytes unlinked)."""
+    if max_bytes <= 0 and max_age_hours <= 0:
+        return 0, 0, 0
+    files = []
+    total = 0
+    for root, _, names in os.walk(base):
+        # Object-store prefixes carry the workflow id as a path segment
+        if protected and protected.intersection(os.path.relpath(root, base).split(os.sep)):
+            continue
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            # Another link (the object store's copy) keeps the blocks alive
+            linked = st.st_nlink > 1
+            if not linked:
+                total += st.st_size
+            files.append((max(st.st_atime, st.st_mtime, st.st_ctime), st.st_size, linked, path))
+    removed = reclaimed = unlinked = 0
+    for used, size, linked, path in sorted(files):
+        if now - used < grace_seconds:
+            continue
+        too_old = max_age_hours > 0 and now - used > max_age_hours * 3600
+        too_big = not linked and max_bytes > 0 and total > max_bytes
+        if not (too_old or too_big):
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        removed += 1
+        if linked:
+            unlinked += size
+        else:
+            reclaimed += size
+            total -= size
+    # Prune directories emptied above, deepest first; rmdir refuses non-empty ones
+    for root, _, _ in os.walk(base, topdown=False):
+        if root == base or protected.intersection(os.path.relpath(root, base).split(os.sep)):
+            continue
+        try:
+            if now - os.stat(root).st_mtime >= grace_seconds:
+                os.rmdir(root)
+        except OSError:
+            pass
+    return removed, reclaimed, unlinked
+
+
+def _record_metric(name: str, value: float, labels: dict, description: str, unit: str) -> None:
+    try:
+        from application_sdk.observability.metrics_adaptor import MetricType, get_metrics
+
+        get_metrics().record_metric(
+            name=name,
+            value=value,
+            metric_type=MetricType.COUNTER,
+            labels=labels,
+            description=description,
+            unit=unit,
+        )
+    except Exception:
+        pass
+
+
+class Janitor:
+    """Periodic retention sweeps over output/ and TEMPORARY_PATH."""
+
+    def __init__(self, output_dir: str, temp_dir: Optional[str] = None, interval: float = RETENTION_INTERVAL_SECONDS):
+        self.output_dir = output_dir
+        self.temp_dir = temp_dir
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "sweeps": 0,
+            "runs_evicted": 0,
+            "run_bytes_reclaimed": 0,
+            "temp_files_removed": 0,
+            "temp_bytes_reclaimed": 0,
+            "temp_linked_bytes_removed": 0,
+            "last_sweep_at": None,
+            "last_sweep_seconds": None,
+            "last_evicted": [],
+        }
+
+    def sweep(self) -> dict:
+        """One blocking pass over both trees; returns what it reclaimed."""
+        from .events import bus
+
+        started = time.monotonic()
+        now = time.time()
+        protected = bus.active_runs(RETENTION_GRACE_SECONDS)
+        evicted = []
+        run_bytes = 0
+        for run, policy in select_runs(scan_runs(self.output_dir), now, protected):
+            if remove_run(self.output_dir, run):
+                evicted.append({"workflow_id": run["workflow_id"], "bytes": run["bytes"], "policy": policy})
+                run_bytes += run["bytes"]
+                _record_metric(
+                    "retention_reclaimed_bytes",
+                    run["bytes"],
+                    {"area": "output", "policy": policy},
+                    "Bytes freed by the retention janitor",
+                    "bytes",
+                )
+        shutil.rmtree(os.path.join(self.output_dir, TRASH_DIRNAME), ignore_errors=True)
+        temp_files = temp_bytes = temp_linked = 0
+        if self.temp_dir and os.path.isdir(self.temp_dir):
+            temp_files, temp_bytes, temp_linked = sweep_temp(self.temp_dir, now, protected)
+            if temp_bytes:
+                _record_metric(
+                    "retention_reclaimed_bytes",
+                    temp_bytes,
+                    {"area": "temporary", "policy": "temp"},
+                    "Bytes freed by the retention janitor",
+                    "bytes",
+                )
+        self.stats["sweeps"] += 1
+        self.stats["runs_evicted"] += len(evicted)
+        self.stats["run_bytes_reclaimed"] += run_bytes
+        self.stats["temp_files_removed"] += temp_files
+        self.stats["temp_bytes_reclaimed"] += temp_bytes
+        self.stats["temp_linked_bytes_removed"] += temp_linked
+        self.stats["last_sweep_at"] = now
+        self.stats["last_sweep_seconds"] = round(time.monotonic() - started, 3)
+        self.stats["last_evicted"] = evicted
+        if evicted or temp_files:
+            logger.info(
+                f"Retention: evicted {len(evicted)} runs ({run_bytes} bytes), "
+                f"removed {temp_files} temp files ({temp_bytes} bytes, {temp_linked} more hardlinked)"
+            )
+        return {
+            "evicted": evicted,
+            "temp_files_removed": temp_files,
+            "temp_bytes_reclaimed": temp_bytes,
+            "temp_linked_bytes_removed": temp_linked,
+        }
+
+    async def _loop(self) -> None:
+        from .blocking import run_blocking
+
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_blocking(self.sweep)
+            except Exception:
+                logger.warning("Retention sweep failed", exc_info=True)
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "policies": {
+                "output_max_bytes": OUTPUT_MAX_BYTES,
+                "output_max_age_hours": OUTPUT_MAX_AGE_HOURS,
+                "output_keep_per_connection": OUTPUT_KEEP_PER_CONNECTION,
+                "temp_max_bytes": TEMP_MAX_BYTES,
+                "temp_max_age_hours": TEMP_MAX_AGE_HOURS,
+                "grace_seconds": RETENTION_GRACE_SECONDS,
+                "interval_seconds": self.interval,
+            },
+        }
@@ -0,0 +1,96 @@
+"""In-process registry of finished runs under output/.
+
+The exporters and summarize_outputs record each run as they write it (the
+worker shares this process with the server), so latest-run and listing
+queries are answered from memory instead of listing and stat-ing every run
+directory on each poll. output/ itself is scanned once on first use, and
+again only when its mtime changes, i.e. when a run directory was created or
+removed by something other than this process.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Optional
+
+# Files whose presence makes a directory under output/ a finished run
+RUN_OUTPUT_FILES = ("output.txt", "output.json")
+
+
+class RunRegistry:
+    """Runs ordered by last update, newest last."""
+
+    def __init__(self):
+        self._runs: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._scanned: Optional[tuple[str, float]] = None
+
+    def record(self, workflow_id: str, output: Optional[str] = None, updated_at: Optional[float] = None) -> None:
+        """Mark ``workflow_id`` as updated now, optionally noting an output file name."""
+        if not workflow_id:
+            return
+        with self._lock:
+            run = self._runs.pop(workflow_id, None) or {"workflow_id": workflow_id, "outputs": []}
+            run["updated_at"] = updated_at if updated_at is not None else time.time()
+            if output and output not in run["outputs"]:
+                run["outputs"].append(output)
+            self._runs[workflow_id] = run
+
+    def forget(self, workflow_id: str) -> None:
+        with self._lock:
+            self._runs.pop(workflow_id, None)
+
+    def sync(self, base: str) -> None:
+        """Rescan ``base`` if it is new to us or its directory listing changed."""
+        try:
+            mtime = os.stat(base).st_mtime
+        except OSError:
+            return
+        if self._scanned == (base, mtime):
+            return
+        found: dict[str, dict] = {}
+        try:
+            names = os.listdir(base)
+        except OSError:
+            return
+        for name in names:
+            outputs = []
+            latest = None
+            for fname in RUN_OUTPUT_FILES:
+                try:
+                    m = os.path.getmtime(os.path.join(base, name, fname))
+                except OSError:
+                    continue
+                outputs.append(fname)
+                latest = m if latest is None else max(latest, m)
+            if latest is not None:
+                found[name] = {"workflow_id": name, "outputs": outputs, "updated_at": latest}
+        with self._lock:
+            for workflow_id, run in self._runs.items():
+                # Recorded in-process: keep, but drop runs whose directory is gone
+                if workflow_id in found or os.path.isdir(os.path.join(base, workflow_id)):
+                    merged = found.get(workflow_id, {"outputs": []})
+                    run["outputs"] = sorted(set(run["outputs"]) | set(merged["outputs"]))
+                    run["updated_at"] = max(run["updated_at"], merged.get("updated_at", 0))
+                    found[workflow_id] = run
+            self._runs = OrderedDict(
+                (r["workflow_id"], r) for r in sorted(found.values(), key=lambda r: (r["updated_at"], r["workflow_id"]))
+            )
+            self._scanned = (base, mtime)
+
+    def latest(self) -> Optional[dict]:
+        with self._lock:
+            if not self._runs:
+                return None
+            return dict(self._runs[next(reversed(self._runs))])
+
+    def list(self, offset: int = 0, limit: int = 50) -> tuple[int, list[dict]]:
+        """(total, runs newest first) for one page."""
+        with self._lock:
+            page = islice(reversed(self._runs.values()), max(offset, 0), max(offset, 0) + max(limit, 0))
+            return len(self._runs), [dict(r) for r in page]
+
+
+registry = RunRegistry()
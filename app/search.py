@@ -0,0 +1,176 @@
+"""Per-run name search over schemas, tables, columns and indexes.
+
+build_search_index writes output/<workflow_id>/search.db, a SQLite file with
+one row per asset name:
+
+    assets(id, type, name, name_lc, schema_name, table_name, qualified_name)
+
+Prefix lookups use a B-tree on (name_lc) and (type, name_lc), so they are a
+range scan that stops after ``limit`` hits. Substring lookups go through an
+FTS5 trigram index over the names (a LIKE served from the trigram postings).
+Queries shorter than three characters cannot use trigrams, and substring
+searches restricted to non-column types scan those (comparatively few) rows
+through the type index instead. Exact matches always rank first.
+"""
+
+import os
+import sqlite3
+from typing import Iterable, Optional
+
+SEARCH_INDEX_FILENAME = "search.db"
+
+# Asset types indexed, and where a row's own name lives (raw column first)
+SEARCH_TYPES = {
+    "schema": ("schema_name", "name"),
+    "table": ("table_name", "name"),
+    "column": ("column_name", "name"),
+    "index": ("index_name", "name"),
+}
+SEARCH_MODES = ("prefix", "substring", "exact")
+MAX_SEARCH_RESULTS = 500
+
+_SCHEMA_FIELDS = ("table_schema", "schema_name", "schemaName")
+_TABLE_FIELDS = ("table_name", "tableName")
+_BATCH_SIZE = 10_000
+
+_DDL = """
+CREATE TABLE assets (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_lc TEXT NOT NULL,
+    schema_name TEXT,
+    table_name TEXT,
+    qualified_name TEXT
+);
+CREATE VIRTUAL TABLE assets_fts USING fts5(
+    name_lc, content='assets', content_rowid='id', tokenize='trigram'
+);
+"""
+_INSERT = (
+    "INSERT INTO assets(type, name, name_lc, schema_name, table_name, qualified_name) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_POST_DDL = """
+CREATE INDEX assets_name ON assets(name_lc);
+CREATE INDEX assets_type_name ON assets(type, name_lc);
+INSERT INTO assets_fts(assets_fts) VALUES ('rebuild');
+"""
+
+
+def search_index_path(out_dir: str) -> str:
+    return os.path.join(out_dir, SEARCH_INDEX_FILENAME)
+
+
+def _field(rec: dict, fields: Iterable[str]) -> Optional[str]:
+    attributes = rec.get("attributes") if isinstance(rec.get("attributes"), dict) else {}
+    for field in fields:
+        for value in (rec.get(field), rec.get(f"attributes.{field}"), attributes.get(field)):
+            if value is not None and value == value and value != "":
+                return str(value)
+    return None
+
+
+def search_rows(df, typename: str) -> Iterable[tuple]:
+    """(type, name, name_lc, schema, table, qualified_name) per named row of a chunk."""
+    name_fields = SEARCH_TYPES[typename]
+    for rec in df.to_dict("records"):
+        name = _field(rec, name_fields)
+        if not name:
+            continue
+        schema = name if typename == "schema" else _field(rec, _SCHEMA_FIELDS)
+        table = None if typename == "schema" else _field(rec, _TABLE_FIELDS)
+        yield typename, name, name.lower(), schema, table, _field(rec, ("qualifiedName",))
+
+
+def write_search_index(rows: Iterable[tuple], path: str) -> dict:
+    """Load ``rows`` (see search_rows) into a fresh index and atomically publish it."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    count = 0
+    try:
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + _DDL)
+            batch: list[tuple] = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= _BATCH_SIZE:
+                    conn.executemany(_INSERT, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                conn.executemany(_INSERT, batch)
+                count += len(batch)
+            conn.executescript(_POST_DDL)
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp, path)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+    return {"entries": count, "path": path}
+
+
+def search(
+    path: str,
+    q: str,
+    mode: str = "prefix",
+    types: Optional[list[str]] = None,
+    schema: Optional[str] = None,
+    limit: int = 50,
+) -> Optional[list[dict]]:
+    """Names matching ``q`` (case-insensitive), exact hits first; None if there is no index."""
+    if not os.path.exists(path):
+        return None
+    needle = q.strip().lower()
+    if not needle:
+        return []
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+    source = "assets a"
+    where: list[str] = []
+    params: list = []
+    if mode == "exact":
+        where.append("a.name_lc = ?")
+        params.append(needle)
+    elif mode == "prefix" or mode not in SEARCH_MODES:
+        # Range scan on the name index
+        where.append("a.name_lc >= ? AND a.name_lc < ?")
+        params.extend([needle, needle + "\U0010ffff"])
+    else:
+        if len(needle) >= 3 and not (types and "column" not in types):
+            # Trigram postings narrow the candidates; '_' and '%' are wildcards
+            # to LIKE, so instr() below keeps only literal matches
+            source = "assets_fts f JOIN assets a ON a.id = f.rowid"
+            where.append("f.name_lc LIKE ?")
+            params.append(f"%{needle}%")
+        # else: non-column types are few, scan them through the type index
+        where.append("instr(a.name_lc, ?) > 0")
+        params.append(needle)
+    if types:
+        where.append(f"a.type IN ({', '.join('?' for _ in types)})")
+        params.extend(types)
+    if schema:
+        where.append("a.schema_name = ?")
+        params.append(schema)
+    sql = (
+        "SELECT a.type, a.name, a.schema_name, a.table_name, a.qualified_name, a.name_lc = ? AS exact "
+        f"FROM {source} WHERE {' AND '.join(where)} LIMIT ?"
+    )
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        # Over-fetch a little so exact hits further down the scan still surface first
+        found = conn.execute(sql, [needle, *params, limit * 4]).fetchall()
+    finally:
+        conn.close()
+    found.sort(key=lambda r: (not r[5], len(r[1]), r[1], r[0]))
+    return [
+        {"type": t, "name": n, "schema": s, "table": tb, "qualifiedName": qn}
+        for t, n, s, tb, qn, _ in found[:limit]
+    ]
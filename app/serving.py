@@ -0,0 +1,166 @@
+"""HTTP helpers for serving files under output/<workflow_id>/.
+
+Used by the result endpoints in main.py and by the /output static mount so
+both honour Accept-Encoding against the precompressed variants written by
+app.compression, and answer conditional requests with 304 using the content
+hashes from app.etags.
+"""
+
+import os
+from email.utils import formatdate, parsedate
+from typing import Optional
+
+from fastapi.responses import FileResponse, Response, StreamingResponse  # type: ignore
+from fastapi.staticfiles import StaticFiles  # type: ignore
+from starlette.datastructures import Headers  # type: ignore
+
+from .blocking import run_blocking
+from .compression import SUFFIXES, open_decompressed, variant
+from .etags import etag_for
+
+# Outputs only change when a run is re-exported under the same id, so
+# clients may keep them but must revalidate (a cheap 304) before reuse.
+OUTPUT_CACHE_CONTROL = "no-cache"
+
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Server preference when the client accepts several encodings equally
+_PREFERENCE = ["zstd", "gzip"]
+
+
+def accepted_encodings(header: Optional[str]) -> list[str]:
+    """Parse Accept-Encoding into the codecs we can serve, best first."""
+    if not header:
+        return []
+    weights: dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if token == "*":
+            for codec in _PREFERENCE:
+                weights.setdefault(codec, q)
+        elif token in SUFFIXES:
+            weights[token] = q
+    ranked = [c for c in _PREFERENCE if weights.get(c, 0) > 0]
+    ranked.sort(key=lambda c: -weights[c])
+    return ranked
+
+
+def file_validators(path: str, st: Optional[os.stat_result] = None) -> Optional[dict]:
+    """ETag / Last-Modified / Cache-Control headers for the current ``path``."""
+    try:
+        st = st or os.stat(path)
+    except OSError:
+        return None
+    digest = etag_for(path, st)
+    if digest is None:
+        return None
+    return {
+        "ETag": f'"{digest}"',
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": OUTPUT_CACHE_CONTROL,
+    }
+
+
+def encoded_etag(etag: str, codec: str) -> str:
+    # Each stored encoding is its own representation with its own tag
+    return f'{etag[:-1]}-{codec}"'
+
+
+def is_not_modified(request_headers, validators: dict) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against ``validators``."""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        if "*" in tags:
+            return True
+        etag = validators["ETag"]
+        return etag in tags or any(encoded_etag(etag, c) in tags for c in SUFFIXES)
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        since = parsedate(if_modified_since)
+        modified = parsedate(validators["Last-Modified"])
+        return since is not None and modified is not None and since >= modified
+    return False
+
+
+def not_modified_response(validators: dict) -> Response:
+    return Response(status_code=304, headers=validators)
+
+
+def precompressed_response(
+    path: str,
+    accept_encoding: Optional[str],
+    media_type: str,
+    validators: Optional[dict] = None,
+) -> Optional[Response]:
+    """Serve a stored compressed variant of ``path`` when the client accepts it.
+
+    Falls back to decompressing a variant on the fly when only the compressed
+    copy exists. Returns None when the caller should serve ``path`` itself.
+    """
+    for codec in accepted_encodings(accept_encoding):
+        stored = variant(path, codec)
+        if stored:
+            headers = {"Content-Encoding": codec, "Vary": "Accept-Encoding"}
+            if validators:
+                headers.update(validators, ETag=encoded_etag(validators["ETag"], codec))
+            return FileResponse(stored, media_type=media_type, headers=headers)
+    if os.path.exists(path):
+        return None
+    reader = open_decompressed(path)
+    if reader is None:
+        return None
+
+    def _iter():
+        with reader:
+            while True:
+                chunk = reader.read(_STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    return StreamingResponse(_iter(), media_type=media_type, headers={"Vary": "Accept-Encoding"})
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that prefers stored .zst/.gz siblings when accepted."""
+
+    async def get_response(self, path: str, scope) -> Response:  # type: ignore[override]
+        headers = dict(scope.get("headers") or [])
+        accept = headers.get(b"accept-encoding", b"").decode("latin-1")
+        full_path, _ = self.lookup_path(path)
+        if not full_path:
+            # Original gone but a compressed sibling may remain
+            for suffix in SUFFIXES.values():
+                found, _ = self.lookup_path(path + suffix)
+                if found:
+                    full_path = found[: -len(suffix)]
+                    break
+        if full_path:
+            import mimetypes
+
+            # Hashing an unseen file reads it whole; keep that off the event loop
+            validators = await run_blocking(file_validators, full_path)
+            if validators and is_not_modified(Headers(scope=scope), validators):
+                return not_modified_response(validators)
+            media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+            resp = precompressed_response(full_path, accept, media_type, validators)
+            if resp is not None:
+                return resp
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:  # type: ignore[override]
+        # Same as StaticFiles, but with the content-hash ETag instead of mtime-size
+        validators = file_validators(str(full_path), stat_result) or {}
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=validators)
+        if validators and self.is_not_modified(response.headers, Headers(scope=scope)):
+            return not_modified_response(validators)
+        return response
@@ -0,0 +1,177 @@
+"""Per-run SQLite store of every extracted asset type.
+
+write_metadata_store bulk-loads the same rows as output.json into
+output/<workflow_id>/metadata.db, one table per type (``asset_<type>``, one
+column per field, nested values as JSON text) plus an ``edges`` table of
+lineage edges. Schema/table/column name fields and edge endpoints are
+indexed, so filtered reads (e.g. the columns of a handful of tables) are
+index lookups rather than a scan of the whole export.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Iterable, Optional
+
+METADATA_STORE_FILENAME = "metadata.db"
+
+# Fields indexed wherever a type has them
+INDEXED_FIELDS = (
+    "table_schema",
+    "schema_name",
+    "table_name",
+    "column_name",
+    "src_table_name",
+    "dst_table_name",
+    "qualifiedName",
+)
+
+# Larger value sets are filtered after the query instead of bound as IN (...)
+_MAX_IN_VALUES = 500
+
+_EDGES_DDL = "CREATE TABLE edges (kind TEXT NOT NULL, from_name TEXT NOT NULL, to_name TEXT NOT NULL)"
+_EDGES_INDEXES = (
+    "CREATE INDEX edges_from ON edges(from_name)",
+    "CREATE INDEX edges_to ON edges(to_name)",
+)
+
+
+def metadata_store_path(out_dir: str) -> str:
+    return os.path.join(out_dir, METADATA_STORE_FILENAME)
+
+
+def _table(typename: str) -> str:
+    return '"asset_' + typename.replace('"', '""') + '"'
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _cell(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, (str, int, float, bytes)):
+        return value
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=str)
+    try:
+        # numpy scalars and arrays
+        return _cell(value.tolist())
+    except AttributeError:
+        return str(value)
+
+
+def write_metadata_store(
+    frames: Iterable[tuple[str, object]],
+    edges: Iterable[tuple[str, list[str], list[str]]],
+    path: str,
+) -> dict:
+    """Load ``(typename, DataFrame)`` chunks and ``(kind, from, to)`` edge lists in one transaction.
+
+    The file is built next to ``path`` and swapped in atomically.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    counts: dict[str, int] = {}
+    columns: dict[str, list[str]] = {}
+    try:
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("BEGIN")
+            for typename, df in frames:
+                cols = [str(c) for c in df.columns]
+                known = columns.get(typename)
+                if known is None:
+                    conn.execute(f"CREATE TABLE {_table(typename)} ({', '.join(_quote(c) for c in cols)})")
+                    known = columns[typename] = list(cols)
+                for c in cols:
+                    if c not in known:
+                        conn.execute(f"ALTER TABLE {_table(typename)} ADD COLUMN {_quote(c)}")
+                        known.append(c)
+                values = [df[c].tolist() for c in df.columns]
+                conn.executemany(
+                    f"INSERT INTO {_table(typename)} ({', '.join(_quote(c) for c in cols)}) "
+                    f"VALUES ({', '.join('?' for _ in cols)})",
+                    ([_cell(v) for v in row] for row in zip(*values)),
+                )
+                counts[typename] = counts.get(typename, 0) + len(df)
+            conn.execute(_EDGES_DDL)
+            n_edges = 0
+            for kind, frm, to in edges:
+                conn.executemany("INSERT INTO edges VALUES (?, ?, ?)", ((kind, a, b) for a, b in zip(frm, to)))
+                n_edges += len(frm)
+            # Indexes after the load: one sort per index instead of per-row upkeep
+            for typename, known in columns.items():
+                for field in INDEXED_FIELDS:
+                    if field in known:
+                        conn.execute(
+                            f"CREATE INDEX {_quote(f'asset_{typename}_{field}')} "
+                            f"ON {_table(typename)} ({_quote(field)})"
+                        )
+            for statement in _EDGES_INDEXES:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp, path)
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+    return {"path": path, "types": counts, "edges": n_edges}
+
+
+def store_rows(
+    out_dir: str,
+    typename: str,
+    columns: Optional[list[str]] = None,
+    filters: Optional[dict[str, set]] = None,
+) -> Optional[list[dict]]:
+    """Rows of one type from the run's store, or None if it has no store/table.
+
+    ``filters`` maps a field to its allowed values, as in read_asset_rows.
+    """
+    path = metadata_store_path(out_dir)
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        found = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"asset_{typename}",)
+        ).fetchone()
+        if found is None:
+            return None
+        present = [r[1] for r in conn.execute(f"PRAGMA table_info({_table(typename)})")]
+        where: list[str] = []
+        params: list = []
+        late: dict[str, set] = {}
+        for field, allowed in (filters or {}).items():
+            if field not in present or not allowed:
+                return []
+            if len(allowed) > _MAX_IN_VALUES:
+                late[field] = {_cell(v) for v in allowed}
+                continue
+            where.append(f"{_quote(field)} IN ({', '.join('?' for _ in allowed)})")
+            params.extend(_cell(v) for v in allowed)
+        selected = [c for c in columns if c in present] if columns else present
+        if not selected:
+            return []
+        fetched = selected + [f for f in late if f not in selected]
+        sql = f"SELECT {', '.join(_quote(c) for c in fetched)} FROM {_table(typename)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = []
+        for values in conn.execute(sql, params):
+            row = dict(zip(fetched, values))
+            if all(row[f] in allowed for f, allowed in late.items()):
+                rows.append({c: row[c] for c in selected})
+        return rows
+    finally:
+        conn.close()
@@ -1,14 +1,20 @@
 """Workflow for Postgres metadata extraction with custom output step."""
 
+import asyncio
+from datetime import datetime
+from typing import Any
+
 from temporalio import workflow
 from temporalio.common import RetryPolicy
 
+from application_sdk.activities.common.models import ActivityStatistics
 from application_sdk.workflows.metadata_extraction.sql import (
     BaseSQLMetadataExtractionWorkflow,
 )
 from application_sdk.constants import ENABLE_ATLAN_UPLOAD
 
 from .activities import SQLMetadataExtractionActivities
+from .events import tracked_activity
 
 
 @workflow.defn
@@ -31,10 +37,78 @@ class SQLMetadataExtractionWorkflow(BaseSQLMetadataExtractionWorkflow):
         base.append(activities.write_json_output)
         base.append(activities.write_text_output)
         base.append(activities.write_excel_output)
-        return base
+        base.append(activities.write_columnar_output)
+        base.append(activities.build_lineage_index)
+        base.append(activities.build_search_index)
+        base.append(activities.build_metadata_store)
+        base.append(activities.build_fingerprints)
+        base.append(activities.diff_runs)
+        base.append(activities.explain_queries)
+        # Same activities, publishing progress events for the UI's event stream
+        return [tracked_activity(fn) for fn in base]
+
+    def _record_type_stats(self, typename: str | None, stats: Any, started: datetime) -> None:
+        """Accumulate a transform's returned statistics for the run summary."""
+        if not typename:
+            return
+        model = ActivityStatistics.model_validate(stats) if stats else ActivityStatistics()
+        entry = self.type_stats.setdefault(
+            typename, {"total_record_count": 0, "chunk_count": 0, "seconds": 0.0, "bytes": 0}
+        )
+        entry["total_record_count"] += model.total_record_count
+        entry["chunk_count"] += model.chunk_count
+        # Not an ActivityStatistics field; the app's transforms add it
+        entry["bytes"] += int(stats.get("bytes") or 0) if isinstance(stats, dict) else 0
+        # Wall time from fetch start to the last transform of the type (replay-safe clock)
+        entry["seconds"] = round((workflow.now() - started).total_seconds(), 3)
+
+    async def fetch_and_transform(self, fetch_fn, workflow_args: dict, retry_policy: RetryPolicy) -> None:
+        """Base fetch + parallel transforms, keeping the per-type totals it computes."""
+        started = workflow.now()
+        raw_statistics = await workflow.execute_activity_method(
+            fetch_fn,
+            args=[workflow_args],
+            retry_policy=retry_policy,
+            start_to_close_timeout=self.default_start_to_close_timeout,
+            heartbeat_timeout=self.default_heartbeat_timeout,
+        )
+        if raw_statistics is None:
+            return
+        activity_statistics = ActivityStatistics.model_validate(raw_statistics)
+        if activity_statistics.chunk_count == 0 or not activity_statistics.partitions:
+            self._record_type_stats(activity_statistics.typename, None, started)
+            return
+        if activity_statistics.typename is None:
+            raise ValueError("Invalid typename")
+
+        batches, chunk_starts = self.get_transform_batches(
+            activity_statistics.chunk_count,
+            activity_statistics.typename,
+            activity_statistics.partitions,
+        )
+        record_counts = await asyncio.gather(*[
+            workflow.execute_activity_method(
+                self.activities_cls.transform_data,
+                {
+                    "typename": activity_statistics.typename,
+                    "file_names": batch,
+                    "chunk_start": chunk_start,
+                    **workflow_args,
+                },
+                retry_policy=retry_policy,
+                start_to_close_timeout=self.default_start_to_close_timeout,
+                heartbeat_timeout=self.default_heartbeat_timeout,
+            )
+            for batch, chunk_start in zip(batches, chunk_starts)
+        ])
+        for record_count in record_counts:
+            self._record_type_stats(activity_statistics.typename, record_count, started)
 
     @workflow.run
     async def run(self, workflow_config: dict) -> None:
+        # Per-type totals/durations returned by the transforms, for summarize_outputs
+        self.type_stats: dict[str, dict] = {}
+
         # Run base workflow (preflight + fetch + transform)
         await super().run(workflow_config)
 
@@ -49,6 +123,7 @@ class SQLMetadataExtractionWorkflow(BaseSQLMetadataExtractionWorkflow):
         # Run view dependency and relationship lineage
         retry_policy = RetryPolicy(maximum_attempts=3, backoff_coefficient=2)
         # Indexes
+        started = workflow.now()
         await workflow.execute_activity_method(
             self.activities_cls.fetch_indexes,
             args=[workflow_args],
@@ -56,14 +131,16 @@ class SQLMetadataExtractionWorkflow(BaseSQLMetadataExtractionWorkflow):
             start_to_close_timeout=self.default_start_to_close_timeout,
             heartbeat_timeout=self.default_heartbeat_timeout,
         )
-        await workflow.execute_activity_method(
+        stats = await workflow.execute_activity_method(
             self.activities_cls.transform_indexes,
             args=[workflow_args],
             retry_policy=retry_policy,
             start_to_close_timeout=self.default_start_to_close_timeout,
             heartbeat_timeout=self.default_heartbeat_timeout,
         )
+        self._record_type_stats("index", stats, started)
         # Quality metrics
+        started = workflow.now()
         await workflow.execute_activity_method(
             self.activities_cls.fetch_quality_metrics,
             args=[workflow_args],
@@ -71,13 +148,15 @@ class SQLMetadataExtractionWorkflow(BaseSQLMetadataExtractionWorkflow):
             start_to_close_timeout=self.default_start_to_close_timeout,
             heartbeat_timeout=self.default_heartbeat_timeout,
         )
-        await workflow.execute_activity_method(
+        stats = await workflow.execute_activity_method(
             self.activities_cls.transform_quality_metrics,
             args=[workflow_args],
             retry_policy=retry_policy,
             start_to_close_timeout=self.default_start_to_close_timeout,
             heartbeat_timeout=self.default_heartbeat_timeout,
         )
+        self._record_type_stats("quality_metric", stats, started)
+        started = workflow.now()
         await workflow.execute_activity_method(
             self.activities_cls.fetch_view_dependencies,
             args=[workflow_args],
@@ -85,13 +164,15 @@ class SQLMetadataExtractionWorkflow(BaseSQLMetadataExtractionWorkflow):
             start_to_close_timeout=self.default_start_to_close_timeout,
             heartbeat_timeout=self.default_heartbeat_timeout,
         )
-        await workflow.execute_activity_method(
+        stats = await workflow.execute_activity_method(
             self.activities_cls.transform_view_dependencies,
             args=[workflow_args],
             retry_policy=retry_policy,
             start_to_close_timeout=self.default_start_to_close_timeout,
             heartbeat_timeout=self.default_heartbeat_timeout,
         )
+        self._record_type_stats("view_dependency", stats, started)
+        started = workflow.now()
         await workflow.execute_activity_method(
             self.activities_cls.fetch_relationships,
             args=[workflow_args],
@@ -99,19 +180,20 @@ class SQLMetadataExtractionWorkflow(BaseSQLMetadataExtractionWorkflow):
             start_to_close_timeout=self.default_start_to_close_timeout,
             heartbeat_timeout=self.default_heartbeat_timeout,
         )
-        await workflow.execute_activity_method(
+        stats = await workflow.execute_activity_method(
             self.activities_cls.transform_relationships,
             args=[workflow_args],
             retry_policy=retry_policy,
             start_to_close_timeout=self.default_start_to_close_timeout,
             heartbeat_timeout=self.default_heartbeat_timeout,
         )
+        self._record_type_stats("relationship", stats, started)
         await self.run_exit_activities(workflow_args)
 
         # Summarize outputs for Temporal UI result
         summary = await workflow.execute_activity_method(
             self.activities_cls.summarize_outputs,
-            args=[workflow_args],
+            args=[{**workflow_args, "type_stats": self.type_stats}],
             retry_policy=RetryPolicy(maximum_attempts=3, backoff_coefficient=2),
             start_to_close_timeout=self.default_start_to_close_timeout,
             heartbeat_timeout=self.default_heartbeat_timeout,
@@ -174,3 +256,90 @@ class SQLMetadataExtractionWorkflow(BaseSQLMetadataExtractionWorkflow):
         except Exception:
             # Non-fatal: do not block summary
             pass
+
+        # Write Arrow IPC per asset type for downstream jobs
+        try:
+            await workflow.execute_activity_method(
+                self.activities_cls.write_columnar_output,
+                args=[workflow_args],
+                retry_policy=retry_policy,
+                start_to_close_timeout=self.default_start_to_close_timeout,
+                heartbeat_timeout=self.default_heartbeat_timeout,
+            )
+        except Exception:
+            # Non-fatal
+            pass
+
+        # Lineage graph index for upstream/downstream queries
+        try:
+            await workflow.execute_activity_method(
+                self.activities_cls.build_lineage_index,
+                args=[workflow_args],
+                retry_policy=retry_policy,
+                start_to_close_timeout=self.default_start_to_close_timeout,
+                heartbeat_timeout=self.default_heartbeat_timeout,
+            )
+        except Exception:
+            # Non-fatal
+            pass
+
+        # Indexed SQLite copy of every asset type for filtered reads
+        try:
+            await workflow.execute_activity_method(
+                self.activities_cls.build_metadata_store,
+                args=[workflow_args],
+                retry_policy=retry_policy,
+                start_to_close_timeout=self.default_start_to_close_timeout,
+                heartbeat_timeout=self.default_heartbeat_timeout,
+            )
+        except Exception:
+            # Non-fatal
+            pass
+
+        # Name search index over schemas, tables, columns and indexes
+        try:
+            await workflow.execute_activity_method(
+                self.activities_cls.build_search_index,
+                args=[workflow_args],
+                retry_policy=retry_policy,
+                start_to_close_timeout=self.default_start_to_close_timeout,
+                heartbeat_timeout=self.default_heartbeat_timeout,
+            )
+        except Exception:
+            # Non-fatal
+            pass
+
+        # Per-asset fingerprints, then an optional diff against an earlier run
+        try:
+            await workflow.execute_activity_method(
+                self.activities_cls.build_fingerprints,
+                args=[workflow_args],
+                retry_policy=retry_policy,
+                start_to_close_timeout=self.default_start_to_close_timeout,
+                heartbeat_timeout=self.default_heartbeat_timeout,
+            )
+            if workflow_args.get("diff_base_workflow_id"):
+                await workflow.execute_activity_method(
+                    self.activities_cls.diff_runs,
+                    args=[workflow_args],
+                    retry_policy=retry_policy,
+                    start_to_close_timeout=self.default_start_to_close_timeout,
+                    heartbeat_timeout=self.default_heartbeat_timeout,
+                )
+        except Exception:
+            # Non-fatal
+            pass
+
+        # Diagnostic: EXPLAIN the extraction queries once extraction is done
+        if workflow_args.get("explain"):
+            try:
+                await workflow.execute_activity_method(
+                    self.activities_cls.explain_queries,
+                    args=[workflow_args],
+                    retry_policy=RetryPolicy(maximum_attempts=1),
+                    start_to_close_timeout=self.default_start_to_close_timeout,
+                    heartbeat_timeout=self.default_heartbeat_timeout,
+                )
+            except Exception:
+                # Non-fatal
+                pass
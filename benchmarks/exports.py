@@ -0,0 +1,313 @@
+"""Hermetic transform/export benchmarks on generated fixtures, with a baseline check.
+
+Runs the activities that only read chunks, without Postgres, Temporal or Dapr:
+
+    transform_relationships, transform_view_dependencies,
+    write_json_output, write_text_output, write_excel_output
+
+against a fixture from benchmarks/fixtures.py. Each step runs in its own
+subprocess (so peak RSS is that step's alone) with the fixture's store/
+directory standing in for the object store: downloads take the
+LOCAL_OBJECT_STORE_PATH fast path and uploads are copied into store/, the same
+layout as Dapr's local storage binding.
+
+Per step it reports wall time, rows (records written by a transform, fixture
+rows read by an exporter), rows/s and peak RSS, then compares with a stored
+baseline: a step regresses when its rows/s falls, or its peak RSS grows, by more
+than --threshold. The exit status is 1 on a failed step, a regression or a
+missing baseline file (record one with --save-baseline), for CI.
+
+    uv run python benchmarks/exports.py --generate                      # fixture + run + compare
+    uv run python benchmarks/exports.py --save-baseline                 # accept the current numbers
+    uv run python benchmarks/exports.py --generate --columns 200 --save-baseline --baseline .bench/exports-200.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import add_fixture_args, generate  # noqa: E402
+from measure import MB, RssSampler, git_commit, rss_bytes  # noqa: E402
+
+STEPS = [
+    "transform_relationships",
+    "transform_view_dependencies",
+    "write_json_output",
+    "write_text_output",
+    "write_excel_output",
+]
+# Written by the transforms above; cleared so every run starts from the same tree
+TRANSFORM_OUTPUTS = ("relationship", "view_dependency")
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "exports.json")
+
+
+def step_env(directory: str) -> dict:
+    env = os.environ.copy()
+    env["ATLAN_TEMPORARY_PATH"] = os.path.join(directory, "tmp") + os.sep
+    env["LOCAL_OBJECT_STORE_PATH"] = os.path.join(directory, "store")
+    env["ATLAN_APPLICATION_NAME"] = "postgres"
+    env["CHUNK_DEDUP"] = "false"
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (ROOT, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def install_directory_store(root: str) -> None:
+    """Point the SDK's object store at a plain directory (keys are paths below ``root``)."""
+    from application_sdk.services.objectstore import ObjectStore
+
+    async def upload_file(cls, source, destination, store_name=None, retain_local_copy=False):
+        target = os.path.join(root, destination)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # With LOCAL_OBJECT_STORE_HARDLINK the source may already be the target
+        if not (os.path.exists(target) and os.path.samefile(source, target)):
+            tmp = target + ".upload"
+            shutil.copyfile(source, tmp)
+            os.replace(tmp, target)
+        if not retain_local_copy:
+            cls._cleanup_local_path(source)
+
+    async def list_files(cls, prefix="", store_name=None):
+        keys = []
+        for dirpath, _, files in os.walk(os.path.join(root, prefix)):
+            keys.extend(os.path.relpath(os.path.join(dirpath, f), root) for f in files)
+        return keys
+
+    async def get_content(cls, key, store_name=None):
+        with open(os.path.join(root, key), "rb") as f:
+            return f.read()
+
+    ObjectStore.upload_file = classmethod(upload_file)
+    ObjectStore.list_files = classmethod(list_files)
+    ObjectStore.get_content = classmethod(get_content)
+
+
+async def run_step(name: str, directory: str) -> dict:
+    """Run one activity in this process (called in the per-step subprocess)."""
+    import dataclasses
+
+    from temporalio.testing import ActivityEnvironment
+
+    install_directory_store(os.path.join(directory, "store"))
+
+    from application_sdk.constants import TEMPORARY_PATH
+    from app.activities import SQLMetadataExtractionActivities
+
+    with open(os.path.join(directory, "fixture.json"), "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    workflow_args = {
+        "workflow_id": fixture["workflow_id"],
+        "workflow_run_id": fixture["run_id"],
+        "output_prefix": TEMPORARY_PATH,
+        "output_path": os.path.join(TEMPORARY_PATH, fixture["key_prefix"]),
+        "connection": {"connection_name": "fixture", "connection_qualified_name": fixture["connection_qualified_name"]},
+    }
+    env = ActivityEnvironment()
+    env.info = dataclasses.replace(
+        env.info, workflow_id=fixture["workflow_id"], workflow_run_id=fixture["run_id"], heartbeat_timeout=None
+    )
+    fn = getattr(SQLMetadataExtractionActivities(), name)
+
+    rss_before = rss_bytes()
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        result = await env.run(fn, dict(workflow_args))
+        seconds = time.perf_counter() - started
+
+    if isinstance(result, dict) and "total_record_count" in result:
+        rows = int(result["total_record_count"] or 0)
+    elif hasattr(result, "total_record_count"):
+        rows = int(result.total_record_count or 0)
+    else:
+        rows = sum(fixture["rows"].values())
+    path = result.get("path") if isinstance(result, dict) else None
+    return {
+        "name": name,
+        "seconds": round(seconds, 3),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds, 1) if rows and seconds > 0 else None,
+        "peak_rss_mb": rss.peak_mb,
+        "rss_growth_mb": round((rss.peak - rss_before) / MB, 1) if rss.peak and rss_before else None,
+        "output_bytes": os.path.getsize(path) if path and os.path.exists(path) else None,
+    }
+
+
+def reset_run_dirs(directory: str, fixture: dict) -> None:
+    shutil.rmtree(os.path.join(directory, "tmp"), ignore_errors=True)
+    shutil.rmtree(os.path.join(directory, "work"), ignore_errors=True)
+    os.makedirs(os.path.join(directory, "work"), exist_ok=True)
+    for typename in TRANSFORM_OUTPUTS:
+        shutil.rmtree(os.path.join(directory, "store", fixture["key_prefix"], "transformed", typename), ignore_errors=True)
+
+
+def run_sequence(directory: str, fixture: dict) -> list[dict]:
+    reset_run_dirs(directory, fixture)
+    env = step_env(os.path.abspath(directory))
+    results = []
+    for name in STEPS:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--step", name, "--dir", os.path.abspath(directory)],
+            cwd=os.path.join(directory, "work"),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            results.append({"name": name, "error": (proc.stderr or proc.stdout).strip()[-2000:]})
+        else:
+            results.append(json.loads(lines[-1]))
+        step = results[-1]
+        if "error" in step:
+            print(f"  {name:<30} FAILED", file=sys.stderr)
+        else:
+            print(
+                f"  {name:<30} {step['seconds']:>8.3f}s {step['rows_per_second'] or 0:>12.0f} rows/s "
+                f"{step['peak_rss_mb'] or 0:>8.1f} MB",
+                file=sys.stderr,
+            )
+    return results
+
+
+def best_of(runs: list[list[dict]]) -> list[dict]:
+    """Per step: the fastest run's timings, with the highest peak RSS seen."""
+    merged = []
+    for i, name in enumerate(STEPS):
+        attempts = [run[i] for run in runs if "error" not in run[i]]
+        if not attempts:
+            merged.append(runs[-1][i])
+            continue
+        best = dict(min(attempts, key=lambda s: s["seconds"]))
+        best["peak_rss_mb"] = max((s["peak_rss_mb"] or 0) for s in attempts) or None
+        merged.append(best)
+    return merged
+
+
+def fixture_key(fixture: dict) -> dict:
+    return {"shape": fixture["shape"], "chunk_rows": fixture["chunk_rows"], "rows": fixture["rows"]}
+
+
+def compare(steps: list[dict], baseline: dict, fixture: dict, threshold: float) -> tuple[list[dict], Optional[str]]:
+    """Regressions against ``baseline``, or a reason the comparison was skipped."""
+    if baseline.get("fixture") != fixture_key(fixture):
+        return [], "baseline was recorded on a different fixture"
+    regressions = []
+    base_steps = baseline.get("steps", {})
+    for step in steps:
+        base = base_steps.get(step["name"])
+        if not base:
+            continue
+        if "error" in step:
+            regressions.append({"name": step["name"], "metric": "error", "detail": step["error"][-200:]})
+            continue
+        if base.get("rows_per_second") and step.get("rows_per_second"):
+            ratio = step["rows_per_second"] / base["rows_per_second"]
+            if ratio < 1 - threshold:
+                regressions.append({"name": step["name"], "metric": "rows_per_second", "baseline": base["rows_per_second"],
+                                    "current": step["rows_per_second"], "change": round(ratio - 1, 3)})
+        if base.get("peak_rss_mb") and step.get("peak_rss_mb"):
+            ratio = step["peak_rss_mb"] / base["peak_rss_mb"]
+            if ratio > 1 + threshold:
+                regressions.append({"name": step["name"], "metric": "peak_rss_mb", "baseline": base["peak_rss_mb"],
+                                    "current": step["peak_rss_mb"], "change": round(ratio - 1, 3)})
+    return regressions, None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dir", default=os.path.join(ROOT, ".bench", "exports"), help="fixture and scratch directory")
+    parser.add_argument("--generate", action="store_true", help="(re)generate the fixture first")
+    add_fixture_args(parser)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per step; the fastest counts")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown / RSS growth (0.25 = 25%%)")
+    parser.add_argument("--output", help="write the JSON result here instead of stdout")
+    parser.add_argument("--step", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.step:
+        print(json.dumps(asyncio.run(run_step(args.step, args.dir))))
+        return
+
+    fixture_path = os.path.join(args.dir, "fixture.json")
+    if args.generate or not os.path.exists(fixture_path):
+        print(f"Generating fixture in {args.dir} ...", file=sys.stderr)
+        generate(
+            args.dir,
+            schemas=args.schemas,
+            tables=args.tables,
+            columns=args.columns,
+            indexes=args.indexes,
+            views=args.views,
+            fk_ratio=args.fk_ratio,
+            chunk_rows=args.chunk_rows,
+        )
+    with open(fixture_path, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    runs = []
+    for i in range(max(1, args.repeat)):
+        print(f"Run {i + 1}/{max(1, args.repeat)}:", file=sys.stderr)
+        runs.append(run_sequence(args.dir, fixture))
+    steps = best_of(runs)
+
+    report: dict = {
+        "benchmark": "exports",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "fixture": fixture_key(fixture),
+        "steps": steps,
+        "threshold": args.threshold,
+    }
+    failed = any("error" in s for s in steps)
+    missing = False
+    regressions: list[dict] = []
+    if args.save_baseline and not failed:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "git_commit": report["git_commit"],
+                "timestamp": report["timestamp"],
+                "fixture": report["fixture"],
+                "steps": {s["name"]: {"rows_per_second": s["rows_per_second"], "peak_rss_mb": s["peak_rss_mb"]} for s in steps},
+            }, f, indent=2)
+            f.write("\n")
+        report["baseline"] = {"path": args.baseline, "saved": True}
+    elif os.path.isfile(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions, skipped = compare(steps, baseline, fixture, args.threshold)
+        report["baseline"] = {"path": args.baseline, "commit": baseline.get("git_commit"), "skipped": skipped}
+    else:
+        # A benchmark that silently compares with nothing would pass CI forever
+        missing = True
+        report["baseline"] = {"path": args.baseline, "skipped": "no baseline file"}
+    report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    for r in regressions:
+        print(f"REGRESSION {r['name']}: {r['metric']} {r.get('baseline')} -> {r.get('current')}", file=sys.stderr)
+    if missing:
+        print(f"No baseline at {args.baseline}; record one with --save-baseline", file=sys.stderr)
+    if failed or regressions or missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
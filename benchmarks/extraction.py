@@ -0,0 +1,328 @@
+"""Extraction benchmark: per-activity timings and the workflow end to end.
+
+Against a Postgres holding a synthetic catalog (``--generate`` builds one with
+benchmarks/synthetic_catalog.py first), two phases:
+
+    activities  every fetch_* / transform_* / write_* / build_* activity of the
+                workflow, called one at a time in this process in workflow
+                order (Temporal's ActivityEnvironment supplies the activity
+                context), each with its wall time, rows and peak RSS
+    workflow    one full run started through the app's /workflows/v1/start,
+                timed until its run_finished event, with the per-stage
+                seconds reported by the event stream and, given --server-pid,
+                the server's peak RSS
+
+The result is one JSON document (stdout, or --output) for trend tracking; a
+readable table goes to stderr. The activities phase needs the Dapr sidecar for
+the object store (``uv run poe start-dapr``); the workflow phase needs the full
+stack (``uv run poe start-deps`` and ``uv run main.py``).
+
+    uv run python benchmarks/extraction.py --generate --schemas 10 --tables 50 --columns 20
+    uv run python benchmarks/extraction.py --phase activities --output bench.json
+    uv run python benchmarks/extraction.py --phase workflow --server-pid $(pgrep -f main.py)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from measure import RssSampler, git_commit, max_rss_mb  # noqa: E402
+from synthetic_catalog import add_catalog_args, add_connection_args, connect, generate  # noqa: E402
+
+# Base SDK fetches, then the app's own fetch/transform pairs, in workflow order
+SDK_FETCHES = ["fetch_databases", "fetch_schemas", "fetch_tables", "fetch_columns", "fetch_procedures"]
+CUSTOM_STAGES = [
+    ("fetch_indexes", "transform_indexes", "index"),
+    ("fetch_quality_metrics", "transform_quality_metrics", "quality_metric"),
+    ("fetch_view_dependencies", "transform_view_dependencies", "view_dependency"),
+    ("fetch_relationships", "transform_relationships", "relationship"),
+]
+EXIT_ACTIVITIES = [
+    "write_json_output",
+    "write_text_output",
+    "write_excel_output",
+    "write_columnar_output",
+    "build_lineage_index",
+    "build_metadata_store",
+    "build_search_index",
+    "build_fingerprints",
+]
+
+
+def _field(result: Any, name: str) -> Any:
+    if isinstance(result, dict):
+        return result.get(name)
+    return getattr(result, name, None)
+
+
+def _record_count(result: Any) -> Optional[int]:
+    value = _field(result, "total_record_count")
+    if value is None:
+        value = _field(result, "count")
+    return int(value) if value is not None else None
+
+
+def _step(name: str, seconds: float, rows: Optional[int], peak_mb: Optional[float], **extra) -> dict:
+    return {
+        "name": name,
+        "seconds": round(seconds, 3),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds, 1) if rows and seconds > 0 else None,
+        "peak_rss_mb": peak_mb,
+        **extra,
+    }
+
+
+def credentials_from(args) -> dict:
+    return {
+        "authType": "basic",
+        "host": args.host,
+        "port": args.port,
+        "username": args.user,
+        "password": args.password,
+        "database": args.database,
+        "extra": {"sslmode": args.sslmode},
+    }
+
+
+def metadata_filters(args) -> dict:
+    return {
+        "include-filter": json.dumps({f"^{args.database}$": [f"^{args.prefix}_s[0-9]+$"]}),
+        "exclude-filter": "{}",
+        "temp-table-regex": "",
+        "exclude_views": False,
+        "exclude_empty_tables": False,
+    }
+
+
+async def run_activities(args) -> dict:
+    import dataclasses
+
+    from temporalio.testing import ActivityEnvironment
+
+    from application_sdk.constants import APPLICATION_NAME, TEMPORARY_PATH, WORKFLOW_OUTPUT_PATH_TEMPLATE
+    from app.activities import SQLMetadataExtractionActivities
+    from app.clients import SQLClient
+    from app.handlers import PostgresHandler
+    from app.workflows import SQLMetadataExtractionWorkflow
+
+    epoch = int(time.time())
+    workflow_id, run_id = f"bench-{epoch}", f"bench-run-{epoch}"
+    workflow_args = {
+        "credentials": credentials_from(args),
+        "connection": {"connection_name": "bench", "connection_qualified_name": f"default/postgres/{epoch}"},
+        "metadata": metadata_filters(args),
+        "tenant_id": "default",
+        "workflow_id": workflow_id,
+        "workflow_run_id": run_id,
+        "output_prefix": TEMPORARY_PATH,
+        "output_path": os.path.join(
+            TEMPORARY_PATH,
+            WORKFLOW_OUTPUT_PATH_TEMPLATE.format(
+                application_name=APPLICATION_NAME, workflow_id=workflow_id, run_id=run_id
+            ),
+        ),
+    }
+
+    env = ActivityEnvironment()
+    env.info = dataclasses.replace(env.info, workflow_id=workflow_id, workflow_run_id=run_id, heartbeat_timeout=None)
+    activities = SQLMetadataExtractionActivities(sql_client_class=SQLClient, handler_class=PostgresHandler)
+
+    async def _init_state() -> None:
+        await activities._set_state(workflow_args)
+        state = await activities._get_state(workflow_args)
+        await state.sql_client.load(workflow_args["credentials"])
+
+    await env.run(_init_state)
+
+    steps: list[dict] = []
+    type_stats: dict[str, dict] = {}
+
+    async def timed(name: str, payload: dict, rows: Optional[int] = None, **extra) -> Any:
+        fn = getattr(activities, name)
+        with RssSampler() as rss:
+            started = time.perf_counter()
+            result = await env.run(fn, payload)
+            seconds = time.perf_counter() - started
+        count = _record_count(result)
+        steps.append(_step(name, seconds, count if count is not None else rows, rss.peak_mb, **extra))
+        print(f"  {name:<32} {seconds:>9.3f}s", file=sys.stderr)
+        return result
+
+    def note(typename: str, result: Any) -> dict:
+        entry = type_stats.setdefault(typename, {"total_record_count": 0, "chunk_count": 0, "seconds": 0.0})
+        entry["total_record_count"] += _record_count(result) or 0
+        entry["chunk_count"] += int(_field(result, "chunk_count") or 0)
+        return entry
+
+    workflow = SQLMetadataExtractionWorkflow()
+    for fetch in SDK_FETCHES:
+        started = time.perf_counter()
+        raw = await timed(fetch, dict(workflow_args))
+        if raw is None:
+            continue
+        raw = raw if isinstance(raw, dict) else raw.model_dump()
+        typename, partitions = raw.get("typename"), raw.get("partitions") or []
+        if not typename or not raw.get("chunk_count") or not partitions:
+            continue
+        batches, chunk_starts = workflow.get_transform_batches(raw["chunk_count"], typename, partitions)
+        for batch, chunk_start in zip(batches, chunk_starts):
+            result = await timed(
+                "transform_data",
+                {"typename": typename, "file_names": batch, "chunk_start": chunk_start, **workflow_args},
+                typename=typename,
+            )
+            note(typename, result)
+        note(typename, None)["seconds"] = round(time.perf_counter() - started, 3)
+
+    for fetch, transform, typename in CUSTOM_STAGES:
+        started = time.perf_counter()
+        await timed(fetch, dict(workflow_args))
+        result = await timed(transform, dict(workflow_args))
+        note(typename, result)["seconds"] = round(time.perf_counter() - started, 3)
+
+    total_rows = sum(s["total_record_count"] for s in type_stats.values())
+    for name in EXIT_ACTIVITIES:
+        # Exporters read every extracted row; count those as their throughput
+        await timed(name, dict(workflow_args), rows=total_rows)
+    await timed("summarize_outputs", {**workflow_args, "type_stats": type_stats}, rows=total_rows)
+
+    return {
+        "workflow_id": workflow_id,
+        "steps": steps,
+        "types": type_stats,
+        "rows": total_rows,
+        "seconds": round(sum(s["seconds"] for s in steps), 3),
+        "peak_rss_mb": max((s["peak_rss_mb"] or 0 for s in steps), default=None),
+    }
+
+
+async def run_workflow(args) -> dict:
+    import httpx
+
+    epoch = int(time.time())
+    payload = {
+        "credentials": credentials_from(args),
+        "connection": {"connection_name": "bench", "connection_qualified_name": f"default/postgres/{epoch}"},
+        "metadata": metadata_filters(args),
+        "tenant_id": "default",
+    }
+    stages: dict[str, float] = {}
+    outcome: dict = {"rows": 0, "failed": None}
+
+    async def follow(client, workflow_id: str) -> None:
+        event = None
+        async with client.stream("GET", f"/workflows/v1/events/{workflow_id}") as stream:
+            async for line in stream.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                    continue
+                if not line.startswith("data: ") or not event:
+                    continue
+                message = json.loads(line[len("data: "):])
+                if event == "stage_finished":
+                    stage = message.get("stage", "")
+                    stages[stage] = round(stages.get(stage, 0.0) + float(message.get("seconds") or 0), 3)
+                elif event == "stage_failed" and message.get("stage") == "summarize_outputs":
+                    outcome["failed"] = message
+                    return
+                elif event == "run_finished":
+                    types = message.get("types") or {}
+                    outcome["rows"] = sum(int(t.get("total_record_count") or 0) for t in types.values())
+                    return
+
+    sampler = RssSampler(args.server_pid) if args.server_pid else None
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=None) as client:
+        resp = await client.post("/workflows/v1/start", json=payload)
+        resp.raise_for_status()
+        workflow_id = (resp.json().get("data") or {}).get("workflow_id")
+        if not workflow_id:
+            raise SystemExit(f"No workflow id in start response: {resp.text}")
+        if sampler:
+            sampler.__enter__()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(follow(client, workflow_id), args.timeout)
+        except asyncio.TimeoutError:
+            outcome["failed"] = {"error": f"timed out after {args.timeout:.0f}s"}
+        finally:
+            seconds = time.perf_counter() - started
+            if sampler:
+                sampler.__exit__(None, None, None)
+    rows = outcome["rows"]
+    return {
+        "workflow_id": workflow_id,
+        "seconds": round(seconds, 3),
+        "rows": rows,
+        "rows_per_second": round(rows / seconds, 1) if rows and seconds > 0 else None,
+        "server_peak_rss_mb": sampler.peak_mb if sampler else None,
+        "stages": stages,
+        "failed": outcome["failed"],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_connection_args(parser)
+    add_catalog_args(parser)
+    parser.add_argument("--generate", action="store_true", help="(re)build the synthetic catalog first")
+    parser.add_argument("--phase", choices=("all", "activities", "workflow"), default="all")
+    parser.add_argument("--base-url", default="http://localhost:3000", help="app server for the workflow phase")
+    parser.add_argument("--server-pid", help="app server pid, to sample its RSS during the workflow phase")
+    parser.add_argument("--timeout", type=float, default=3600.0, help="workflow phase timeout in seconds")
+    parser.add_argument("--output", help="write the JSON result here instead of stdout")
+    args = parser.parse_args()
+
+    report: dict = {
+        "benchmark": "extraction",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "catalog": {"prefix": args.prefix, "database": args.database},
+    }
+    if args.generate:
+        print(f"Generating catalog {args.prefix}_s* ...", file=sys.stderr)
+        with connect(args) as conn:
+            report["catalog"].update(
+                generate(
+                    conn,
+                    prefix=args.prefix,
+                    schemas=args.schemas,
+                    tables=args.tables,
+                    columns=args.columns,
+                    views=args.views,
+                    indexes=args.indexes,
+                    fk_ratio=args.fk_ratio,
+                    rows=args.rows,
+                )
+            )
+    if args.phase in ("all", "activities"):
+        print("Activities:", file=sys.stderr)
+        report["activities"] = await run_activities(args)
+    if args.phase in ("all", "workflow"):
+        print("Workflow end to end ...", file=sys.stderr)
+        report["workflow"] = await run_workflow(args)
+        w = report["workflow"]
+        print(f"  {'workflow':<32} {w['seconds']:>9.3f}s  {w['rows']} rows", file=sys.stderr)
+    report["process_max_rss_mb"] = max_rss_mb()
+
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
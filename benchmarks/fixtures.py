@@ -0,0 +1,355 @@
+"""Generate raw/ and transformed/ chunk trees for the export benchmarks.
+
+Writes what an extraction would leave in the object store, without Postgres
+or Temporal:
+
+    <dir>/store/artifacts/apps/postgres/workflows/<workflow_id>/<run_id>/
+        raw/<type>/chunk-0-part<n>.parquet          every type, extract_*.sql columns
+        transformed/<type>/chunk-0-part<n>.jsonl    database/schema/table/column entities,
+                                                    index/quality_metric pass-through
+    <dir>/fixture.json                              shape, key prefix and rows per type
+
+relationship and view_dependency are left for the benchmarked transforms to
+produce, as in a real run. Rows are generated chunk by chunk, so the catalog
+can be scaled to tens of millions of columns (``--schemas 100 --tables 1000
+--columns 100`` is 10M columns plus 10M quality metrics) in bounded memory.
+
+    uv run python benchmarks/fixtures.py --dir .bench/fixture --schemas 20 --tables 100 --columns 20
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from typing import Callable, Iterator
+
+APP_NAME = "postgres"
+WORKFLOW_ID = "fixture"
+RUN_ID = "fixture-run"
+CONNECTION_QN = "default/postgres/1700000000"
+DATABASE = "benchdb"
+SYNC_AT = 1700000000000
+
+DATA_TYPES = ["integer", "text", "bigint", "character varying", "numeric", "timestamp with time zone", "boolean", "date", "jsonb", "uuid"]
+
+
+def key_prefix(workflow_id: str = WORKFLOW_ID, run_id: str = RUN_ID) -> str:
+    # Same layout as the SDK's WORKFLOW_OUTPUT_PATH_TEMPLATE
+    return f"artifacts/apps/{APP_NAME}/workflows/{workflow_id}/{run_id}"
+
+
+class Shape:
+    def __init__(self, schemas: int, tables: int, columns: int, indexes: int, views: int, fk_ratio: float):
+        self.schemas = schemas
+        self.tables = tables
+        self.columns = columns
+        self.indexes = indexes
+        self.views = min(views, max(0, tables - 1))
+        self.fk_ratio = fk_ratio
+
+    def schema(self, s: int) -> str:
+        return f"bench_s{s}"
+
+    def table(self, t: int) -> str:
+        return f"t{t}"
+
+    def column(self, c: int) -> str:
+        return "id" if c == 0 else f"c{c}"
+
+    def has_fk(self, t: int) -> bool:
+        # Same spread as benchmarks/synthetic_catalog.py
+        return t > 0 and int(t * self.fk_ratio) != int((t - 1) * self.fk_ratio)
+
+    def as_dict(self) -> dict:
+        return {
+            "schemas": self.schemas,
+            "tables_per_schema": self.tables,
+            "columns_per_table": self.columns,
+            "indexes_per_table": self.indexes,
+            "views_per_schema": self.views,
+            "fk_ratio": self.fk_ratio,
+        }
+
+
+def _qn(*parts) -> str:
+    return "/".join([CONNECTION_QN, *map(str, parts)])
+
+
+def _entity(type_name: str, name: str, qualified_name: str, extra: str = "") -> str:
+    # Shape of the SDK transformer's entities; names are plain ASCII so no escaping is needed
+    return (
+        f'{{"typeName":"{type_name}","status":"ACTIVE","attributes":{{"name":"{name}",'
+        f'"qualifiedName":"{qualified_name}","connectionQualifiedName":"{CONNECTION_QN}",'
+        f'"connectorName":"postgres","lastSyncRunAt":{SYNC_AT},"lastSyncWorkflowName":"{WORKFLOW_ID}"{extra}}},'
+        f'"customAttributes":{{}}}}'
+    )
+
+
+# Each generator yields (raw column dict, transformed JSON lines or None) per chunk of row ids.
+
+
+def _databases(shape: Shape, ids: range):
+    raw = {"database_name": [DATABASE for _ in ids]}
+    lines = [_entity("Database", DATABASE, _qn(DATABASE), f',"schemaCount":{shape.schemas}') for _ in ids]
+    return raw, lines
+
+
+def _schemas(shape: Shape, ids: range):
+    names = [shape.schema(s) for s in ids]
+    raw = {"schema_name": names, "catalog_name": [DATABASE] * len(names)}
+    lines = [
+        _entity("Schema", n, _qn(DATABASE, n), f',"databaseName":"{DATABASE}","tableCount":{shape.tables}')
+        for n in names
+    ]
+    return raw, lines
+
+
+def _tables(shape: Shape, ids: range):
+    schemas = [shape.schema(i // shape.tables) for i in ids]
+    tables = [shape.table(i % shape.tables) for i in ids]
+    raw = {
+        "table_catalog": [DATABASE] * len(tables),
+        "table_schema": schemas,
+        "table_name": tables,
+        "table_type": ["BASE TABLE"] * len(tables),
+    }
+    lines = [
+        _entity(
+            "Table",
+            t,
+            _qn(DATABASE, s, t),
+            f',"databaseName":"{DATABASE}","schemaName":"{s}","columnCount":{shape.columns}',
+        )
+        for s, t in zip(schemas, tables)
+    ]
+    return raw, lines
+
+
+def _column_parts(shape: Shape, ids: range):
+    per_schema = shape.tables * shape.columns
+    schemas = [shape.schema(i // per_schema) for i in ids]
+    tables = [shape.table((i // shape.columns) % shape.tables) for i in ids]
+    positions = [i % shape.columns for i in ids]
+    return schemas, tables, positions
+
+
+def _columns(shape: Shape, ids: range):
+    schemas, tables, positions = _column_parts(shape, ids)
+    names = [shape.column(p) for p in positions]
+    types = ["bigint" if p == 0 else DATA_TYPES[p % len(DATA_TYPES)] for p in positions]
+    raw = {
+        "table_catalog": [DATABASE] * len(names),
+        "table_schema": schemas,
+        "table_name": tables,
+        "column_name": names,
+        "ordinal_position": [p + 1 for p in positions],
+        "is_nullable": ["NO" if p == 0 else "YES" for p in positions],
+        "data_type": types,
+    }
+    lines = [
+        _entity(
+            "Column",
+            n,
+            _qn(DATABASE, s, t, n),
+            f',"databaseName":"{DATABASE}","schemaName":"{s}","tableName":"{t}",'
+            f'"dataType":"{dt}","order":{p + 1},"isNullable":{"false" if p == 0 else "true"}',
+        )
+        for s, t, n, dt, p in zip(schemas, tables, names, types, positions)
+    ]
+    return raw, lines
+
+
+def _indexes(shape: Shape, ids: range):
+    per_table = 1 + shape.indexes
+    schemas = [shape.schema(i // (shape.tables * per_table)) for i in ids]
+    tables = [shape.table((i // per_table) % shape.tables) for i in ids]
+    slots = [i % per_table for i in ids]
+    raw = {
+        "catalog_name": [DATABASE] * len(slots),
+        "schema_name": schemas,
+        "table_name": tables,
+        "index_name": [f"{t}_pkey" if k == 0 else f"{t}_c{k}_idx" for t, k in zip(tables, slots)],
+        "is_unique": [k == 0 for k in slots],
+        "is_primary": [k == 0 for k in slots],
+        "column_names": ["id" if k == 0 else f"c{k}" for k in slots],
+    }
+    return raw, _passthrough(raw)
+
+
+def _quality_metrics(shape: Shape, ids: range):
+    schemas, tables, positions = _column_parts(shape, ids)
+    raw = {
+        "catalog_name": [DATABASE] * len(positions),
+        "schema_name": schemas,
+        "table_name": tables,
+        "column_name": [shape.column(p) for p in positions],
+        "total_rows_estimated": [1000] * len(positions),
+        "null_frac": [0.0 if p == 0 else 0.1 for p in positions],
+        "null_count_estimated": [0 if p == 0 else 100 for p in positions],
+        "distinct_count_estimated": [1000 if p == 0 else 97 for p in positions],
+        "n_distinct_raw": [-1.0 if p == 0 else 97.0 for p in positions],
+    }
+    return raw, _passthrough(raw)
+
+
+def _relationships(shape: Shape, ids: range):
+    # ids index the FK-bearing tables
+    rows = [(s, t) for s, t in ids]
+    raw = {
+        "src_catalog_name": [DATABASE] * len(rows),
+        "src_schema_name": [shape.schema(s) for s, _ in rows],
+        "src_table_name": [shape.table(t) for _, t in rows],
+        "src_column_name": ["parent_id"] * len(rows),
+        "dst_catalog_name": [DATABASE] * len(rows),
+        "dst_schema_name": [shape.schema(s) for s, _ in rows],
+        "dst_table_name": [shape.table(t - 1) for _, t in rows],
+        "dst_column_name": ["id"] * len(rows),
+        "constraint_name": [f"t{t}_parent_id_fkey" for _, t in rows],
+    }
+    return raw, None
+
+
+def _view_dependencies(shape: Shape, ids: range):
+    # Two base tables per view
+    per_schema = shape.views * 2
+    schemas = [shape.schema(i // per_schema) for i in ids]
+    views = [(i % per_schema) // 2 for i in ids]
+    sources = [v + (i % 2) for v, i in zip(views, ids)]
+    raw = {
+        "src_catalog_name": [DATABASE] * len(views),
+        "src_schema_name": schemas,
+        "src_table_name": [shape.table(t) for t in sources],
+        "dst_catalog_name": [DATABASE] * len(views),
+        "dst_schema_name": schemas,
+        "dst_table_name": [f"v{v}" for v in views],
+    }
+    return raw, None
+
+
+def _passthrough(raw: dict) -> list[str]:
+    names = list(raw)
+    return [json.dumps(dict(zip(names, values))) for values in zip(*raw.values())]
+
+
+class _FkIds:
+    """Sliceable (schema, table) ids of the tables that carry a foreign key."""
+
+    def __init__(self, shape: Shape):
+        self.per_schema = [t for t in range(shape.tables) if shape.has_fk(t)]
+        self.total = len(self.per_schema) * shape.schemas
+
+    def __len__(self) -> int:
+        return self.total
+
+    def slice(self, start: int, stop: int):
+        n = len(self.per_schema)
+        return [(i // n, self.per_schema[i % n]) for i in range(start, stop)]
+
+
+def _chunks(total: int, chunk_rows: int) -> Iterator[tuple[int, int]]:
+    for start in range(0, total, chunk_rows):
+        yield start, min(total, start + chunk_rows)
+
+
+def _write_type(base: str, shape: Shape, typename: str, total: int, make: Callable, ids_for, chunk_rows: int) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    for part, (start, stop) in enumerate(_chunks(total, chunk_rows), start=1):
+        raw, lines = make(shape, ids_for(start, stop))
+        raw_dir = os.path.join(base, "raw", typename)
+        os.makedirs(raw_dir, exist_ok=True)
+        pq.write_table(pa.table(raw), os.path.join(raw_dir, f"chunk-0-part{part}.parquet"))
+        if lines is not None:
+            out_dir = os.path.join(base, "transformed", typename)
+            os.makedirs(out_dir, exist_ok=True)
+            with open(os.path.join(out_dir, f"chunk-0-part{part}.jsonl"), "w", encoding="utf-8") as f:
+                f.write("\n".join(lines))
+                f.write("\n")
+    return total
+
+
+def generate(
+    directory: str,
+    schemas: int = 20,
+    tables: int = 100,
+    columns: int = 20,
+    indexes: int = 2,
+    views: int = 5,
+    fk_ratio: float = 0.5,
+    chunk_rows: int = 100_000,
+) -> dict:
+    """(Re)write the fixture under ``directory`` and return its description."""
+    started = time.perf_counter()
+    shape = Shape(schemas, tables, columns, indexes, views, fk_ratio)
+    store = os.path.join(directory, "store")
+    shutil.rmtree(store, ignore_errors=True)
+    prefix = key_prefix()
+    base = os.path.join(store, prefix)
+
+    fk_ids = _FkIds(shape)
+    plan = [
+        ("database", 1, _databases, lambda a, b: range(a, b)),
+        ("schema", schemas, _schemas, lambda a, b: range(a, b)),
+        ("table", schemas * tables, _tables, lambda a, b: range(a, b)),
+        ("column", schemas * tables * columns, _columns, lambda a, b: range(a, b)),
+        ("index", schemas * tables * (1 + indexes), _indexes, lambda a, b: range(a, b)),
+        ("quality_metric", schemas * tables * columns, _quality_metrics, lambda a, b: range(a, b)),
+        ("relationship", len(fk_ids), _relationships, fk_ids.slice),
+        ("view_dependency", schemas * shape.views * 2, _view_dependencies, lambda a, b: range(a, b)),
+    ]
+    rows = {}
+    for typename, total, make, ids_for in plan:
+        rows[typename] = _write_type(base, shape, typename, total, make, ids_for, chunk_rows)
+
+    size = 0
+    for root, _, files in os.walk(store):
+        size += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    description = {
+        "shape": shape.as_dict(),
+        "chunk_rows": chunk_rows,
+        "workflow_id": WORKFLOW_ID,
+        "run_id": RUN_ID,
+        "connection_qualified_name": CONNECTION_QN,
+        "key_prefix": prefix,
+        "rows": rows,
+        "bytes": size,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "fixture.json"), "w", encoding="utf-8") as f:
+        json.dump(description, f, indent=2)
+    return description
+
+
+def add_fixture_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--schemas", type=int, default=20, help="N schemas")
+    parser.add_argument("--tables", type=int, default=100, help="M tables per schema")
+    parser.add_argument("--columns", type=int, default=20, help="K columns per table")
+    parser.add_argument("--indexes", type=int, default=2, help="secondary indexes per table (plus the primary key)")
+    parser.add_argument("--views", type=int, default=5, help="views per schema")
+    parser.add_argument("--fk-ratio", type=float, default=0.5, help="share of tables with a foreign key")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="rows per chunk file")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dir", default=".bench/fixture", help="fixture directory (store/ is replaced)")
+    add_fixture_args(parser)
+    args = parser.parse_args()
+    description = generate(
+        args.dir,
+        schemas=args.schemas,
+        tables=args.tables,
+        columns=args.columns,
+        indexes=args.indexes,
+        views=args.views,
+        fk_ratio=args.fk_ratio,
+        chunk_rows=args.chunk_rows,
+    )
+    print(json.dumps(description, indent=2))
+
+
+if __name__ == "__main__":
+    main()
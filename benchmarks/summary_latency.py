@@ -0,0 +1,133 @@
+"""Load test: /workflows/v1/summary latency while large results are served.
+
+Runs two phases against a running server and prints latency percentiles for
+the summary endpoint in each:
+
+    idle    only the summary clients
+    loaded  the same clients while other clients download the run's full
+            output.txt / output.json in a loop
+
+A handler that reads or parses files on the event loop shows up as a p99 in
+the loaded phase that tracks the download time instead of staying near the
+idle figure.
+
+    uv run python benchmarks/summary_latency.py --workflow-id <id>
+    uv run python benchmarks/summary_latency.py --base-url http://localhost:3000 --duration 30
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Optional
+
+import httpx
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+async def summary_client(client: httpx.AsyncClient, url: str, stop: float, samples: list[float], errors: list[int]):
+    while time.monotonic() < stop:
+        started = time.perf_counter()
+        try:
+            resp = await client.get(url)
+            resp.read()
+            if resp.status_code != 200:
+                errors.append(resp.status_code)
+                continue
+        except httpx.HTTPError:
+            errors.append(0)
+            continue
+        samples.append((time.perf_counter() - started) * 1000)
+
+
+async def download_client(client: httpx.AsyncClient, urls: list[str], stop: float, totals: list[int]):
+    i = 0
+    while time.monotonic() < stop:
+        url = urls[i % len(urls)]
+        i += 1
+        try:
+            # identity so the server streams the full file, not a stored .gz
+            async with client.stream("GET", url, headers={"Accept-Encoding": "identity"}) as resp:
+                async for chunk in resp.aiter_bytes():
+                    totals.append(len(chunk))
+        except httpx.HTTPError:
+            await asyncio.sleep(0.1)
+
+
+async def run_phase(
+    base_url: str,
+    workflow_id: str,
+    seconds: float,
+    concurrency: int,
+    downloads: int,
+) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + downloads + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        stop = time.monotonic() + seconds
+        samples: list[float] = []
+        errors: list[int] = []
+        totals: list[int] = []
+        urls = [f"/workflows/v1/result/{workflow_id}", f"/workflows/v1/result-json/{workflow_id}"]
+        tasks = [
+            summary_client(client, f"/workflows/v1/summary/{workflow_id}", stop, samples, errors)
+            for _ in range(concurrency)
+        ]
+        tasks += [download_client(client, urls, stop, totals) for _ in range(downloads)]
+        await asyncio.gather(*tasks)
+    return {
+        "requests": len(samples),
+        "errors": len(errors),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": max(samples) if samples else float("nan"),
+        "mean": statistics.fmean(samples) if samples else float("nan"),
+        "downloaded_mb": sum(totals) / 1e6,
+    }
+
+
+async def latest_workflow_id(base_url: str) -> Optional[str]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=10) as client:
+        resp = await client.get("/workflows/v1/latest-output")
+        if resp.status_code != 200:
+            return None
+        return resp.json().get("workflow_id")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--base-url",
+        default=f"http://localhost:{os.getenv('ATLAN_APP_HTTP_PORT', '3000')}",
+        help="app server (default: localhost on ATLAN_APP_HTTP_PORT, 3000)",
+    )
+    parser.add_argument("--workflow-id", help="run to read (default: latest run with output)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent summary clients")
+    parser.add_argument("--downloads", type=int, default=4, help="concurrent full-result downloads")
+    args = parser.parse_args()
+
+    workflow_id = args.workflow_id or await latest_workflow_id(args.base_url)
+    if not workflow_id:
+        raise SystemExit("No workflow with output found; pass --workflow-id")
+
+    print(f"workflow {workflow_id}: {args.concurrency} summary clients, {args.downloads} downloads, {args.duration:.0f}s per phase")
+    print(f"{'phase':<8} {'reqs':>7} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'MB out':>8}")
+    for phase, downloads in (("idle", 0), ("loaded", args.downloads)):
+        r = await run_phase(args.base_url, workflow_id, args.duration, args.concurrency, downloads)
+        print(
+            f"{phase:<8} {r['requests']:>7} {r['errors']:>5} {r['p50']:>8.1f} {r['p95']:>8.1f} "
+            f"{r['p99']:>8.1f} {r['max']:>8.1f} {r['downloaded_mb']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
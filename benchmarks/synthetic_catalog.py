@@ -0,0 +1,211 @@
+"""Generate a synthetic catalog in a local Postgres for the extraction benchmarks.
+
+Creates ``<prefix>_s0 .. <prefix>_s{N-1}`` schemas, each with M tables of K
+columns (``id`` primary key first, then a rotation of common types), foreign
+keys between neighbouring tables, views joining them, secondary indexes, a few
+rows per table and ANALYZEd statistics, so every extract_*.sql query (including
+pg_stats-based quality metrics) has something to return.
+
+    uv run python benchmarks/synthetic_catalog.py --schemas 10 --tables 50 --columns 20
+    uv run python benchmarks/synthetic_catalog.py --drop            # remove the catalog again
+
+Connection settings come from the POSTGRES_* variables (see .env.example) or
+the flags below. Existing schemas with the same prefix are dropped first.
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Iterator
+
+import psycopg
+
+# (column type, value expression over generate_series ``g``)
+COLUMN_TYPES = [
+    ("integer", "(g * 7) % 1000"),
+    ("text", "'name-' || (g % 97)"),
+    ("bigint", "g * 31"),
+    ("varchar(64)", "md5(g::text)"),
+    ("numeric(12,2)", "(g % 10000) / 100.0"),
+    ("timestamptz", "timestamptz '2024-01-01' + g * interval '1 minute'"),
+    ("boolean", "g % 3 = 0"),
+    ("date", "date '2024-01-01' + (g % 365)"),
+    ("jsonb", "jsonb_build_object('k', g % 13)"),
+    ("uuid", "md5(g::text)::uuid"),
+]
+
+
+def connect(args) -> "psycopg.Connection":
+    return psycopg.connect(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        dbname=args.database,
+        sslmode=args.sslmode,
+        autocommit=True,
+    )
+
+
+def schema_names(conn, prefix: str) -> list[str]:
+    rows = conn.execute(
+        "SELECT nspname FROM pg_namespace WHERE nspname LIKE %s ORDER BY nspname",
+        (prefix.replace("_", r"\_") + r"\_s%",),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def drop_catalog(conn, prefix: str) -> int:
+    names = schema_names(conn, prefix)
+    for name in names:
+        conn.execute(f'DROP SCHEMA IF EXISTS "{name}" CASCADE')
+    return len(names)
+
+
+def schema_ddl(
+    schema: str,
+    tables: int,
+    columns: int,
+    views: int,
+    indexes: int,
+    fk_ratio: float,
+    rows: int,
+) -> Iterator[str]:
+    """Statements creating and filling one schema."""
+    yield f'CREATE SCHEMA "{schema}"'
+    for t in range(tables):
+        cols = ["id bigint PRIMARY KEY"]
+        # Tables reference their predecessor; fk_ratio of them get one, evenly spread
+        has_fk = t > 0 and int(t * fk_ratio) != int((t - 1) * fk_ratio)
+        if has_fk:
+            cols.append(f'parent_id bigint REFERENCES "{schema}".t{t - 1} (id)')
+        for c in range(max(0, columns - len(cols))):
+            col_type = COLUMN_TYPES[(t + c) % len(COLUMN_TYPES)][0]
+            cols.append(f"c{c} {col_type}")
+        yield f'CREATE TABLE "{schema}".t{t} (\n  ' + ",\n  ".join(cols) + "\n)"
+        yield f"COMMENT ON TABLE \"{schema}\".t{t} IS 'synthetic table {t}'"
+
+        if rows > 0:
+            names = ["id"] + (["parent_id"] if has_fk else [])
+            values = ["g"] + (["g"] if has_fk else [])
+            for c in range(max(0, columns - len(names))):
+                names.append(f"c{c}")
+                values.append(COLUMN_TYPES[(t + c) % len(COLUMN_TYPES)][1])
+            yield (
+                f'INSERT INTO "{schema}".t{t} ({", ".join(names)}) '
+                f"SELECT {', '.join(values)} FROM generate_series(1, {rows}) AS g"
+            )
+        for i in range(min(indexes, max(0, columns - 1))):
+            yield f'CREATE INDEX t{t}_c{i}_idx ON "{schema}".t{t} (c{i})'
+    for v in range(min(views, max(0, tables - 1))):
+        yield (
+            f'CREATE VIEW "{schema}".v{v} AS SELECT a.id, b.id AS next_id '
+            f'FROM "{schema}".t{v} a JOIN "{schema}".t{v + 1} b ON b.id = a.id'
+        )
+
+
+def generate(
+    conn,
+    prefix: str = "bench",
+    schemas: int = 10,
+    tables: int = 50,
+    columns: int = 20,
+    views: int = 5,
+    indexes: int = 2,
+    fk_ratio: float = 0.5,
+    rows: int = 100,
+) -> dict:
+    """Build the catalog and return its shape and how long it took."""
+    started = time.perf_counter()
+    dropped = drop_catalog(conn, prefix)
+    names = [f"{prefix}_s{s}" for s in range(schemas)]
+    for name in names:
+        with conn.transaction():
+            for statement in schema_ddl(name, tables, columns, views, indexes, fk_ratio, rows):
+                conn.execute(statement)
+        # After commit, so pg_stats covers the inserted rows
+        for t in range(tables):
+            conn.execute(f'ANALYZE "{name}".t{t}')
+
+    counts = conn.execute(
+        """
+        SELECT
+          (SELECT count(*) FROM information_schema.tables
+             WHERE table_schema = ANY(%(s)s) AND table_type = 'BASE TABLE'),
+          (SELECT count(*) FROM information_schema.views WHERE table_schema = ANY(%(s)s)),
+          (SELECT count(*) FROM information_schema.columns WHERE table_schema = ANY(%(s)s)),
+          (SELECT count(*) FROM pg_indexes WHERE schemaname = ANY(%(s)s)),
+          (SELECT count(*) FROM information_schema.table_constraints
+             WHERE table_schema = ANY(%(s)s) AND constraint_type = 'FOREIGN KEY')
+        """,
+        {"s": names},
+    ).fetchone()
+    return {
+        "prefix": prefix,
+        "schemas": schemas,
+        "tables_per_schema": tables,
+        "columns_per_table": columns,
+        "views_per_schema": views,
+        "indexes_per_table": indexes,
+        "fk_ratio": fk_ratio,
+        "rows_per_table": rows,
+        "dropped_schemas": dropped,
+        "created": {
+            "tables": counts[0],
+            "views": counts[1],
+            "columns": counts[2],
+            "indexes": counts[3],
+            "foreign_keys": counts[4],
+        },
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def add_connection_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--host", default=os.getenv("POSTGRES_HOST", "localhost"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("POSTGRES_PORT", "5432")))
+    parser.add_argument("--user", default=os.getenv("POSTGRES_USER", "postgres"))
+    parser.add_argument("--password", default=os.getenv("POSTGRES_PASSWORD", "password"))
+    parser.add_argument("--database", default=os.getenv("POSTGRES_DATABASE", "postgres"))
+    parser.add_argument("--sslmode", default=os.getenv("POSTGRES_SSLMODE", "prefer"))
+
+
+def add_catalog_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--prefix", default="bench", help="schema name prefix (default: bench)")
+    parser.add_argument("--schemas", type=int, default=10, help="N schemas")
+    parser.add_argument("--tables", type=int, default=50, help="M tables per schema")
+    parser.add_argument("--columns", type=int, default=20, help="K columns per table, including id")
+    parser.add_argument("--views", type=int, default=5, help="views per schema")
+    parser.add_argument("--indexes", type=int, default=2, help="secondary indexes per table")
+    parser.add_argument("--fk-ratio", type=float, default=0.5, help="share of tables with a foreign key")
+    parser.add_argument("--rows", type=int, default=100, help="rows inserted per table")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    add_connection_args(parser)
+    add_catalog_args(parser)
+    parser.add_argument("--drop", action="store_true", help="only drop the catalog")
+    args = parser.parse_args()
+
+    with connect(args) as conn:
+        if args.drop:
+            print(json.dumps({"prefix": args.prefix, "dropped_schemas": drop_catalog(conn, args.prefix)}))
+            return
+        shape = generate(
+            conn,
+            prefix=args.prefix,
+            schemas=args.schemas,
+            tables=args.tables,
+            columns=args.columns,
+            views=args.views,
+            indexes=args.indexes,
+            fk_ratio=args.fk_ratio,
+            rows=args.rows,
+        )
+    print(json.dumps(shape, indent=2))
+
+
+if __name__ == "__main__":
+    main()
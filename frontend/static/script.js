@@ -10,6 +10,7 @@ const metadataOptions = { include: new Map(), exclude: new Map() };
 let lastWorkflowId = sessionStorage.getItem('lastWorkflowId') || null;
 let resultsTimer = null;
 let resultsPoller = null;
+let progressStream = null;
 let resultsViewMode = (localStorage.getItem('resultsViewMode') || 'json');
 let lastMermaidSource = '';
 let lastERMermaidSource = '';
@@ -27,15 +28,20 @@ function parseEnvModels(){
   return list.length ? list : def;
 }
 
+// Pseudo-model: diagrams built server-side without the LLM
+const LOCAL_MODEL = 'local';
+// Text view shows this many leading lines; "Open Text" has the full file
+const RESULT_PREVIEW_LINES = 5000;
+
 function populateModelSelect(){
   modelCandidates = parseEnvModels();
   const sel = document.getElementById('llmModelSelect');
   if (!sel) return;
   sel.innerHTML = '';
-  const chosen = localStorage.getItem('diagramModel') || modelCandidates[0];
-  modelCandidates.forEach(m => {
+  const chosen = localStorage.getItem('diagramModel') || LOCAL_MODEL;
+  [LOCAL_MODEL, ...modelCandidates].forEach(m => {
     const opt = document.createElement('option');
-    opt.value = m; opt.textContent = m;
+    opt.value = m; opt.textContent = (m === LOCAL_MODEL) ? 'local (no LLM)' : m;
     if (m === chosen) opt.selected = true;
     sel.appendChild(opt);
   });
@@ -52,9 +58,13 @@ function getSelectedModel(){
 function getCandidateModels(){
   const selected = getSelectedModel();
   const list = [...(modelCandidates && modelCandidates.length ? modelCandidates : parseEnvModels())];
-  // Move selected to front.
+  // Move selected to front; the local pseudo-model is never sent to the LLM.
   const rest = list.filter(m => m !== selected);
-  return [selected, ...rest];
+  return selected === LOCAL_MODEL ? rest : [selected, ...rest];
+}
+
+function getDiagramEngine(){
+  return getSelectedModel() === LOCAL_MODEL ? 'local' : 'llm';
 }
 
 function goToPage(n){
@@ -420,11 +430,56 @@ async function startResultsFlow(){
   if(reload){ reload.onclick = ()=>{ loadResultsAfterDelay(0); }; }
   // reset state
   err.style.display='none'; actions.style.display='none'; pre.style.display='none'; loader.style.display='flex';
+  // Server pushes progress and tells us when outputs are ready; the countdown stays as a fallback
+  openProgressStream(lastWorkflowId);
   loadResultsAfterDelay(25);
   // Also schedule AI Insight generation ~20s after opening Results
   try { scheduleAISummary(25); } catch(_) {}
 }
 
+function describeProgress(ev){
+  if (ev.event === 'rows') return `${ev.typename}: ${ev.rows} rows`;
+  if (ev.event === 'stage_started') return `Running ${ev.stage}…`;
+  if (ev.event === 'stage_finished') return `Finished ${ev.stage} (${ev.seconds}s)`;
+  if (ev.event === 'stage_failed') return `${ev.stage} failed: ${ev.error}`;
+  if (ev.event === 'export_ready') return `Ready: ${ev.path}`;
+  return '';
+}
+
+function closeProgressStream(){
+  if (progressStream){ try{ progressStream.close(); }catch(_){ } progressStream = null; }
+}
+
+function openProgressStream(workflowId){
+  if (!workflowId || typeof EventSource === 'undefined') return false;
+  if (progressStream && progressStream.workflowId === workflowId) return true;
+  closeProgressStream();
+  const es = new EventSource(`/workflows/v1/events/${encodeURIComponent(workflowId)}`);
+  es.workflowId = workflowId;
+  const onProgress = (msg)=>{
+    let ev = {};
+    try { ev = JSON.parse(msg.data); } catch(_) { return; }
+    dlog('progress event', ev);
+    const text = describeProgress(ev);
+    const progress = document.getElementById('resultsProgress');
+    if (progress && text) progress.textContent = text;
+    const err = document.getElementById('resultsError');
+    if (err && text && err.style.display === 'block') err.textContent = `Results not ready yet — ${text}`;
+  };
+  ['stage_started','stage_finished','stage_failed','rows','export_ready'].forEach(name => es.addEventListener(name, onProgress));
+  es.addEventListener('run_finished', ()=>{
+    dlog('run finished event', workflowId);
+    closeProgressStream();
+    loadResultsAfterDelay(0);
+  });
+  es.onerror = ()=>{
+    // Closed for good (e.g. server gone): fall back to polling
+    if (es.readyState === 2 && progressStream === es){ progressStream = null; }
+  };
+  progressStream = es;
+  return true;
+}
+
 function loadResultsAfterDelay(seconds){
   const loader=document.getElementById('resultsLoader');
   const pre=document.getElementById('resultsContent');
@@ -464,12 +519,12 @@ function loadResultsAfterDelay(seconds){
       }
       if (!lastWorkflowId) throw new Error('Workflow id unavailable');
       const isJson = (resultsViewMode === 'json');
-      const path = isJson ? `/output/${lastWorkflowId}/output.json` : `/output/${lastWorkflowId}/output.txt`;
+      const path = isJson ? `/output/${lastWorkflowId}/output.json` : `/workflows/v1/result/${lastWorkflowId}?head=${RESULT_PREVIEW_LINES}`;
       let res = await fetch(path, { cache: 'no-store' });
       dlog('fetch results', { mode: resultsViewMode, path, status: res.status });
   if(!res.ok){
-        // Fallback to server endpoint if /output isn't mounted
-        const alt = isJson ? `/workflows/v1/result-json/${lastWorkflowId}` : `/workflows/v1/result/${lastWorkflowId}`;
+        // Fallback to the other source for the same file
+        const alt = isJson ? `/workflows/v1/result-json/${lastWorkflowId}` : `/output/${lastWorkflowId}/output.txt`;
         try {
           const altRes = await fetch(alt, { cache: 'no-store' });
           dlog('fetch alt results', { mode: resultsViewMode, alt, status: altRes.status });
@@ -497,6 +552,11 @@ function loadResultsAfterDelay(seconds){
         catch(_) { rendered = await res.text(); }
       } else {
         rendered = await res.text();
+        const totalLines = Number(res.headers.get('X-Total-Lines') || 0);
+        const shownLines = Number(res.headers.get('X-Line-End') || 0);
+        if (totalLines > shownLines && shownLines > 0){
+          rendered += `\n… showing first ${shownLines} of ${totalLines} lines (Open Text for the full file)`;
+        }
       }
       pre.textContent = rendered || '(empty file)'; pre.style.display='block'; loader.style.display='none'; actions.style.display='flex'; err.style.display='none';
       try{ const openRaw=document.getElementById('openRawFile'); if(openRaw){ openRaw.href = isJson ? `/workflows/v1/result-json/${lastWorkflowId}` : `/workflows/v1/result/${lastWorkflowId}`; openRaw.textContent = isJson ? 'Open JSON' : 'Open Text'; } }catch(_){ }
@@ -519,11 +579,12 @@ function loadResultsAfterDelay(seconds){
       } catch(_){ renderSummary({ types: {} }); }
       dlog('results loaded');
       if (resultsPoller){ clearInterval(resultsPoller); resultsPoller = null; }
+      closeProgressStream();
     } catch(e){
       loader.style.display='none'; pre.style.display='none'; actions.style.display='flex';
       err.textContent = 'Results not ready yet. You can try again in a few seconds.'; err.classList.add('visible'); err.style.display='block';
       dlog('results fetch error', e);
-      if (!resultsPoller){ resultsPoller = setInterval(()=>{ fetchResults(); }, 5000); }
+      if (!resultsPoller && !progressStream){ resultsPoller = setInterval(()=>{ fetchResults(); }, 5000); }
     }
   }
 }
@@ -652,7 +713,11 @@ function renderSummary(summary){
     ];
     order.forEach(k=>{
       const s = types[k];
-      if (s) lines.push(`${k}: ${s.total_record_count || 0} rows (${s.chunk_count || 0} chunks)`);
+      if (!s) return;
+      const parts = [`${s.chunk_count || 0} chunks`];
+      if (s.bytes != null) parts.push(`${(s.bytes / (1024 * 1024)).toFixed(1)} MB`);
+      if (s.seconds != null) parts.push(`${Number(s.seconds).toFixed(1)}s`);
+      lines.push(`${k}: ${s.total_record_count || 0} rows (${parts.join(', ')})`);
     });
     if (lines.length === 0){ body.textContent = 'No summary available.'; }
     else { body.innerHTML = `<pre class="results-pre" style="margin:0; max-height:240px;">${lines.join('\n')}</pre>`; }
@@ -718,7 +783,7 @@ async function generateLineageDiagram(){
   if (panel) panel.style.display = 'block';
   if (err) { err.style.display = 'none'; err.textContent=''; }
   if (container) container.innerHTML = '';
-  if (status) status.textContent = 'Generating diagram via Groq…';
+  if (status) status.textContent = getDiagramEngine() === 'local' ? 'Generating diagram…' : 'Generating diagram via Groq…';
 
   const wf = await ensureWorkflowId();
   if (!wf){ if (status) status.textContent = 'No workflow id available yet.'; return; }
@@ -727,7 +792,7 @@ async function generateLineageDiagram(){
     const res = await fetch(`/workflows/v1/lineage-mermaid/${wf}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ model: getSelectedModel(), candidates: getCandidateModels() }),
+      body: JSON.stringify({ model: getSelectedModel(), candidates: getCandidateModels(), engine: getDiagramEngine() }),
     });
     if (!res.ok){
       const txt = await res.text();
@@ -777,7 +842,7 @@ async function generateERDiagram(){
   if (panel) panel.style.display = 'block';
   if (err) { err.style.display = 'none'; err.textContent=''; }
   if (container) container.innerHTML = '';
-  if (status) status.textContent = 'Generating ER diagram via Groq…';
+  if (status) status.textContent = getDiagramEngine() === 'local' ? 'Generating ER diagram…' : 'Generating ER diagram via Groq…';
 
   const wf = await ensureWorkflowId();
   if (!wf){ if (status) status.textContent = 'No workflow id available yet.'; return; }
@@ -786,7 +851,7 @@ async function generateERDiagram(){
     const res = await fetch(`/workflows/v1/er-mermaid/${wf}`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ model: getSelectedModel(), candidates: getCandidateModels() }),
+      body: JSON.stringify({ model: getSelectedModel(), candidates: getCandidateModels(), engine: getDiagramEngine() }),
     });
     if (!res.ok){
       const txt = await res.text();
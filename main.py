@@ -47,6 +47,15 @@ async def main():
             f"UI static index exists: {os.path.exists(ui_index_path)} at {ui_index_path}"
         )
 
+        # Optional content-addressed storage for extraction chunks (CHUNK_DEDUP)
+        from app.chunkstore import install as install_chunk_store
+
+        install_chunk_store()
+        # Count object store traffic per activity (after the chunk store, which it wraps)
+        from app.instrumentation import install as install_instrumentation
+
+        install_instrumentation()
+
         # Register our workflow and activities with the worker
         await application.setup_workflow(
             workflow_and_activities_classes=[
@@ -66,9 +75,16 @@ async def main():
         try:
             fastapi_app: Optional[object] = getattr(getattr(application, "server", None), "app", None)
             if fastapi_app:
-                from fastapi.staticfiles import StaticFiles  # type: ignore
                 from fastapi.responses import PlainTextResponse, JSONResponse, Response  # type: ignore
-                from fastapi import APIRouter, Body  # type: ignore
+                from fastapi import APIRouter, Body, Request  # type: ignore
+                from app.blocking import run_blocking, shutdown as shutdown_file_io
+                from app.serving import (
+                    PrecompressedStaticFiles,
+                    file_validators,
+                    is_not_modified,
+                    not_modified_response,
+                    precompressed_response,
+                )
 
                 # Resolve absolute path regardless of current working directory
                 repo_root = os.path.dirname(os.path.abspath(__file__))
@@ -78,98 +94,396 @@ async def main():
                 # Mount even if the folder doesn't exist yet (created later by workflow)
                 fastapi_app.mount(
                     "/output",
-                    StaticFiles(directory=outputs_dir, check_dir=False),
+                    PrecompressedStaticFiles(directory=outputs_dir, check_dir=False),
                     name="output",
                 )
 
                 # Lightweight results endpoint: /workflows/v1/result/{workflow_id}
                 router = APIRouter()
 
+                from app.llm import LLMClient
+                from app.llm_cache import ResponseCache, cache_key
+                from app.prompts import (
+                    CHARS_PER_TOKEN,
+                    PROMPT_TOKEN_BUDGET,
+                    er_context,
+                    lineage_context,
+                    summary_context,
+                    text_fallback,
+                )
+
+                llm_cache = ResponseCache()
+                # One pooled client for all Groq calls, opened/closed with the app
+                llm_client = LLMClient()
+                fastapi_app.add_event_handler("startup", llm_client.start)
+                fastapi_app.add_event_handler("shutdown", llm_client.aclose)
+                # Blocking reads/parses run on a bounded pool, never on the event loop
+                fastapi_app.add_event_handler("shutdown", shutdown_file_io)
+
+                # Background retention for output/ and downloaded chunks
+                from application_sdk.constants import TEMPORARY_PATH
+                from app.retention import Janitor, touch as touch_run
+
+                janitor = Janitor(outputs_dir, TEMPORARY_PATH)
+                fastapi_app.add_event_handler("startup", janitor.start)
+                fastapi_app.add_event_handler("shutdown", janitor.stop)
+
+                @fastapi_app.middleware("http")  # type: ignore
+                async def _track_run_access(request: Request, call_next):
+                    # /output/<id>/... and /workflows/v1/<endpoint>/<id>[/...] keep a run "recently used"
+                    parts = request.url.path.split("/")
+                    candidate = None
+                    if len(parts) > 2 and parts[1] == "output":
+                        candidate = parts[2]
+                    elif len(parts) > 4 and parts[1:3] == ["workflows", "v1"]:
+                        candidate = parts[4]
+                    if candidate and not candidate.startswith(".") and os.path.isdir(os.path.join(outputs_dir, candidate)):
+                        touch_run(candidate)
+                    return await call_next(request)
+
+                async def _groq_chat(messages: list[dict], model_list: list[str], max_tokens: int) -> tuple[int, dict]:
+                    """Hedged call across candidate models on the shared pooled client."""
+                    return await llm_client.chat(messages, model_list, max_tokens=max_tokens)
+
+                def _prompt_budget(token_budget: int, max_chars: int) -> int:
+                    # max_chars predates token budgets; honour whichever is tighter
+                    budget = max(int(token_budget or PROMPT_TOKEN_BUDGET), 1)
+                    if max_chars:
+                        budget = min(budget, max(max_chars // CHARS_PER_TOKEN, 1))
+                    return budget
+
+                @router.get("/workflows/v1/retention/stats")  # type: ignore
+                async def retention_stats():
+                    return JSONResponse(janitor.snapshot())
+
+                @router.get("/workflows/v1/llm-cache/stats")  # type: ignore
+                async def llm_cache_stats():
+                    return JSONResponse({**llm_cache.snapshot(), "client": llm_client.snapshot()})
+
+                def _result_file_response(
+                    path: str,
+                    request: Request,
+                    media_type: str,
+                    head: Optional[int],
+                    tail: Optional[int],
+                    start: Optional[int],
+                ):
+                    """Stream a result file: line window, stored variant, or Range-capable file."""
+                    from fastapi.responses import FileResponse, StreamingResponse  # type: ignore
+                    from app.lines import iter_bytes, line_window
+
+                    if head is not None or tail is not None or start is not None:
+                        window = line_window(path, head=head, tail=tail, start=start or 0)
+                        if window is None:
+                            return None
+                        first, last, total, byte_start, byte_end = window
+                        return StreamingResponse(
+                            iter_bytes(path, byte_start, byte_end),
+                            media_type=media_type,
+                            headers={
+                                "X-Line-Start": str(first),
+                                "X-Line-End": str(last),
+                                "X-Total-Lines": str(total),
+                            },
+                        )
+                    validators = file_validators(path)
+                    if validators and is_not_modified(request.headers, validators):
+                        return not_modified_response(validators)
+                    # Byte ranges refer to the identity encoding; only use stored variants without one
+                    if "range" not in request.headers:
+                        precompressed = precompressed_response(
+                            path, request.headers.get("accept-encoding"), media_type, validators
+                        )
+                        if precompressed is not None:
+                            return precompressed
+                    if os.path.exists(path):
+                        # Streams in fixed-size chunks and answers Range / If-Range itself
+                        return FileResponse(path, media_type=media_type, headers=validators)
+                    return None
+
                 @router.get("/workflows/v1/result/{workflow_id}")  # type: ignore
-                async def get_result(workflow_id: str):
+                async def get_result(
+                    workflow_id: str,
+                    request: Request,
+                    head: Optional[int] = None,
+                    tail: Optional[int] = None,
+                    start: Optional[int] = None,
+                ):
                     path = os.path.join(outputs_dir, workflow_id, "output.txt")
-                    if os.path.exists(path):
-                        try:
-                            with open(path, "r", encoding="utf-8") as f:
-                                return PlainTextResponse(f.read())
-                        except Exception:
-                            return PlainTextResponse("Failed to read results.", status_code=500)
+                    try:
+                        resp = await run_blocking(
+                            _result_file_response, path, request, "text/plain; charset=utf-8", head, tail, start
+                        )
+                    except Exception:
+                        return PlainTextResponse("Failed to read results.", status_code=500)
+                    if resp is not None:
+                        return resp
                     return PlainTextResponse("Results not ready.", status_code=404)
 
                 @router.get("/workflows/v1/latest-output")  # type: ignore
                 async def latest_output():
-                    base = outputs_dir
-                    if not os.path.exists(base):
+                    from app.runs import registry
+
+                    try:
+                        await run_blocking(registry.sync, outputs_dir)
+                        latest = registry.latest()
+                    except Exception:
+                        return JSONResponse({}, status_code=500)
+                    if latest is None:
                         return JSONResponse({}, status_code=404)
+                    return JSONResponse({"workflow_id": latest["workflow_id"]})
+
+                @router.get("/workflows/v1/events/{workflow_id}")  # type: ignore
+                async def workflow_events(workflow_id: str, request: Request):
+                    from fastapi.responses import StreamingResponse  # type: ignore
+                    from app.events import RUN_FINISHED, bus, format_sse
+
                     try:
-                        candidates = []
-                        for name in os.listdir(base):
-                            p = os.path.join(base, name)
-                            if os.path.isdir(p):
-                                txt = os.path.join(p, "output.txt")
-                                jsn = os.path.join(p, "output.json")
-                                latest_mtime = None
-                                if os.path.exists(txt):
-                                    latest_mtime = os.path.getmtime(txt)
-                                if os.path.exists(jsn):
-                                    m = os.path.getmtime(jsn)
-                                    latest_mtime = max(latest_mtime, m) if latest_mtime else m
-                                if latest_mtime is not None:
-                                    candidates.append((name, latest_mtime))
-                        if not candidates:
-                            return JSONResponse({}, status_code=404)
-                        candidates.sort(key=lambda x: x[1], reverse=True)
-                        return JSONResponse({"workflow_id": candidates[0][0]})
+                        after = int(request.headers.get("last-event-id") or 0)
+                    except ValueError:
+                        after = 0
+
+                    async def _stream():
+                        yield b"retry: 3000\n\n"
+                        async for message in bus.subscribe(workflow_id, after):
+                            if await request.is_disconnected():
+                                break
+                            yield format_sse(message)
+                            if message and message["event"] == RUN_FINISHED:
+                                break
+
+                    return StreamingResponse(
+                        _stream(),
+                        media_type="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                    )
+
+                @router.get("/workflows/v1/runs")  # type: ignore
+                async def list_runs(offset: int = 0, limit: int = 50):
+                    from app.runs import registry
+
+                    offset = max(offset, 0)
+                    limit = max(1, min(limit, 500))
+                    try:
+                        await run_blocking(registry.sync, outputs_dir)
+                        total, runs = registry.list(offset, limit)
                     except Exception:
                         return JSONResponse({}, status_code=500)
+                    return JSONResponse({
+                        "total": total,
+                        "offset": offset,
+                        "limit": limit,
+                        "next_offset": offset + len(runs) if offset + len(runs) < total else None,
+                        "runs": runs,
+                    })
 
                 @router.get("/workflows/v1/summary/{workflow_id}")  # type: ignore
-                async def get_summary(workflow_id: str):
+                async def get_summary(workflow_id: str, request: Request):
+                    from fastapi.responses import FileResponse  # type: ignore
+
                     path = os.path.join(outputs_dir, workflow_id, "summary.json")
                     if os.path.exists(path):
                         try:
-                            with open(path, "r", encoding="utf-8") as f:
-                                import json
-                                return JSONResponse(json.load(f))
+                            validators = await run_blocking(file_validators, path)
+                            if validators and is_not_modified(request.headers, validators):
+                                return not_modified_response(validators)
+                            return FileResponse(path, media_type="application/json", headers=validators)
                         except Exception:
                             return JSONResponse({}, status_code=500)
                     return JSONResponse({}, status_code=404)
 
                 @router.get("/workflows/v1/result-json/{workflow_id}")  # type: ignore
-                async def get_result_json(workflow_id: str):
+                async def get_result_json(
+                    workflow_id: str,
+                    request: Request,
+                    head: Optional[int] = None,
+                    tail: Optional[int] = None,
+                    start: Optional[int] = None,
+                ):
                     path = os.path.join(outputs_dir, workflow_id, "output.json")
-                    if os.path.exists(path):
+                    if os.path.exists(path) and head is None and tail is None and start is None:
+                        def _is_closed() -> bool:
+                            with open(path, "rb") as f:
+                                f.seek(max(os.path.getsize(path) - 256, 0))
+                                return f.read().rstrip().endswith(b"}")
+
                         try:
-                            with open(path, "r", encoding="utf-8") as f:
-                                text = f.read()
-                                import json
-                                try:
-                                    return JSONResponse(json.loads(text))
-                                except Exception:
-                                    # Attempt simple repair by appending a closing brace
-                                    try:
-                                        repaired = text.rstrip() + "\n}\n"
-                                        return JSONResponse(json.loads(repaired))
-                                    except Exception:
-                                        # Return raw content so frontend can at least render text
-                                        return Response(content=text, media_type="application/json")
+                            closed = await run_blocking(_is_closed)
                         except Exception:
                             return JSONResponse({}, status_code=500)
+                        if not closed:
+                            # Interrupted export: stream it with the missing closing brace
+                            from fastapi.responses import StreamingResponse  # type: ignore
+                            from app.lines import iter_bytes
+
+                            def _repaired():
+                                yield from iter_bytes(path, 0, os.path.getsize(path))
+                                yield b"\n}\n"
+
+                            return StreamingResponse(_repaired(), media_type="application/json")
+                    try:
+                        resp = await run_blocking(
+                            _result_file_response, path, request, "application/json", head, tail, start
+                        )
+                    except Exception:
+                        return JSONResponse({}, status_code=500)
+                    if resp is not None:
+                        return resp
                     return JSONResponse({}, status_code=404)
 
                 # Excel download endpoint removed for now
 
+                # --- Lineage graph queries over the precomputed CSR index ---
+                @router.get("/workflows/v1/lineage/{workflow_id}/{direction}")  # type: ignore
+                async def lineage_query(
+                    workflow_id: str,
+                    direction: str,
+                    node: str,
+                    depth: int = 1,
+                    limit: int = 1000,
+                ):
+                    from app.lineage import lineage_index_path, open_lineage_index
+
+                    if direction not in ("upstream", "downstream"):
+                        return JSONResponse({"error": "direction must be upstream or downstream"}, status_code=400)
+                    index = await run_blocking(
+                        open_lineage_index, lineage_index_path(os.path.join(outputs_dir, workflow_id))
+                    )
+                    if index is None:
+                        return JSONResponse({"error": "lineage index not found"}, status_code=404)
+                    try:
+                        result = await run_blocking(
+                            index.traverse,
+                            node,
+                            direction=direction,
+                            depth=max(0, min(depth, 50)),
+                            limit=max(1, min(limit, 100000)),
+                        )
+                    except Exception:
+                        return JSONResponse({"error": "failed to read lineage index"}, status_code=500)
+                    if result is None:
+                        return JSONResponse({"error": "node not found"}, status_code=404)
+                    return JSONResponse({"workflow_id": workflow_id, **result})
+
+                @router.get("/workflows/v1/search/{workflow_id}")  # type: ignore
+                async def search_assets(
+                    workflow_id: str,
+                    q: str,
+                    mode: str = "prefix",
+                    type: Optional[str] = None,
+                    schema: Optional[str] = None,
+                    limit: int = 50,
+                ):
+                    from app.search import SEARCH_MODES, SEARCH_TYPES, search, search_index_path
+
+                    if mode not in SEARCH_MODES:
+                        return JSONResponse({"error": f"mode must be one of {', '.join(SEARCH_MODES)}"}, status_code=400)
+                    types = [t for t in (type or "").split(",") if t]
+                    unknown = [t for t in types if t not in SEARCH_TYPES]
+                    if unknown:
+                        return JSONResponse({"error": f"unknown type: {', '.join(unknown)}"}, status_code=400)
+                    try:
+                        results = await run_blocking(
+                            search,
+                            search_index_path(os.path.join(outputs_dir, workflow_id)),
+                            q,
+                            mode=mode,
+                            types=types or None,
+                            schema=schema,
+                            limit=limit,
+                        )
+                    except Exception:
+                        return JSONResponse({"error": "failed to read search index"}, status_code=500)
+                    if results is None:
+                        return JSONResponse({"error": "search index not found"}, status_code=404)
+                    return JSONResponse({"workflow_id": workflow_id, "q": q, "mode": mode, "results": results})
+
+                @router.get("/workflows/v1/diff/{base_id}/{target_id}")  # type: ignore
+                async def diff_runs(
+                    base_id: str,
+                    target_id: str,
+                    type: Optional[str] = None,
+                    limit: int = 1000,
+                ):
+                    from app.fingerprints import FINGERPRINT_TYPES, diff_fingerprints, fingerprints_path
+
+                    if type and type not in FINGERPRINT_TYPES:
+                        return JSONResponse({"error": f"unknown type: {type}"}, status_code=400)
+                    paths = [fingerprints_path(os.path.join(outputs_dir, wid)) for wid in (base_id, target_id)]
+                    missing = [wid for wid, path in zip((base_id, target_id), paths) if not os.path.exists(path)]
+                    if missing:
+                        return JSONResponse({"error": f"fingerprints not found: {', '.join(missing)}"}, status_code=404)
+                    try:
+                        diff = await run_blocking(diff_fingerprints, paths[0], paths[1], typename=type, limit=limit)
+                    except Exception:
+                        return JSONResponse({"error": "failed to read fingerprints"}, status_code=500)
+                    return JSONResponse({"base": base_id, "target": target_id, **diff})
+
+                @router.get("/workflows/v1/assets/{workflow_id}/{typename}")  # type: ignore
+                async def list_assets(
+                    workflow_id: str,
+                    typename: str,
+                    offset: int = 0,
+                    limit: int = 100,
+                    schema: Optional[str] = None,
+                    table: Optional[str] = None,
+                ):
+                    import json
+
+                    from app.assets import ASSET_TYPES
+                    from app.pages import MAX_PAGE_SIZE, open_asset_pages
+
+                    if typename not in ASSET_TYPES:
+                        return JSONResponse({"error": f"unknown asset type: {typename}"}, status_code=400)
+                    offset = max(offset, 0)
+                    limit = max(1, min(limit, MAX_PAGE_SIZE))
+                    try:
+                        pages = await run_blocking(open_asset_pages, os.path.join(outputs_dir, workflow_id), typename)
+                        if pages is None:
+                            return JSONResponse({"error": "asset index not found"}, status_code=404)
+                        total, rows = await run_blocking(pages.page, offset, limit, schema=schema, table=table)
+                    except Exception:
+                        return JSONResponse({"error": "failed to read asset index"}, status_code=500)
+                    next_offset = offset + len(rows) if offset + len(rows) < total else None
+                    head = json.dumps({
+                        "workflow_id": workflow_id,
+                        "type": typename,
+                        "total": total,
+                        "offset": offset,
+                        "limit": limit,
+                        "next_offset": next_offset,
+                    })
+                    # Rows are already serialized JSON; splice them in without re-parsing
+                    body = head[:-1].encode("utf-8") + b', "items": [' + b",".join(rows) + b"]}"
+                    return Response(content=body, media_type="application/json")
+
                 # --- Lineage diagram generation via Groq (Mermaid) ---
                 @router.post("/workflows/v1/lineage-mermaid/{workflow_id}")  # type: ignore
                 async def lineage_mermaid(
                     workflow_id: str,
                     model: str = Body(default="llama-3.1-8b-instant"),
                     max_chars: int = Body(default=120000),
+                    token_budget: int = Body(default=PROMPT_TOKEN_BUDGET),
                     candidates: list[str] | None = Body(default=None),
+                    engine: str = Body(default="local"),
                 ):
                     import json
                     import re
-                    import httpx
+
+                    # Deterministic local generator unless the LLM is explicitly requested
+                    if engine != "llm":
+                        from app.diagrams import local_lineage_mermaid
+
+                        try:
+                            mermaid_code = await run_blocking(local_lineage_mermaid, os.path.join(outputs_dir, workflow_id))
+                        except Exception as e:
+                            return JSONResponse({"error": "local diagram failed", "details": str(e)}, status_code=500)
+                        return JSONResponse({
+                            "workflow_id": workflow_id,
+                            "model": "local",
+                            "engine": "local",
+                            "mermaid": mermaid_code,
+                        })
 
                     groq_api_key = os.getenv("GROQ_API_KEY", "").strip()
                     if not groq_api_key:
@@ -178,19 +492,18 @@ async def main():
                             status_code=400,
                         )
 
-                    # Read the human-readable output text
-                    path = os.path.join(outputs_dir, workflow_id, "output.txt")
-                    if not os.path.exists(path):
-                        return JSONResponse({"error": "output.txt not found"}, status_code=404)
+                    # Ranked FK/view context from the structured exports, within the token budget
+                    out_dir = os.path.join(outputs_dir, workflow_id)
+                    budget = _prompt_budget(token_budget, max_chars)
                     try:
-                        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                            output_text = f.read()
+                        output_text = await run_blocking(lineage_context, out_dir, budget)
                     except Exception:
-                        return JSONResponse({"error": "failed to read output.txt"}, status_code=500)
-
-                    # Truncate to keep request size reasonable
-                    if max_chars and len(output_text) > max_chars:
-                        output_text = output_text[:max_chars]
+                        output_text = ""
+                    if not output_text:
+                        # Runs without structured exports: head of output.txt
+                        output_text = await run_blocking(text_fallback, out_dir, budget)
+                        if output_text is None:
+                            return JSONResponse({"error": "output.txt not found"}, status_code=404)
 
                     system_prompt = (
                         "You are an expert data lineage summarizer. Given a human-readable export "
@@ -221,35 +534,16 @@ async def main():
                         {"role": "user", "content": user_prompt},
                     ]
                     model_list = candidates or [model]
-                    content = ""
-                    used_model = None
-                    try:
-                        async with httpx.AsyncClient(timeout=60) as client:
-                            last_err_text = None
-                            last_status = None
-                            for m in model_list:
-                                resp = await client.post(
-                                    "https://api.groq.com/openai/v1/chat/completions",
-                                    headers={
-                                        "Authorization": f"Bearer {groq_api_key}",
-                                        "Content-Type": "application/json",
-                                    },
-                                    json={"model": m, "temperature": 0.2, "max_tokens": 800, "messages": messages},
-                                )
-                                if resp.status_code == 200:
-                                    data = resp.json()
-                                    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                                    used_model = m
-                                    break
-                                # Retry on rate limit or server error
-                                last_err_text = resp.text
-                                last_status = resp.status_code
-                                if resp.status_code not in (429, 500, 502, 503):
-                                    break
-                            else:
-                                return JSONResponse({"error": f"groq error {last_status}", "details": last_err_text}, status_code=502)
-                    except Exception as e:
-                        return JSONResponse({"error": "request failed", "details": str(e)}, status_code=502)
+                    (status, payload), source = await llm_cache.get_or_compute(
+                        cache_key("lineage-mermaid", messages, model_list, temperature=0.2, max_tokens=800),
+                        os.path.join(outputs_dir, workflow_id),
+                        lambda: _groq_chat(messages, model_list, max_tokens=800),
+                        cacheable=lambda r: r[0] == 200 and bool(r[1].get("content")),
+                    )
+                    if status != 200:
+                        return JSONResponse(payload, status_code=status)
+                    content = payload.get("content") or ""
+                    used_model = payload.get("model")
 
                     # Extract and sanitize Mermaid code (flowchart)
                     def _sanitize_lineage(text: str) -> str:
@@ -294,6 +588,7 @@ async def main():
                     return JSONResponse({
                         "workflow_id": workflow_id,
                         "model": used_model or model,
+                        "cached": source != "upstream",
                         "mermaid": mermaid_code,
                     })
 
@@ -303,126 +598,30 @@ async def main():
                     workflow_id: str,
                     model: str = Body(default="gemma2-9b-it"),
                     max_chars: int = Body(default=160000),
+                    token_budget: int = Body(default=PROMPT_TOKEN_BUDGET),
                     candidates: list[str] | None = Body(default=None),
                 ):
-                    import httpx
-                    import json
                     import re
 
                     groq_api_key = os.getenv("GROQ_API_KEY", "").strip()
                     if not groq_api_key:
                         return JSONResponse({"error": "GROQ_API_KEY not configured on server"}, status_code=400)
 
-                    # Prefer structured JSON if available
-                    json_path = os.path.join(outputs_dir, workflow_id, "output.json")
-                    txt_path = os.path.join(outputs_dir, workflow_id, "output.txt")
-
-                    output_json = None
-                    if os.path.exists(json_path):
-                        try:
-                            with open(json_path, "r", encoding="utf-8") as f:
-                                output_json = json.load(f)
-                        except Exception:
-                            output_json = None
-
+                    # Ranked assets from the structured exports, within the token budget
+                    out_dir = os.path.join(outputs_dir, workflow_id)
+                    budget = _prompt_budget(token_budget, max_chars)
+                    try:
+                        ASSETS = await run_blocking(summary_context, out_dir, budget)
+                    except Exception:
+                        ASSETS = ""
                     output_text = ""
-                    if os.path.exists(txt_path):
-                        try:
-                            with open(txt_path, "r", encoding="utf-8", errors="ignore") as f:
-                                output_text = f.read()
-                        except Exception:
-                            output_text = ""
-                    if not output_json and not output_text:
-                        return JSONResponse({"error": "no outputs found"}, status_code=404)
-
-                    # Build a compact ASSETS context from structured JSON (preferred)
-                    def safe_list(key: str) -> list:
-                        v = []
-                        if isinstance(output_json, dict) and key in output_json and isinstance(output_json[key], list):
-                            v = output_json[key]
-                        return v
-
-                    assets_lines: list[str] = []
-                    if output_json:
-                        # Collect top tables
-                        tables = []
-                        for it in safe_list("table")[:30]:
-                            sch = it.get("table_schema") or it.get("schema_name")
-                            tbl = it.get("table_name")
-                            if sch and tbl:
-                                tables.append(f"{sch}.{tbl}")
-                        if tables:
-                            assets_lines.append("Tables: " + ", ".join(sorted(set(tables))[:20]))
-
-                        # Relationships (edges)
-                        rels = []
-                        for it in safe_list("relationship")[:60]:
-                            sc = it.get("src_schema_name") or it.get("table_schema")
-                            st = it.get("src_table_name") or it.get("table_name")
-                            scc = it.get("src_column_name")
-                            dc = it.get("dst_schema_name")
-                            dt = it.get("dst_table_name")
-                            dcc = it.get("dst_column_name")
-                            if sc and st and scc and dc and dt and dcc:
-                                rels.append(f"{sc}.{st}.{scc} -> {dc}.{dt}.{dcc}")
-                        if rels:
-                            assets_lines.append("FKs: " + ", ".join(rels[:20]))
-
-                        # View deps (table -> view)
-                        vdeps = []
-                        for it in safe_list("view_dependency")[:40]:
-                            sc = it.get("src_schema_name")
-                            st = it.get("src_table_name")
-                            dc = it.get("dst_schema_name")
-                            dt = it.get("dst_table_name")
-                            if sc and st and dc and dt:
-                                vdeps.append(f"{sc}.{st} -> {dc}.{dt}")
-                        if vdeps:
-                            assets_lines.append("Views: " + ", ".join(vdeps[:15]))
-
-                        # Quality metrics
-                        qms = []
-                        for it in safe_list("quality_metric")[:40]:
-                            sc = it.get("schema_name")
-                            st = it.get("table_name")
-                            col = it.get("column_name")
-                            nf = it.get("null_frac")
-                            nd = it.get("distinct_count_estimated") or it.get("n_distinct_raw")
-                            if sc and st and col:
-                                metric = f"{sc}.{st}.{col}"
-                                extras = []
-                                if nf is not None:
-                                    try:
-                                        extras.append(f"null%~{round(float(nf)*100,1)}")
-                                    except Exception:
-                                        pass
-                                if nd is not None:
-                                    extras.append(f"distinct~{nd}")
-                                if extras:
-                                    metric += " (" + ", ".join(map(str, extras[:2])) + ")"
-                                qms.append(metric)
-                        if qms:
-                            assets_lines.append("Quality: " + ", ".join(qms[:15]))
-
-                        # Indexes
-                        idxs = []
-                        for it in safe_list("index")[:40]:
-                            sc = it.get("schema_name")
-                            st = it.get("table_name")
-                            ix = it.get("index_name")
-                            if sc and st and ix:
-                                idxs.append(f"{sc}.{st}:{ix}")
-                        if idxs:
-                            assets_lines.append("Indexes: " + ", ".join(idxs[:15]))
-
-                    if not assets_lines and output_text:
-                        # Fallback: heuristics over text sections
-                        tbls = re.findall(r"^\s*(?:===\s*TABLES?\s*===|TABLE)\s*|^(?!===).*?\b([a-zA-Z0-9_]+)\s*$", output_text, re.MULTILINE)
-                        if tbls:
-                            assets_lines.append("Tables: " + ", ".join(list(dict.fromkeys(tbls))[:20]))
+                    if not ASSETS:
+                        # Runs without structured exports: ground on the head of output.txt
+                        output_text = await run_blocking(text_fallback, out_dir, budget)
+                        if output_text is None:
+                            return JSONResponse({"error": "no outputs found"}, status_code=404)
 
                     # Build a dataset-specific prompt
-                    ASSETS = "\n".join(assets_lines[:6])
                     system_prompt = (
                         "You are a senior data engineer and AI practitioner. "
                         "Write a dataset-specific, practical summary of how THIS metadata can be used. "
@@ -441,45 +640,28 @@ async def main():
                         "- Keep under ~1200 characters."
                     )
 
-                    user_prompt = (
-                        "ASSETS:\n" + (ASSETS or "(no structured list)") + "\n\n"
-                        "If needed, you may also use the raw export below to ground references.\n\n"
-                        + ("EXPORT_TEXT_BEGIN\n" + (output_text[:max_chars] if output_text else "") + "\nEXPORT_TEXT_END\n")
-                    )
+                    user_prompt = "ASSETS:\n" + (ASSETS or "(no structured list)") + "\n"
+                    if output_text:
+                        user_prompt += (
+                            "\nUse the raw export below to ground references.\n\n"
+                            "EXPORT_TEXT_BEGIN\n" + output_text + "\nEXPORT_TEXT_END\n"
+                        )
 
                     messages = [
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_prompt},
                     ]
                     model_list = candidates or [model]
-                    used_model = None
-                    content = ""
-                    try:
-                        async with httpx.AsyncClient(timeout=60) as client:
-                            last_err_text = None
-                            last_status = None
-                            for m in model_list:
-                                resp = await client.post(
-                                    "https://api.groq.com/openai/v1/chat/completions",
-                                    headers={
-                                        "Authorization": f"Bearer {groq_api_key}",
-                                        "Content-Type": "application/json",
-                                    },
-                                    json={"model": m, "temperature": 0.2, "max_tokens": 700, "messages": messages},
-                                )
-                                if resp.status_code == 200:
-                                    data = resp.json()
-                                    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                                    used_model = m
-                                    break
-                                last_err_text = resp.text
-                                last_status = resp.status_code
-                                if resp.status_code not in (429, 500, 502, 503):
-                                    break
-                            else:
-                                return JSONResponse({"error": f"groq error {last_status}", "details": last_err_text}, status_code=502)
-                    except Exception as e:
-                        return JSONResponse({"error": "request failed", "details": str(e)}, status_code=502)
+                    (status, payload), source = await llm_cache.get_or_compute(
+                        cache_key("ai-summary", messages, model_list, temperature=0.2, max_tokens=700),
+                        os.path.join(outputs_dir, workflow_id),
+                        lambda: _groq_chat(messages, model_list, max_tokens=700),
+                        cacheable=lambda r: r[0] == 200 and bool(r[1].get("content")),
+                    )
+                    if status != 200:
+                        return JSONResponse(payload, status_code=status)
+                    content = payload.get("content") or ""
+                    used_model = payload.get("model")
 
                     # Extract between <INSIGHT> markers; sanitize to bullets only
                     summary = content or ""
@@ -507,6 +689,7 @@ async def main():
                     return JSONResponse({
                         "workflow_id": workflow_id,
                         "model": used_model or model,
+                        "cached": source != "upstream",
                         "summary": summary_out,
                     })
 
@@ -516,12 +699,30 @@ async def main():
                     workflow_id: str,
                     model: str = Body(default="llama-3.1-8b-instant"),
                     max_chars: int = Body(default=120000),
+                    token_budget: int = Body(default=PROMPT_TOKEN_BUDGET),
                     candidates: list[str] | None = Body(default=None),
                     detail: str = Body(default="rich"),
+                    engine: str = Body(default="local"),
                 ):
                     import json
                     import re
-                    import httpx
+
+                    # Deterministic local generator unless the LLM is explicitly requested
+                    if engine != "llm":
+                        from app.diagrams import local_er_mermaid
+
+                        try:
+                            mermaid_code = await run_blocking(
+                                local_er_mermaid, os.path.join(outputs_dir, workflow_id), detail=detail
+                            )
+                        except Exception as e:
+                            return JSONResponse({"error": "local diagram failed", "details": str(e)}, status_code=500)
+                        return JSONResponse({
+                            "workflow_id": workflow_id,
+                            "model": "local",
+                            "engine": "local",
+                            "mermaid": mermaid_code,
+                        })
 
                     groq_api_key = os.getenv("GROQ_API_KEY", "").strip()
                     if not groq_api_key:
@@ -530,19 +731,18 @@ async def main():
                             status_code=400,
                         )
 
-                    # Read the human-readable output text
-                    path = os.path.join(outputs_dir, workflow_id, "output.txt")
-                    if not os.path.exists(path):
-                        return JSONResponse({"error": "output.txt not found"}, status_code=404)
+                    # Ranked FK/view context from the structured exports, within the token budget
+                    out_dir = os.path.join(outputs_dir, workflow_id)
+                    budget = _prompt_budget(token_budget, max_chars)
                     try:
-                        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                            output_text = f.read()
+                        output_text = await run_blocking(er_context, out_dir, budget)
                     except Exception:
-                        return JSONResponse({"error": "failed to read output.txt"}, status_code=500)
-
-                    # Truncate to keep request size reasonable
-                    if max_chars and len(output_text) > max_chars:
-                        output_text = output_text[:max_chars]
+                        output_text = ""
+                    if not output_text:
+                        # Runs without structured exports: head of output.txt
+                        output_text = await run_blocking(text_fallback, out_dir, budget)
+                        if output_text is None:
+                            return JSONResponse({"error": "output.txt not found"}, status_code=404)
 
                     system_prompt = (
                         "You are an expert data modeler. Given a human-readable export of database metadata "
@@ -573,34 +773,16 @@ async def main():
                         {"role": "user", "content": user_prompt},
                     ]
                     model_list = candidates or [model]
-                    content = ""
-                    used_model = None
-                    try:
-                        async with httpx.AsyncClient(timeout=60) as client:
-                            last_err_text = None
-                            last_status = None
-                            for m in model_list:
-                                resp = await client.post(
-                                    "https://api.groq.com/openai/v1/chat/completions",
-                                    headers={
-                                        "Authorization": f"Bearer {groq_api_key}",
-                                        "Content-Type": "application/json",
-                                    },
-                                    json={"model": m, "temperature": 0.2, "max_tokens": 800, "messages": messages},
-                                )
-                                if resp.status_code == 200:
-                                    data = resp.json()
-                                    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                                    used_model = m
-                                    break
-                                last_err_text = resp.text
-                                last_status = resp.status_code
-                                if resp.status_code not in (429, 500, 502, 503):
-                                    break
-                            else:
-                                return JSONResponse({"error": f"groq error {last_status}", "details": last_err_text}, status_code=502)
-                    except Exception as e:
-                        return JSONResponse({"error": "request failed", "details": str(e)}, status_code=502)
+                    (status, payload), source = await llm_cache.get_or_compute(
+                        cache_key("er-mermaid", messages, model_list, temperature=0.2, max_tokens=800),
+                        os.path.join(outputs_dir, workflow_id),
+                        lambda: _groq_chat(messages, model_list, max_tokens=800),
+                        cacheable=lambda r: r[0] == 200 and bool(r[1].get("content")),
+                    )
+                    if status != 200:
+                        return JSONResponse(payload, status_code=status)
+                    content = payload.get("content") or ""
+                    used_model = payload.get("model")
 
                     # Extract and sanitize Mermaid ER code
                     def _sanitize_er(text: str, detail_level: str) -> str:
@@ -662,6 +844,7 @@ async def main():
                     return JSONResponse({
                         "workflow_id": workflow_id,
                         "model": used_model or model,
+                        "cached": source != "upstream",
                         "mermaid": mermaid_code,
                     })
 
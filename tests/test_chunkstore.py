@@ -0,0 +1,113 @@
+"""Round trip of raw chunks through the content-addressed store (CHUNK_DEDUP)."""
+
+import os
+
+import pandas as pd
+import pytest
+from application_sdk.constants import TEMPORARY_PATH
+from application_sdk.inputs.parquet import ParquetInput
+from application_sdk.outputs.parquet import ParquetOutput
+from application_sdk.services.objectstore import ObjectStore
+
+from app import chunkstore, objectstore
+
+
+class MemoryStore:
+    """Dict-backed stand-in for the Dapr binding behind ObjectStore."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+
+    async def upload_file(self, cls, source, destination, store_name=None, retain_local_copy=False):
+        with open(source, "rb") as f:
+            self.objects[destination.strip("/")] = f.read()
+        if not retain_local_copy:
+            os.remove(source)
+
+    async def download_file(self, cls, source, destination, store_name=None):
+        data = self.objects[source.strip("/")]
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        with open(destination, "wb") as f:
+            f.write(data)
+
+    async def download_prefix(self, cls, source, destination=TEMPORARY_PATH, store_name=None):
+        for key in await self.list_files(cls, source):
+            await cls.download_file(key, os.path.join(destination, key), store_name)
+
+    async def list_files(self, cls, prefix="", store_name=None):
+        return [k for k in self.objects if k.startswith(prefix.strip("/"))]
+
+    async def get_content(self, cls, key, store_name=None):
+        return self.objects[key.strip("/")]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    memory = MemoryStore()
+    for name in ("upload_file", "download_file", "download_prefix", "list_files", "get_content"):
+        method = getattr(memory, name)
+        monkeypatch.setattr(ObjectStore, name, classmethod(lambda cls, *a, _m=method, **kw: _m(cls, *a, **kw)))
+    monkeypatch.setattr(chunkstore, "_upload_file", ObjectStore.upload_file)
+    monkeypatch.setattr(chunkstore, "_download_file", ObjectStore.download_file)
+    monkeypatch.setattr(chunkstore, "_download_prefix", ObjectStore.download_prefix)
+    monkeypatch.setattr(chunkstore, "CHUNK_DEDUP", True)
+    monkeypatch.setattr(chunkstore, "_installed", False)
+    monkeypatch.setattr(chunkstore, "_present", set())
+    monkeypatch.setattr(objectstore, "LOCAL_OBJECT_STORE_PATH", "")
+    chunkstore.install()
+    return memory
+
+
+async def _fetch(run: str, frames: list[pd.DataFrame]) -> None:
+    """What a fetch activity does: one ParquetOutput per type, inside the activity's manifest scope."""
+    async with chunkstore.activity_manifest():
+        output = ParquetOutput(output_path=os.path.join(TEMPORARY_PATH, run), output_suffix="raw", typename="table")
+        for frame in frames:
+            await output.write_dataframe(frame)
+
+
+async def _transform_read(run: str, file_names: list[str]) -> pd.DataFrame:
+    """What the base transform_data does to read one batch of raw chunks."""
+    raw = ParquetInput(path=os.path.join(TEMPORARY_PATH, run, "raw"), input_prefix=run, file_names=file_names)
+    frames = [df.to_pandas() async for df in raw.get_batched_daft_dataframe()]
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.mark.asyncio
+async def test_fetch_transform_round_trip(store):
+    frames = [pd.DataFrame({"table_name": [f"t{i}_{j}" for j in range(3)], "n": [i] * 3}) for i in range(2)]
+    await _fetch("run-1", frames)
+
+    # Chunks live under their hash only; the run holds one manifest part per chunk group
+    assert not [k for k in store.objects if k.startswith("run-1/raw/")]
+    assert sorted(k for k in store.objects if k.startswith("run-1/")) == [
+        "run-1/manifests/raw/table/0.json",
+        "run-1/manifests/raw/table/1.json",
+    ]
+
+    result = await _transform_read("run-1", ["table/chunk-0-part1.parquet", "table/chunk-1-part1.parquet"])
+    pd.testing.assert_frame_equal(result, pd.concat(frames, ignore_index=True))
+
+
+@pytest.mark.asyncio
+async def test_unchanged_chunks_are_not_uploaded_again(store):
+    frames = [pd.DataFrame({"table_name": ["a", "b"], "n": [1, 2]})]
+    await _fetch("run-1", frames)
+    blobs = {k for k in store.objects if k.startswith(chunkstore.CHUNK_STORE_PREFIX)}
+    await _fetch("run-2", frames)
+
+    assert {k for k in store.objects if k.startswith(chunkstore.CHUNK_STORE_PREFIX)} == blobs
+    result = await _transform_read("run-2", ["table/chunk-0-part1.parquet"])
+    pd.testing.assert_frame_equal(result, frames[0])
+
+
+@pytest.mark.asyncio
+async def test_download_prefix_resolves_every_group(store, tmp_path):
+    frames = [pd.DataFrame({"n": [i]}) for i in range(3)]
+    await _fetch("run-1", frames)
+
+    await ObjectStore.download_prefix(source="run-1/raw/table", destination=str(tmp_path / "out"))
+
+    names = sorted(os.listdir(tmp_path / "out" / "run-1" / "raw" / "table"))
+    assert names == ["chunk-0-part1.parquet", "chunk-1-part1.parquet", "chunk-2-part1.parquet"]
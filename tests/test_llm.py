@@ -0,0 +1,69 @@
+"""Hedging in LLMClient against a stub chat-completions server."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.llm import LLMClient
+
+
+def stub_server(answers: dict[str, tuple[float, int, str]], calls: list[str]) -> httpx.MockTransport:
+    """Answer each model after its delay with (status, content)."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        calls.append(model)
+        delay, status, content = answers[model]
+        await asyncio.sleep(delay)
+        if status != 200:
+            return httpx.Response(status, text="upstream error")
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    return httpx.MockTransport(handler)
+
+
+async def _chat(answers: dict, hedge_delay: float, calls: list[str]):
+    client = LLMClient(api_key="test", base_url="http://stub", hedge_delay=hedge_delay, transport=stub_server(answers, calls))
+    try:
+        return await client.chat([{"role": "user", "content": "hi"}], list(answers), max_tokens=16), client.stats
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_candidate_is_hedged_and_fast_answer_wins():
+    calls: list[str] = []
+    (status, body), stats = await _chat({"slow": (2.0, 200, "late"), "fast": (0.01, 200, "early")}, 0.05, calls)
+
+    assert (status, body) == (200, {"content": "early", "model": "fast"})
+    assert calls == ["slow", "fast"]
+    assert stats["hedged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_answer_does_not_win_over_a_later_valid_one():
+    calls: list[str] = []
+    (status, body), _ = await _chat({"empty": (0.1, 200, ""), "valid": (0.2, 200, "graph TD")}, 0.05, calls)
+
+    assert (status, body) == (200, {"content": "graph TD", "model": "valid"})
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_the_first_candidate_answers_in_time():
+    calls: list[str] = []
+    (status, body), stats = await _chat({"primary": (0.01, 200, "ok"), "backup": (0.01, 200, "unused")}, 0.5, calls)
+
+    assert body["model"] == "primary"
+    assert calls == ["primary"]
+    assert stats["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retryable_failure_fails_over_without_waiting_for_the_hedge():
+    calls: list[str] = []
+    (status, body), stats = await _chat({"busy": (0.01, 503, ""), "backup": (0.01, 200, "ok")}, 5.0, calls)
+
+    assert (status, body) == (200, {"content": "ok", "model": "backup"})
+    assert stats["failovers"] == 1
@@ -0,0 +1,141 @@
+"""Eviction policies of the retention janitor (app.retention)."""
+
+import os
+import time
+
+from app import retention
+from app.events import RUN_FINISHED, EventBus
+
+HOUR = 3600.0
+NOW = 1_000_000.0
+
+
+def run(workflow_id, used_hours_ago=0.0, size=0, connection="c", modified_hours_ago=None):
+    used = NOW - used_hours_ago * HOUR
+    modified = used if modified_hours_ago is None else NOW - modified_hours_ago * HOUR
+    return {
+        "workflow_id": workflow_id,
+        "path": f"/out/{workflow_id}",
+        "bytes": size,
+        "modified": modified,
+        "used": used,
+        "connection": connection,
+    }
+
+
+def select(runs, protected=(), **policies):
+    kwargs = {"max_bytes": 0, "max_age_hours": 0, "keep_per_connection": 0, "grace_seconds": 60}
+    kwargs.update(policies)
+    return [(r["workflow_id"], policy) for r, policy in retention.select_runs(runs, NOW, set(protected), **kwargs)]
+
+
+def test_no_policy_evicts_nothing():
+    assert select([run("a", 100), run("b", 200)]) == []
+
+
+def test_keep_per_connection_keeps_most_recently_used():
+    runs = [run("a", 3), run("b", 1), run("c", 2), run("d", 5, connection="other")]
+    assert select(runs, keep_per_connection=2) == [("a", "keep_per_connection")]
+
+
+def test_max_age():
+    runs = [run("old", 30), run("new", 1)]
+    assert select(runs, max_age_hours=24) == [("old", "max_age")]
+
+
+def test_max_bytes_evicts_least_recently_used_first():
+    runs = [run("a", 3, size=40), run("b", 2, size=40), run("c", 1, size=40)]
+    assert select(runs, max_bytes=50) == [("a", "max_bytes"), ("b", "max_bytes")]
+
+
+def test_max_bytes_counts_runs_it_cannot_evict():
+    # The protected run stays, so both others have to go to get under the limit
+    runs = [run("live", 5, size=40), run("a", 3, size=40), run("b", 2, size=40)]
+    assert select(runs, protected={"live"}, max_bytes=50) == [("a", "max_bytes"), ("b", "max_bytes")]
+
+
+def test_protected_and_fresh_runs_are_never_evicted():
+    runs = [run("live", 30), run("fresh", 30, modified_hours_ago=0), run("old", 30)]
+    assert select(runs, protected={"live"}, max_age_hours=24) == [("old", "max_age")]
+
+
+# Files are created now, so their ctime is the real clock: sweep as if it were
+# LATER hours on, and date atime/mtime relative to that
+LATER = 100 * HOUR
+
+
+def make_file(path, size, age_seconds, now):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, (now - age_seconds, now - age_seconds))
+
+
+def sweep(base, now, protected=(), **policies):
+    kwargs = {"max_bytes": 0, "max_age_hours": 0, "grace_seconds": 60}
+    kwargs.update(policies)
+    return retention.sweep_temp(str(base), now, set(protected), **kwargs)
+
+
+def test_sweep_temp_max_age(tmp_path):
+    now = time.time() + LATER
+    make_file(str(tmp_path / "wf1" / "old.parquet"), 10, 30 * HOUR, now)
+    make_file(str(tmp_path / "wf1" / "new.parquet"), 10, HOUR, now)
+    assert sweep(tmp_path, now, max_age_hours=24) == (1, 10, 0)
+    assert os.listdir(tmp_path / "wf1") == ["new.parquet"]
+
+
+def test_sweep_temp_max_bytes_removes_least_recently_used_first(tmp_path):
+    now = time.time() + LATER
+    make_file(str(tmp_path / "wf1" / "a.parquet"), 10, 3 * HOUR, now)
+    make_file(str(tmp_path / "wf1" / "b.parquet"), 10, 2 * HOUR, now)
+    make_file(str(tmp_path / "wf1" / "c.parquet"), 10, 1 * HOUR, now)
+    assert sweep(tmp_path, now, max_bytes=15) == (2, 20, 0)
+    assert os.listdir(tmp_path / "wf1") == ["c.parquet"]
+
+
+def test_sweep_temp_skips_protected_runs_and_grace(tmp_path):
+    now = time.time() + LATER
+    make_file(str(tmp_path / "live" / "a.parquet"), 10, 30 * HOUR, now)
+    make_file(str(tmp_path / "wf1" / "b.parquet"), 10, 30 * HOUR, now)
+    assert sweep(tmp_path, now, protected={"live"}, max_age_hours=24, grace_seconds=40 * HOUR) == (0, 0, 0)
+    assert sweep(tmp_path, now, protected={"live"}, max_age_hours=24) == (1, 10, 0)
+    assert os.path.exists(tmp_path / "live" / "a.parquet")
+    assert not os.path.exists(tmp_path / "wf1")
+
+
+def test_sweep_temp_recent_ctime_keeps_file(tmp_path):
+    # A chunk hardlinked from the store carries the store's old mtime; the link bumps its ctime
+    now = time.time()
+    make_file(str(tmp_path / "store" / "chunk"), 10, 30 * HOUR, now)
+    os.makedirs(tmp_path / "wf1")
+    os.link(tmp_path / "store" / "chunk", tmp_path / "wf1" / "chunk-0-part0.parquet")
+    assert sweep(tmp_path, now + 120, max_age_hours=24) == (0, 0, 0)
+
+
+def test_sweep_temp_linked_files_do_not_count_towards_max_bytes(tmp_path):
+    now = time.time() + LATER
+    make_file(str(tmp_path / "store" / "chunk"), 100, 2 * HOUR, now)
+    os.makedirs(tmp_path / "wf1")
+    os.link(tmp_path / "store" / "chunk", tmp_path / "wf1" / "chunk-0-part0.parquet")
+    make_file(str(tmp_path / "wf1" / "plain.parquet"), 10, HOUR, now)
+    assert sweep(tmp_path, now, protected={"store"}, max_bytes=50) == (0, 0, 0)
+    assert sweep(tmp_path, now, protected={"store"}, max_age_hours=0.5) == (2, 10, 100)
+
+
+def test_active_runs_cover_long_activities(monkeypatch):
+    bus = EventBus()
+    clock = [NOW]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    bus.publish("long", "stage_started", stage="export")
+    bus.publish("idle", "stage_started", stage="fetch")
+    bus.publish("idle", "stage_failed", stage="fetch")
+    bus.publish("done", "stage_started", stage="summarize_outputs")
+    bus.publish("done", "stage_finished", stage="summarize_outputs")
+    bus.publish("done", RUN_FINISHED)
+    assert bus.active_runs(60) == {"long", "idle"}
+    clock[0] += 2 * HOUR
+    assert bus.active_runs(60) == {"long"}
+    bus.publish("long", "stage_finished", stage="export")
+    clock[0] += 2 * HOUR
+    assert bus.active_runs(60) == set()